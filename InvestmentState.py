@@ -1,4 +1,4 @@
-from typing import Union, Dict, List
+from typing import Any, Union, Dict, List
 from pydantic import BaseModel
 
 class InvestmentState(BaseModel):
@@ -41,3 +41,6 @@ class InvestmentState(BaseModel):
 
     # ReportAgent 결과
     report_path: str = ""
+
+    # 실행 지표 (LLM 호출 수, 지연 시간 등: "agent.metric" 키)
+    metrics: Dict[str, Any] = {}
@@ -3,7 +3,9 @@
 from InvestmentState import InvestmentState
 from tavily import TavilyClient
 from langchain.agents import AgentExecutor, create_openai_functions_agent
-from langchain_openai import ChatOpenAI
+from util_resources import get_llm
+from util_search_cache import cached_tavily_search
+from util_prompts import get_prompt, prompt_metrics
 from langchain.tools import Tool
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.schema import SystemMessage
@@ -31,7 +33,7 @@ class CompetitorAgent:
         self.tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
         
         # LLM
-        self.llm = ChatOpenAI(
+        self.llm = get_llm(
             model="gpt-4o-mini",
             temperature=0,
             api_key=os.getenv("OPENAI_API_KEY")
@@ -46,32 +48,10 @@ class CompetitorAgent:
             이 도구는 시장에서 유사한 기술이나 제품을 제공하는 경쟁사를 찾는데 사용됩니다."""
         )
         
-        # System Message (기존 그대로)
-        system_message = """당신은 경쟁사 분석 전문가입니다. 
-        주어진 회사이름과 핵심기술을 바탕으로 가장 적합한 경쟁사 1개를 찾아야 합니다.
-
-        분석 절차:
-        1. 회사이름과 핵심기술을 조합하여 경쟁사를 검색합니다
-        2. 검색 결과에서 가장 관련성 높은 경쟁사 후보들을 파악합니다
-        3. 필요시 각 후보 회사에 대한 상세 정보를 추가 검색합니다
-        4. 다음 기준으로 최종 경쟁사 1개를 선정합니다:
-           - 핵심기술의 유사성
-           - 시장 포지션의 직접적 경쟁 관계
-           - 제품/서비스의 중복도
-           - 타겟 고객층의 유사성
-
-        최종 결과는 반드시 다음 JSON 형식으로만 제공하세요 (다른 설명 없이):
-        {
-            "main_competitors": "경쟁사 회사명 (1개만)",
-            "competitor_profiles": "경쟁사의 설립연도, 규모, 자금 조달현황 & 주요 제품/서비스",
-            "market_positioning": "타겟 기업 vs 경쟁사의 포지셔닝 맵, 업계 순위",
-            "product_comparison": "기능, 가격, 타겟 고객 비교, 기술적 우위 요소",
-            "unique_value_props": "타겟 기업만의 강점, 경쟁우위",
-            "threat_analysis": "경쟁사의 위협 요소",
-            "market_share": "타겟 기업 및 경쟁사의 시장 점유율",
-            "reference_urls": ["참고 URL 목록"]
-        }
-        """
+        # System Message (로컬 프롬프트 레지스트리)
+        self.system_prompt = get_prompt("competitor.system")
+        self.query_prompt = get_prompt("competitor.query")
+        system_message = self.system_prompt.format()
         
         # Prompt (기존 그대로)
         prompt = ChatPromptTemplate.from_messages([
@@ -98,8 +78,9 @@ class CompetitorAgent:
             if isinstance(query, bytes):
                 query = query.decode('utf-8')
             
-            response = self.tavily_client.search(
-                query=query,
+            response = cached_tavily_search(
+                self.tavily_client,
+                query,
                 search_depth="advanced",
                 max_results=5,
                 include_domains=["crunchbase.com", "reuters.com", "bloomberg.com", "techcrunch.com"],
@@ -137,13 +118,7 @@ class CompetitorAgent:
         if isinstance(core_technology, bytes):
             core_technology = core_technology.decode('utf-8')
         
-        query = f"""
-        회사: {company_name}
-        핵심기술: {core_technology}
-        
-        위 회사의 가장 직접적인 경쟁사 1개를 찾아주세요.
-        답변은 반드시 한국어로 작성해주세요.
-        """
+        query = self.query_prompt.format(company=company_name, tech=core_technology)
         
         result = self.agent_executor.invoke({"input": query})
         
@@ -222,5 +197,6 @@ class CompetitorAgent:
             state.threat_analysis = "N/A"
             state.market_share = "N/A"
             state.reference_urls = []
-        
+
+        state.metrics = {**state.metrics, **prompt_metrics(self.system_prompt, self.query_prompt)}
         return state
\ No newline at end of file
@@ -1,20 +1,67 @@
 from InvestmentState import InvestmentState
-from langchain import hub
 from langchain.agents import Tool, AgentExecutor, create_react_agent
 from tavily import TavilyClient
-from langchain_openai import ChatOpenAI
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
-import os, json
+from util_resources import get_embeddings, get_vectorstore, get_catalog, get_company_index, get_retriever, get_llm, get_executor
+from util_search_cache import cached_tavily_search
+from util_retrieval import tokenize_ko
+from util_prompts import get_prompt, prompt_metrics
+from pydantic import BaseModel, Field
+import os, json, time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+# ✅ extract 모드: 스키마 필드별 기업 필터 RAG 쿼리 (동시 실행)
+FIELD_QUERIES = {
+    "owner": "{company} 대표이사 창업자 경영진 설립 연혁",
+    "core_tech": "{company} 핵심 기술 제품 플랫폼",
+    "pros": "{company} 강점 경쟁력 성과 매출 고객",
+    "patents": "{company} 특허 지식재산 출원 등록",
+    "investments": "{company} 투자 유치 펀딩 시리즈 투자사",
+}
+FIELD_EVIDENCE_CHARS = 1500
+# RAG 근거 관련도(쿼리 키워드 토큰 중 근거에 나온 비율)가 이 값 미만인 필드는 웹 검색으로 보강
+MIN_RAG_RELEVANCE = float(os.getenv("EXPLORER_MIN_RELEVANCE", "0.3"))
+
+
+def evidence_relevance(keywords: str, evidence: str) -> float:
+    """키워드 토큰(tokenize_ko) 중 근거 텍스트에 나온 비율 (근거가 "부족"이면 0)"""
+    if evidence == "부족":
+        return 0.0
+    query_tokens = set(tokenize_ko(keywords))
+    if not query_tokens:
+        return 1.0
+    return len(query_tokens & set(tokenize_ko(evidence))) / len(query_tokens)
+
+
+class ExtractFailed(Exception):
+    """extract 모드 실패 (react 대체 시 이미 사용한 LLM 호출 수를 metrics에 합산)"""
+
+    def __init__(self, message: str, llm_calls: int):
+        super().__init__(message)
+        self.llm_calls = llm_calls
+
+
+class ExplorerProfile(BaseModel):
+    """기업 기본 정보 (근거에 없으면 빈 문자열)"""
+    owner: str = Field(default="", description="대표자/창업자와 업력")
+    core_tech: str = Field(default="", description="핵심 기술")
+    pros: str = Field(default="", description="강점")
+    patents: str = Field(default="", description="특허 및 방어력")
+    investments: str = Field(default="", description="투자 이력")
+
 
 class ExplorerAgent:
     def __init__(self,
                  faiss_path,
                  model_name="gpt-4o",
-                 embedding_model="nlpai-lab/KURE-v1"):
+                 embedding_model="nlpai-lab/KURE-v1",
+                 mode: str = None):
+        """
+        :param mode: extract(필드별 RAG 동시 검색 → 구조화 출력 1회, 기본) / react(ReAct AgentExecutor)
+                     extract 실패 시 react로 대체 (EXPLORER_MODE 환경변수로도 지정)
+        """
         load_dotenv()
+        self.mode = mode or os.getenv("EXPLORER_MODE", "extract")
 
         if not os.getenv("OPENAI_API_KEY"):
             raise ValueError("⚠️ OPENAI_API_KEY가 .env에 설정되어 있지 않습니다.")
@@ -22,24 +69,36 @@ class ExplorerAgent:
         if not tavily_api_key:
             raise ValueError("⚠️ TAVILY_API_KEY가 .env에 설정되어 있지 않습니다.")
 
-        self.llm = ChatOpenAI(model=model_name, temperature=0, max_retries=3)
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model)
-
-        # ✅ VectorDB 로드
-        self.vectordb = FAISS.load_local(
-            faiss_path,
-            self.embeddings,
-            allow_dangerous_deserialization=True
-        )
-        print(f"✅ Faiss DB 로드 완료: {faiss_path}")
+        self.llm = get_llm(model=model_name, temperature=0, max_retries=3)
+        # ✅ 임베딩 / VectorDB는 레지스트리에서 공유 (프로세스당 1회 로드)
+        self.embeddings = get_embeddings(embedding_model)
+        self.vectordb = get_vectorstore(faiss_path, embedding_model)
+        # 기업 카탈로그 (VectorDBBuilder가 빌드 시 저장, 인덱스와 청크 수가 다르면 무시)
+        catalog = get_catalog(faiss_path)
+        if catalog is not None and catalog.get("total_chunks") != self.vectordb.index.ntotal:
+            catalog = None
+        self.catalog = catalog
+        # 기업별 파티션 검색 (filter 후처리 대신 해당 기업 벡터만 검색)
+        self.company_index = get_company_index(faiss_path, embedding_model)
+        # BM25 + 벡터 하이브리드 (제품 코드 / 특허 번호 정확 일치 보완)
+        self.retriever = get_retriever(faiss_path, embedding_model)
 
         # ✅ Tavily Client
         self.web_client = TavilyClient(api_key=tavily_api_key)
 
+        # ✅ 로컬 프롬프트 레지스트리 (hub.pull 네트워크 호출 없음, 프로세스당 1회 컴파일)
+        self.react_prompt = get_prompt("explorer.react")
+        self.react_input_prompt = get_prompt("explorer.react_input")
+        self.extract_prompt = get_prompt("explorer.extract")
+        self._react_agent = None
+
     # -----------------------------
     # DB에서 기업 목록 가져오기
     # -----------------------------
     def get_available_companies(self) -> list[str]:
+        # ✅ 카탈로그가 있으면 O(기업 수)
+        if self.catalog is not None:
+            return list(self.catalog["companies"].keys())
         if not self.vectordb.docstore:
             return []
         unique_companies = set()
@@ -47,20 +106,93 @@ class ExplorerAgent:
             metadata = self.vectordb.docstore.search(doc_id).metadata
             if "company" in metadata:
                 unique_companies.add(metadata["company"])
-        return list(unique_companies)
+        return sorted(unique_companies)
 
     # -----------------------------
     # 단일 기업 분석 (state 반환)
     # -----------------------------
     def analyze_single_company(self, company_name: str) -> InvestmentState:
+        if self.mode == "extract":
+            try:
+                return self.extract_single_company(company_name)
+            except Exception as e:
+                print(f"⚠️ extract 모드 실패 → ReAct로 대체: {e}")
+                state = self.react_single_company(company_name)
+                # 실패한 extract 시도의 LLM 호출도 비용에 포함 (검색 단계에서 실패했으면 0회)
+                state.metrics = {
+                    **state.metrics,
+                    "explorer.extract_failed": 1,
+                    "explorer.llm_calls": state.metrics.get("explorer.llm_calls", 0) + getattr(e, "llm_calls", 0),
+                }
+                return state
+        return self.react_single_company(company_name)
 
-        print(f"🚀 ExplorerAgent: '{company_name}' 분석 시작")
+    # -----------------------------
+    # extract 모드: 필드별 RAG 동시 검색 → 구조화 출력 1회
+    # -----------------------------
+    def extract_single_company(self, company_name: str) -> InvestmentState:
+        print(f"🚀 ExplorerAgent(extract): '{company_name}' 분석 시작")
+        started = time.perf_counter()
+        executor = get_executor("explorer_search", max_workers=8)
+
+        # 1. 필드별 기업 필터 RAG 검색 (동시)
+        rag_futures = {
+            field: executor.submit(self.rag_search, query.format(company=company_name), company_name)
+            for field, query in FIELD_QUERIES.items()
+        }
+        evidence = {field: future.result() for field, future in rag_futures.items()}
 
-        tools = [
+        # 2. RAG 근거가 없거나 관련도가 낮은 필드만 웹 검색 (동시), 웹 결과를 앞에 두고 RAG 근거는 뒤에 유지
+        relevance = {
+            field: evidence_relevance(FIELD_QUERIES[field].format(company=""), text)
+            for field, text in evidence.items()
+        }
+        missing = [field for field, score in relevance.items() if score < MIN_RAG_RELEVANCE]
+        web_futures = {
+            field: executor.submit(self.web_search, FIELD_QUERIES[field].format(company=company_name))
+            for field in missing
+        }
+        for field, future in web_futures.items():
+            web = future.result()
+            if web != "부족":
+                evidence[field] = web if evidence[field] == "부족" else f"{web}\n\n{evidence[field]}"
+
+        # 3. 구조화 출력 LLM 호출 1회
+        sections = "\n\n".join(
+            f"[{field}]\n{text[:FIELD_EVIDENCE_CHARS]}" for field, text in evidence.items()
+        )
+        prompt = self.extract_prompt.format(company=company_name, sections=sections)
+        try:
+            profile = self.llm.with_structured_output(ExplorerProfile).invoke(prompt)
+        except Exception as e:
+            raise ExtractFailed(f"구조화 출력 실패: {e}", llm_calls=1) from e
+        if not any(profile.model_dump().values()):
+            raise ExtractFailed("추출된 필드 없음", llm_calls=1)
+
+        return InvestmentState(
+            company_name=company_name,
+            **profile.model_dump(),
+            metrics={
+                "explorer.mode": "extract",
+                "explorer.llm_calls": 1,
+                "explorer.rag_queries": len(rag_futures),
+                "explorer.web_queries": len(web_futures),
+                "explorer.min_rag_relevance": round(min(relevance.values()), 3),
+                "explorer.latency_sec": round(time.perf_counter() - started, 3),
+                **prompt_metrics(self.extract_prompt),
+            }
+        )
+
+    # -----------------------------
+    # react 모드 (대체 경로)
+    # -----------------------------
+    def _react_tools(self, company_name: str) -> list:
+        # 이름/설명은 기업과 무관하게 고정 → 프롬프트에 렌더링되는 도구 목록이 모든 기업에서 같음
+        return [
             Tool(
                 name="RAGSearch",
                 func=lambda query: self.rag_search(query=query, company_name=company_name),
-                description=f"'{company_name}' 관련 정보를 FAISS 벡터DB에서 검색"
+                description="분석 대상 기업 관련 정보를 FAISS 벡터DB에서 검색"
             ),
             Tool(
                 name="WebSearch",
@@ -69,27 +201,29 @@ class ExplorerAgent:
             )
         ]
 
-        prompt = hub.pull("hwchase17/react")
-        agent = create_react_agent(self.llm, tools, prompt)
-        agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, handle_parsing_errors=True)
-
-        final_prompt = f"""
-        당신은 공격적 투자 분석가입니다.
-        '{company_name}'의 핵심 기술, 소유자 업력, 강점, 특허 방어력, 투자 이력 등을 수집하여
-        JSON 형식으로 정리하세요.
-
-        출력 스키마:
-        {{
-            "owner": "...",
-            "core_tech": "...",
-            "pros": "...",
-            "patents": "...",
-            "investments": "..."
-        }}
-        """
+    def _get_react_agent(self):
+        """ReAct 에이전트(프롬프트 + 도구 설명 + LLM)는 한 번만 생성, 기업별로는 도구 실행기만 새로 묶음"""
+        if self._react_agent is None:
+            self._react_agent = create_react_agent(self.llm, self._react_tools(""), self.react_prompt.template)
+        return self._react_agent
+
+    def react_single_company(self, company_name: str) -> InvestmentState:
 
+        print(f"🚀 ExplorerAgent: '{company_name}' 분석 시작")
+        started = time.perf_counter()
+
+        tools = self._react_tools(company_name)
+        agent_executor = AgentExecutor(
+            agent=self._get_react_agent(), tools=tools, verbose=True,
+            handle_parsing_errors=True, return_intermediate_steps=True
+        )
+
+        final_prompt = self.react_input_prompt.format(company=company_name)
+
+        steps = []
         try:
             response = agent_executor.invoke({"input": final_prompt})
+            steps = response.get("intermediate_steps", []) if isinstance(response, dict) else []
             raw_output = response.get("output", "") if isinstance(response, dict) else str(response)
             cleaned = raw_output.strip().replace("```json", "").replace("```", "")
             parsed = json.loads(cleaned)
@@ -104,40 +238,47 @@ class ExplorerAgent:
             core_tech=parsed.get("core_tech", ""),
             pros=parsed.get("pros", ""),
             patents=parsed.get("patents", ""),
-            investments=parsed.get("investments", "")
+            investments=parsed.get("investments", ""),
+            metrics={
+                "explorer.mode": "react",
+                # ReAct 한 단계 = LLM 1회 (+ 최종 답변 1회)
+                "explorer.llm_calls": len(steps) + 1,
+                "explorer.tool_calls": len(steps),
+                "explorer.latency_sec": round(time.perf_counter() - started, 3),
+                **prompt_metrics(self.react_prompt, self.react_input_prompt),
+            }
         )
 
     # -----------------------------
     # 전체 기업 자동 실행 (state 리스트 반환)
     # -----------------------------
-    def run(self) -> list[InvestmentState]:
+    def run(self, max_workers: int = 1) -> list[InvestmentState]:
         companies = self.get_available_companies()
         if not companies:
             print("⚠️ 분석할 기업이 없습니다.")
             return []
 
-        states = []
-        for company in companies:
-            state = self.analyze_single_company(company)
-            states.append(state)
+        if max_workers <= 1:
+            return [self.analyze_single_company(company) for company in companies]
 
-        return states
+        # ✅ 네트워크 대기 시간이 대부분이므로 스레드로 동시 실행 (결과 순서는 companies 순서 유지)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(self.analyze_single_company, companies))
 
     # -----------------------------
     # 보조 메서드 (검색 함수들)
     # -----------------------------
     def rag_search(self, query: str, company_name: str) -> str:
-        retriever = self.vectordb.as_retriever(
-            search_kwargs={'filter': {'company': company_name}}
-        )
-        docs = retriever.invoke(query)
+        docs = self.retriever.search(query, company_name, k=4)
         if not docs:
             return "부족"
         return "\n\n".join([d.page_content for d in docs])
 
     def web_search(self, query: str) -> str:
         try:
-            resp = self.web_client.search(query=query, search_depth="advanced", max_results=3)
+            resp = cached_tavily_search(
+                self.web_client, query, ttl_group="company", search_depth="advanced", max_results=3
+            )
             results = [item.get("content", "") for item in resp.get("results", [])]
             return "\n".join(results) if results else "부족"
         except Exception as e:
@@ -1,12 +1,47 @@
-import json
-import re
-from agents.report_agent import ReportAgent
-from langchain_openai import ChatOpenAI
+import os
+from typing import Dict, List, Optional, Union
+from pydantic import BaseModel, Field
+from util_resources import get_llm
+from util_prompts import get_prompt, prompt_metrics
+from util_score_cache import get_score_cache
+from util_portfolio import DEFAULT_THRESHOLDS, Portfolio, decide
 from InvestmentState import InvestmentState
 
+# ✅ 점수 항목별 입력 필드 (이 필드가 그대로면 캐시된 항목 점수를 재사용)
+SCORE_CATEGORIES = {
+    "owner_score": ("owner", "pros"),
+    "market_score": ("market_size", "industry_trends", "customer_segments", "regulatory_barriers"),
+    "product_score": ("core_tech", "tech_summary", "differentiation_points", "technical_risks", "patents_and_papers"),
+    "competitor_score": ("main_competitors", "competitor_profiles", "market_positioning", "product_comparison", "threat_analysis"),
+    "performance_score": ("performance",),
+    "deal_score": ("investments", "funding"),
+}
+
+# ✅ 배치 채점 설정 (환경변수로 조정)
+SCORE_MAX_CONCURRENCY = int(os.getenv("INVESTMENT_MAX_CONCURRENCY", "4"))   # 동시 구조화 출력 호출 상한
+SCORE_MAX_RETRIES = int(os.getenv("INVESTMENT_SCORE_RETRIES", "2"))         # 실패한 기업만 다시 호출하는 횟수
+
+
+class Scorecard(BaseModel):
+    """Scorecard Method 항목별 점수 (0~100 정수)"""
+    owner_score: int = Field(ge=0, le=100, description="창업자/경영진")
+    market_score: int = Field(ge=0, le=100, description="시장성")
+    product_score: int = Field(ge=0, le=100, description="제품/기술력")
+    competitor_score: int = Field(ge=0, le=100, description="경쟁 우위")
+    performance_score: int = Field(ge=0, le=100, description="실적")
+    deal_score: int = Field(ge=0, le=100, description="투자조건")
+
+
 class InvestmentAgent:
-    def __init__(self, llm_client=None):
-        self.client = llm_client or ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    def __init__(self, llm_client=None, max_concurrency: int = SCORE_MAX_CONCURRENCY,
+                 thresholds: Dict[str, float] = None):
+        self.client = llm_client or get_llm(model="gpt-4o-mini", temperature=0)
+        self.scorer = self.client.with_structured_output(Scorecard)
+        self.max_concurrency = max_concurrency
+        self.score_prompt = get_prompt("investment.score")
+        # 항목 점수 캐시 키에 들어가는 채점기 버전 (프롬프트 버전/해시 + 모델명)
+        self.score_version = f"{self.score_prompt.tag}:{getattr(self.client, 'model_name', '')}"
+        self.score_cache = get_score_cache()
         self.weights = {
             "owner_score": 0.30,
             "market_score": 0.25,
@@ -15,96 +50,112 @@ class InvestmentAgent:
             "performance_score": 0.10,
             "deal_score": 0.10,
         }
+        # 판정 기준: invest(이상이면 "투자 추천") / report(이상이면 보고서 생성, ReportQueue가 사용)
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+
+    def _prompt_fields(self, company: dict) -> dict:
+        fields = {name: company.get(name) for name in self.score_prompt.template.input_variables}
+        fields["funding"] = (company.get("performance") or {}).get("funding")
+        return fields
+
+    def _category_keys(self, fields: dict) -> Dict[str, str]:
+        return {
+            category: self.score_cache.make_key(
+                category, fields["company_name"], {name: fields[name] for name in names}, self.score_version
+            )
+            for category, names in SCORE_CATEGORIES.items()
+        }
 
-    def score_company(self, company: dict) -> dict:
-        """
-        여러 필드를 종합해서 LLM에 넘겨 점수를 산출
+    def score_many(self,
+                   companies: List[Union[InvestmentState, dict]],
+                   max_concurrency: Optional[int] = None,
+                   max_retries: int = SCORE_MAX_RETRIES) -> List[Dict]:
         """
-        prompt = f"""
-        당신은 스타트업 투자 심사역입니다. 
-        아래 회사 정보를 바탕으로 Scorecard Method 기준으로 평가하세요.
-        각 항목은 0~100 정수 점수로 주고 반드시 JSON으로 출력하세요.
-
-        회사명: {company.get("company_name")}
-
-        [창업자 관련]
-        - Owner: {company.get("owner")}
-        - Pros: {company.get("pros")}
-
-        [시장성 관련]
-        - Market Size: {company.get("market_size")}
-        - Industry Trends: {company.get("industry_trends")}
-        - Customer Segments: {company.get("customer_segments")}
-        - Regulatory Barriers: {company.get("regulatory_barriers")}
-
-        [제품/기술력]
-        - Core Tech: {company.get("core_tech")}
-        - Tech Summary: {company.get("tech_summary")}
-        - Differentiation Points: {company.get("differentiation_points")}
-        - Technical Risks: {company.get("technical_risks")}
-        - Patents/Papers: {company.get("patents_and_papers")}
-
-        [경쟁 우위]
-        - Main Competitors: {company.get("main_competitors")}
-        - Competitor Profiles: {company.get("competitor_profiles")}
-        - Market Positioning: {company.get("market_positioning")}
-        - Product Comparison: {company.get("product_comparison")}
-        - Threat Analysis: {company.get("threat_analysis")}
-
-        [실적]
-        - Performance: {company.get("performance")}
-
-        [투자조건]
-        - Investments: {company.get("investments")}
-        - Funding: {company.get("performance", {}).get("funding")}
-
-        반드시 JSON만 출력:
-        {{
-          "owner_score": <int>,
-          "market_score": <int>,
-          "product_score": <int>,
-          "competitor_score": <int>,
-          "performance_score": <int>,
-          "deal_score": <int>
-        }}
+        여러 기업을 한 번에 채점 → 점수표 (입력 순서 유지)
+        - 입력 필드가 그대로인 항목은 캐시된 점수 재사용 (가중치만 바꾼 재채점은 LLM 호출 0회)
+        - 캐시에 없는 항목이 있는 기업만 구조화 출력 호출, max_concurrency개씩 동시 실행
+        - 호출/검증 실패한 기업만 max_retries회까지 다시 호출, 끝까지 실패하면 status="failed"
+        - InvestmentState가 들어오면 성공한 기업의 scores / total_score / decision도 갱신
+        :return: [{company_name, <항목>_score..., total_score, status(cached/scored/failed), llm_calls}, ...]
         """
+        dicts = [c.model_dump(exclude={"metrics"}) if isinstance(c, InvestmentState) else c for c in companies]
+        fields = [self._prompt_fields(c) for c in dicts]
+        scores: List[Dict[str, Optional[int]]] = [dict.fromkeys(SCORE_CATEGORIES) for _ in dicts]
+
+        keys = []
+        if self.score_cache is not None:
+            keys = [self._category_keys(f) for f in fields]
+            cached = self.score_cache.get_many(k for row in keys for k in row.values())
+            for row, row_keys in zip(scores, keys):
+                for category, key in row_keys.items():
+                    row[category] = cached.get(key)
+
+        llm_calls = [0] * len(dicts)
+        pending = [i for i, row in enumerate(scores) if None in row.values()]
+        for _ in range(max_retries + 1):
+            if not pending:
+                break
+            outputs = self.scorer.batch(
+                [self.score_prompt.format(**fields[i]) for i in pending],
+                config={"max_concurrency": max_concurrency or self.max_concurrency},
+                return_exceptions=True
+            )
+            failed, fresh = [], []
+            for i, output in zip(pending, outputs):
+                llm_calls[i] += 1
+                if isinstance(output, Exception) or output is None:
+                    print(f"⚠️ {fields[i]['company_name']} 채점 실패: {output}")
+                    failed.append(i)
+                    continue
+                # 캐시에 있던 항목은 그대로 두고 비어 있던 항목만 채움
+                for category in SCORE_CATEGORIES:
+                    if scores[i][category] is None:
+                        scores[i][category] = getattr(output, category)
+                        if keys:
+                            fresh.append((keys[i][category], fields[i]["company_name"], category, scores[i][category]))
+            if fresh:
+                self.score_cache.set_many(fresh)
+            pending = failed
+
+        table, failed = [], set(pending)
+        for i, (company, row) in enumerate(zip(companies, scores)):
+            if i in failed:
+                table.append({"company_name": fields[i]["company_name"], **row,
+                              "total_score": None, "status": "failed", "llm_calls": llm_calls[i]})
+                continue
+            table.append({"company_name": fields[i]["company_name"], **row,
+                          "total_score": self.calculate_weighted_score(row),
+                          "status": "scored" if llm_calls[i] else "cached", "llm_calls": llm_calls[i]})
+            if isinstance(company, InvestmentState):
+                self._apply_scores(company, row)
+        return table
 
-        response = self.client.invoke(prompt)
-        raw_content = response.content.strip()
-        cleaned = re.sub(r"```json|```", "", raw_content).strip()
-
-        try:
-            scores = json.loads(cleaned)
-        except Exception:
-            print("⚠️ JSON 파싱 실패:", raw_content)
-            scores = {k: 50 for k in self.weights}
-
-        return scores
+    def score_company(self, company: dict) -> dict:
+        """
+        여러 필드를 종합해서 LLM에 넘겨 점수를 산출 (score_many 1건, 끝까지 실패하면 전 항목 50점)
+        """
+        row = self.score_many([company])[0]
+        if row["status"] == "failed":
+            print(f"⚠️ {row['company_name']} 채점 실패 → 기본 점수 50")
+            return {k: 50 for k in self.weights}
+        return {k: row[k] for k in SCORE_CATEGORIES}
 
     def calculate_weighted_score(self, scores: dict) -> float:
         return sum(scores[k] * self.weights[k] for k in self.weights)
 
-    def run(self, state: InvestmentState) -> InvestmentState:
-        # state → dict 변환
-        company_dict = state.model_dump()
-
-        # 점수 계산
-        scores = self.score_company(company_dict)
-        total_score = self.calculate_weighted_score(scores)
+    def portfolio(self, companies: List[Union[InvestmentState, Dict]]) -> Portfolio:
+        """채점된 state 리스트 또는 score_many 점수표 → Portfolio (가중치 시나리오별 총점 / 민감도 / 순위)"""
+        rows = [{"company_name": c.company_name, **c.scores} if isinstance(c, InvestmentState) else c for c in companies]
+        return Portfolio.from_rows(rows, list(self.weights), self.thresholds)
 
-        # state 업데이트
+    def _apply_scores(self, state: InvestmentState, scores: dict):
         state.scores = scores
-        state.total_score = total_score
-        state.decision = "투자 추천" if total_score >= 80 else "보류"
-
-        if state.total_score >= 74:
-            print(f"📊 {state.company_name} {state.total_score:.1f}점 → 보고서 생성 시작")
-            report_agent = ReportAgent()
-            report = report_agent.run(state)   # PDF 저장
-            state.report_path = report.report_path
-        else:
-            print(f"📉 {state.company_name} {state.total_score:.1f}점 → 보고서 생략")
-
+        state.total_score = self.calculate_weighted_score(scores)
+        state.decision = decide(state.total_score, self.thresholds)
+        state.metrics = {**state.metrics, **prompt_metrics(self.score_prompt)}
 
+    def run(self, state: InvestmentState) -> InvestmentState:
+        # 점수 계산 (state → dict 변환) 후 state 업데이트, 보고서는 다음 노드(ReportQueue)가 백그라운드로 생성
+        self._apply_scores(state, self.score_company(state.model_dump(exclude={"metrics"})))
+        print(f"📊 {state.company_name} {state.total_score:.1f}점 → {state.decision}")
         return state
-
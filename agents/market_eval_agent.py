@@ -1,58 +1,124 @@
 from InvestmentState import InvestmentState
 from langchain_teddynote.tools.tavily import TavilySearch
 from langchain_teddynote.evaluator import GroundednessChecker
-from langchain_openai import ChatOpenAI
+from util_resources import get_llm, get_executor
+from util_search_cache import cached_tavily_search
+from concurrent.futures import wait
 from datetime import datetime
 import json
+import time
 
 class MarketEvalAgent:
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 4, search_timeout: float = 20.0):
+        # 관련성 평가 동시 호출 상한
+        self.max_concurrency = max_concurrency
+        # Tavily 쿼리별 타임아웃 (초)
+        self.search_timeout = search_timeout
         # Tavily 검색 툴
         self.tavily_tool = TavilySearch()
         # 관련성 평가기
         self.relevance_checker = GroundednessChecker(
-            llm=ChatOpenAI(model="gpt-4o-mini", temperature=0),
+            llm=get_llm(model="gpt-4o-mini", temperature=0),
             target="question-retrieval"
         ).create()
 
-    def _filter_relevant(self, company: str, results: list, query: str, limit: int = 3) -> list:
-        filtered = []
-        for i, r in enumerate(results[:limit]):
-            if isinstance(r, dict):
-                title = r.get("title") or ""
-                context = r.get("snippet") or title
-            else:
-                title, context = str(r), str(r)
+    def _filter_relevant_many(self, company: str, jobs: list, limit: int = 3) -> tuple:
+        """
+        여러 검색 결과 묶음의 관련성을 한 번의 batch로 평가
+        :param jobs: [(results, query), ...]
+        - 평가 호출이 실패한 결과는 "관련 없음"과 구분해 실패 수로 따로 집계 (성공 호출 수에 포함하지 않음)
+        :return: (묶음별 필터링 결과 리스트, 성공한 LLM 호출 수, 실패한 평가 수)
+        """
+        inputs, owners = [], []
+        for job_idx, (results, query) in enumerate(jobs):
+            for r in results[:limit]:
+                if isinstance(r, dict):
+                    title = r.get("title") or ""
+                    context = r.get("snippet") or title
+                else:
+                    title, context = str(r), str(r)
+                inputs.append({"question": f"{company} {query}", "context": context})
+                owners.append((job_idx, r))
 
-            response = self.relevance_checker.invoke(
-                {"question": f"{company} {query}", "context": context}
+        responses = []
+        if inputs:
+            responses = self.relevance_checker.batch(
+                inputs,
+                config={"max_concurrency": self.max_concurrency},
+                return_exceptions=True
             )
 
+        filtered = [[] for _ in jobs]
+        failed = 0
+        for (job_idx, r), response in zip(owners, responses):
+            if isinstance(response, Exception):
+                failed += 1
+                continue
             if str(response.score).lower().startswith("y"):
-                filtered.append(r)
-        return filtered
+                filtered[job_idx].append(r)
+        if failed:
+            print(f"⚠️ {company} 관련성 평가 실패 {failed}/{len(inputs)}건 (관련 없음으로 처리하지 않고 grade_failed로 기록): "
+                  f"{next(r for r in responses if isinstance(r, Exception))}")
+        return filtered, len(inputs) - failed, failed
+
+    def _timed_search(self, kwargs: dict) -> tuple:
+        """:return: (결과 리스트, 소요 시간, 예외 또는 None) — 실패해도 소요 시간은 기록"""
+        started = time.perf_counter()
+        try:
+            # 요청 자체에도 타임아웃 → 대기만 끝나고 스레드는 계속 붙잡혀 있는 일이 없도록
+            results = cached_tavily_search(self.tavily_tool, format_output=False,
+                                           timeout=self.search_timeout, **kwargs)
+            return results, time.perf_counter() - started, None
+        except Exception as e:
+            return [], time.perf_counter() - started, e
+
+    def _search_all(self, queries: dict) -> tuple:
+        """
+        서로 독립적인 Tavily 쿼리를 공유 스레드 풀에서 동시에 실행
+        - 쿼리별 타임아웃(HTTP 요청 + 대기), 실패/지연된 쿼리는 빈 결과로 처리 (실패해도 지연 시간 기록)
+        :return: ({이름: 결과 리스트}, {지표 키: 값})
+        """
+        executor = get_executor("tavily_search", max_workers=16)
+        futures = {name: executor.submit(self._timed_search, kwargs) for name, kwargs in queries.items()}
+        wait(futures.values(), timeout=self.search_timeout)
+
+        results, metrics = {}, {}
+        for name, future in futures.items():
+            if not future.done():
+                # 실행 중인 future는 cancel 불가 → 요청 자체에 넘긴 timeout으로 스레드가 풀려남
+                print(f"⚠️ Tavily '{name}' 쿼리 타임아웃 ({self.search_timeout}s)")
+                results[name] = []
+                metrics[f"market_eval.latency.{name}"] = self.search_timeout
+                metrics[f"market_eval.status.{name}"] = "timeout"
+                continue
+            results[name], latency, error = future.result()
+            metrics[f"market_eval.latency.{name}"] = round(latency, 3)
+            metrics[f"market_eval.status.{name}"] = "ok" if error is None else "error"
+            if error is not None:
+                print(f"⚠️ Tavily '{name}' 쿼리 실패: {error}")
+        return results, metrics
+
+    def _filter_relevant(self, company: str, results: list, query: str, limit: int = 3) -> list:
+        filtered, _, _ = self._filter_relevant_many(company, [(results, query)], limit=limit)
+        return filtered[0]
 
     def run(self, state: InvestmentState) -> InvestmentState:
         company_name = state.company_name or "알 수 없는 회사"
         core_tech = state.core_tech or "핵심기술"
 
-        # 1. 산업 동향
-        result_trends = self.tavily_tool.search(
-            query=f"{company_name} {core_tech} 헬스케어 산업 동향",
-            topic="news", days=30, max_results=3, format_output=False
-        )
-
-        # 2. 시장 규모
-        result_market = self.tavily_tool.search(
-            query=f"{company_name} {core_tech} 시장 규모",
-            topic="news", days=30, max_results=2, format_output=False
-        )
-
-        # 3. 규제 환경
-        result_regulation = self.tavily_tool.search(
-            query=f"{company_name} {core_tech} 규제",
-            topic="news", days=60, max_results=2, format_output=False
-        )
+        # 1. 산업 동향 / 2. 시장 규모 / 3. 규제 환경 — 동시 실행
+        searches, search_metrics = self._search_all({
+            "trends": dict(query=f"{company_name} {core_tech} 헬스케어 산업 동향",
+                           topic="news", days=30, max_results=3),
+            "market": dict(query=f"{company_name} {core_tech} 시장 규모",
+                           topic="news", days=30, max_results=2),
+            "regulation": dict(query=f"{company_name} {core_tech} 규제",
+                               topic="news", days=60, max_results=2),
+        })
+        result_trends = searches["trends"]
+        result_market = searches["market"]
+        result_regulation = searches["regulation"]
+        state.metrics = {**state.metrics, **search_metrics}
 
         today = datetime.now().strftime("%Y-%m-%d")
         evidence = []
@@ -63,10 +129,17 @@ class MarketEvalAgent:
                 "accessed_at": today
             })
 
-        # 필터링 적용
-        result_trends = self._filter_relevant(company_name, result_trends, "헬스케어 산업 동향")
-        result_market = self._filter_relevant(company_name, result_market, "시장 규모 성장률")
-        result_regulation = self._filter_relevant(company_name, result_regulation, "의료 규제")
+        # 필터링 적용 (3개 묶음을 한 번의 batch로 평가)
+        (result_trends, result_market, result_regulation), llm_calls, grade_failed = self._filter_relevant_many(
+            company_name,
+            [
+                (result_trends, "헬스케어 산업 동향"),
+                (result_market, "시장 규모 성장률"),
+                (result_regulation, "의료 규제"),
+            ]
+        )
+        print(f"🔎 {company_name} 관련성 평가 LLM 호출: {llm_calls}회 (실패 {grade_failed}회)")
+        state.metrics = {**state.metrics, "market_eval.llm_calls": llm_calls, "market_eval.grade_failed": grade_failed}
 
         # ✅ state 업데이트
         state.industry_trends = " / ".join([r.get("content", "") for r in result_trends])
@@ -1,5 +1,6 @@
 import os, json
-from langchain_openai import ChatOpenAI
+from util_resources import get_llm
+from util_prompts import get_prompt, prompt_metrics
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -20,7 +21,8 @@ pdfmetrics.registerFont(UnicodeCIDFont("HYGothic-Medium"))      # 고딕체
 
 class ReportAgent:
     def __init__(self, llm=None):
-        self.llm = llm or ChatOpenAI(model="gpt-4o-mini", temperature=0)
+        self.llm = llm or get_llm(model="gpt-4o-mini", temperature=0)
+        self.report_prompt = get_prompt("report.generate")
 
         # ✅ 스타일 재정의
         self.styles = getSampleStyleSheet()
@@ -40,27 +42,9 @@ class ReportAgent:
 
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-        # 1. LLM 프롬프트 작성
-        prompt = f"""
-        당신은 전문 투자 보고서 작성자입니다.
-        아래 JSON 데이터를 기반으로 헬스케어 스타트업 투자 평가 보고서를 작성하세요.
-
-        JSON 데이터:
-        {json.dumps(state.model_dump(), ensure_ascii=False, indent=2)}
-
-        보고서 구성:
-        1. 표지 (회사명, 보고서 제목)
-        2. 목차
-        3. 본문
-           - 스타트업 개요
-           - 기술 요약
-           - 시장성 평가
-           - 경쟁사 비교
-           - 투자 판단 (점수 요약 및 최종 결론)
-        4. 결론
-
-        결과는 한국어 문단 형식으로 작성해 주세요.
-        """
+        # 1. LLM 프롬프트 작성 (metrics는 실행마다 달라지는 계측값이라 제외 → 같은 state면 같은 프롬프트 / LLM 캐시 적중)
+        data = state.model_dump(exclude={"metrics"})
+        prompt = self.report_prompt.format(data=json.dumps(data, ensure_ascii=False, indent=2))
 
         response = self.llm.invoke(prompt)
         report_text = response.content.strip()
@@ -79,4 +63,5 @@ class ReportAgent:
 
         # ✅ state에 report_path 저장
         state.report_path = output_path
+        state.metrics = {**state.metrics, **prompt_metrics(self.report_prompt)}
         return state
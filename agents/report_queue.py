@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import Future, wait
+from typing import Dict, List, Optional
+from InvestmentState import InvestmentState
+from util_resources import get_executor
+from util_portfolio import DEFAULT_THRESHOLDS, meets
+from util_prompts import get_prompt
+
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))   # PDF 생성 워커 수
+
+# 입력 해시에서 제외하는 필드 (실행마다 달라지거나 보고서 결과로 채워지는 값)
+HASH_EXCLUDE = {"report_path", "metrics"}
+
+
+def report_path_for(company_name: str, output_dir: str = "reports") -> str:
+    safe_company = (company_name or "unknown").replace(" ", "_")
+    return os.path.join(output_dir, f"{safe_company}_llm_report.pdf")
+
+
+@dataclass
+class ReportJob:
+    company_name: str
+    input_hash: str
+    report_path: str
+    status: str = "queued"          # queued / running / done / failed / superseded
+    error: str = ""
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def to_dict(self) -> Dict:
+        return {
+            "company_name": self.company_name,
+            "input_hash": self.input_hash,
+            "report_path": self.report_path,
+            "status": self.status,
+            "error": self.error,
+            "queue_sec": round((self.started_at or time.time()) - self.submitted_at, 3),
+            "run_sec": round(self.finished_at - self.started_at, 3) if self.finished_at else 0.0,
+        }
+
+
+class ReportQueue:
+    """
+    보고서 생성 작업 큐 (ReportAgent를 백그라운드 워커 풀에서 실행)
+    - run(state): 총점이 report 기준 이상이면 작업 등록만 하고 바로 반환 (채점 / 파이프라인은 PDF 생성을 기다리지 않음)
+    - 중복 제거: (기업명, 입력 해시)당 작업 1개 → 같은 state의 보고서는 한 번만 생성
+      (실패 / superseded 작업, 또는 다른 state의 보고서가 report_path를 덮어쓴 완료 작업은 재등록)
+    - 같은 기업의 새 state가 들어오면 이전 작업 결과는 최종 경로에 쓰지 않음 (superseded)
+    - status() / report(): 작업별 상태와 상태별 개수, wait(): 남은 작업 완료 대기
+    """
+
+    def __init__(self,
+                 report_agent=None,
+                 max_workers: int = REPORT_WORKERS,
+                 output_dir: str = "reports",
+                 thresholds: Optional[Dict[str, float]] = None):
+        self._report_agent = report_agent
+        self.max_workers = max_workers
+        self.output_dir = output_dir
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+        self._lock = threading.Lock()
+        self._jobs: Dict[tuple, ReportJob] = {}
+        self._latest: Dict[str, str] = {}   # 기업명 → 최신 입력 해시
+        self._written: Dict[str, str] = {}  # 기업명 → report_path에 현재 쓰여 있는 보고서의 입력 해시
+        self.stats = {"submitted": 0, "deduplicated": 0, "skipped": 0}
+        # 보고서 프롬프트가 바뀌면 같은 state라도 새 보고서
+        self.prompt_tag = get_prompt("report.generate").tag
+
+    @property
+    def report_agent(self):
+        # ReportAgent(폰트 등록, LLM)는 첫 작업 때 한 번만 생성
+        with self._lock:
+            if self._report_agent is None:
+                from agents.report_agent import ReportAgent
+                self._report_agent = ReportAgent()
+            return self._report_agent
+
+    def input_hash(self, state: InvestmentState) -> str:
+        payload = state.model_dump(exclude=HASH_EXCLUDE)
+        raw = json.dumps([payload, self.prompt_tag], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+    def submit(self, state: InvestmentState) -> ReportJob:
+        """보고서 작업 등록 (같은 기업·입력 해시의 작업이 있으면 그 작업 반환)"""
+        key = (state.company_name, self.input_hash(state))
+        with self._lock:
+            job = self._jobs.get(key)
+            self._latest[state.company_name] = key[1]
+            # 진행 중이거나, 완료됐고 그 결과가 지금 report_path에 있는 작업만 재사용
+            # (A 완료 → B 완료로 덮어씀 → A 재요청이면 A를 다시 생성)
+            reusable = job is not None and (
+                job.status in ("queued", "running")
+                or (job.status == "done" and self._written.get(key[0]) == key[1])
+            )
+            if reusable:
+                self.stats["deduplicated"] += 1
+                return job
+            job = ReportJob(company_name=key[0], input_hash=key[1],
+                            report_path=report_path_for(state.company_name, self.output_dir))
+            self._jobs[key] = job
+            self.stats["submitted"] += 1
+            executor = get_executor("report", max_workers=self.max_workers)
+            job.future = executor.submit(self._run_job, job, state.model_copy(deep=True))
+        return job
+
+    def _run_job(self, job: ReportJob, state: InvestmentState):
+        job.status, job.started_at = "running", time.time()
+        # 임시 파일에 만든 뒤 최신 작업일 때만 최종 경로로 교체 (같은 기업의 오래된 작업이 덮어쓰지 않도록)
+        tmp_path = f"{job.report_path}.{job.input_hash}.tmp"
+        try:
+            self.report_agent.run(state, output_path=tmp_path)
+            with self._lock:
+                if self._latest.get(job.company_name) == job.input_hash:
+                    os.replace(tmp_path, job.report_path)
+                    self._written[job.company_name] = job.input_hash
+                    job.status = "done"
+                else:
+                    os.remove(tmp_path)
+                    job.status = "superseded"
+        except Exception as e:
+            job.status, job.error = "failed", str(e)
+            print(f"⚠️ {job.company_name} 보고서 생성 실패: {e}")
+        finally:
+            job.finished_at = time.time()
+
+    def run(self, state: InvestmentState) -> InvestmentState:
+        """파이프라인 노드: 기준 이상이면 작업 등록 후 바로 반환 (report_path는 완료 시 PDF가 생길 경로)"""
+        if not meets(state.total_score, "report", self.thresholds):
+            print(f"📉 {state.company_name} {state.total_score:.1f}점 → 보고서 생략")
+            with self._lock:
+                self.stats["skipped"] += 1
+            return state
+
+        job = self.submit(state)
+        print(f"📊 {state.company_name} {state.total_score:.1f}점 → 보고서 작업 {job.status} ({job.input_hash})")
+        state.report_path = job.report_path
+        state.metrics = {**state.metrics, "report.input_hash": job.input_hash}
+        return state
+
+    def wait(self, timeout: Optional[float] = None) -> List[Dict]:
+        """남은 작업이 끝날 때까지 대기 후 작업 상태 반환"""
+        with self._lock:
+            futures = [job.future for job in self._jobs.values() if job.future is not None]
+        wait(futures, timeout=timeout)
+        return self.status()
+
+    def status(self, company_name: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job.to_dict() for job in jobs if company_name is None or job.company_name == company_name]
+
+    def report(self) -> Dict:
+        counts: Dict[str, int] = {}
+        for job in self.status():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {**self.stats, **counts}
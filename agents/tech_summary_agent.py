@@ -1,16 +1,18 @@
 import json
 import os
+import re
+import time
+import hashlib
 from typing import Dict, List, Annotated, Sequence, Literal, Union
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from langchain_core.tools import tool
-from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from util_resources import get_embeddings, get_vectorstore, get_retriever, get_llm, throttle
+from util_search_cache import cached_tavily_search
+from util_retrieval import tokenize_ko
+from util_prompts import get_prompt, prompt_metrics
 from tavily import TavilyClient
 import requests
 import xml.etree.ElementTree as ET
@@ -25,6 +27,34 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 FAISS_DIR = os.path.join(BASE_DIR, "faiss_db/unicorns_sementic")
 CHECKPOINT_DIR = os.path.join(BASE_DIR, "checkpoint")
 
+# ✅ 기업당 실행 예산 (환경변수로 조정) — 소진 시 바로 최종 요약으로 이동
+DEFAULT_BUDGET = {
+    "max_llm_calls": int(os.getenv("TECH_MAX_LLM_CALLS", "8")),            # 최종 요약 1회 포함
+    "max_prompt_tokens": int(os.getenv("TECH_MAX_PROMPT_TOKENS", "20000")),
+    "max_wall_sec": float(os.getenv("TECH_MAX_WALL_SEC", "120")),
+}
+
+# ✅ 증거 저장소: 도구 결과 조각 최대 길이 / 최종 요약에 넣을 증거 토큰 예산
+EVIDENCE_CHUNK_CHARS = 600
+EVIDENCE_TOKEN_BUDGET = int(os.getenv("TECH_EVIDENCE_TOKENS", "1500"))
+NO_EVIDENCE_PREFIXES = ("검색 결과 없음", "검색 오류")
+
+
+def split_evidence(content: str) -> List[str]:
+    """도구 결과 → 증거 조각 (결과 항목 단위 "\n\n" 분리, 긴 항목은 EVIDENCE_CHUNK_CHARS로 자름)"""
+    if not content or content.startswith(NO_EVIDENCE_PREFIXES):
+        return []
+    pieces = []
+    for block in content.split("\n\n"):
+        block = block.strip()
+        for i in range(0, len(block), EVIDENCE_CHUNK_CHARS):
+            pieces.append(block[i:i + EVIDENCE_CHUNK_CHARS])
+    return [p for p in pieces if p]
+
+
+def evidence_hash(text: str) -> str:
+    return hashlib.sha1(re.sub(r"\s+", " ", text).strip().lower().encode("utf-8")).hexdigest()
+
 
 class TechAnalysisState(BaseModel):
     """진짜 Agent 상태"""
@@ -44,6 +74,19 @@ class TechAnalysisState(BaseModel):
     patents_and_papers: List[str] = []
     
     confidence_score: float = 0.0
+    rewrite_count: int = 0
+
+    # 실행 예산 / 사용량
+    started_at: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    budget_exhausted: str = ""     # 소진된 예산 (llm_calls / prompt_tokens / wall_sec)
+    step_log: List[Dict] = []      # 단계별 {node, latency_sec, prompt_tokens, completion_tokens}
+
+    # 증거 저장소 (도구 결과를 중복 제거·분할해 보관, 메시지에는 참조만 남김)
+    evidence: List[Dict] = []      # {id, tool, rank, text, hash}
+    last_evidence_ids: List[str] = []
 
 
 class RelevanceGrade(BaseModel):
@@ -54,21 +97,25 @@ class RelevanceGrade(BaseModel):
 class TechSummaryAgent:
     """진짜 Agent 기반 기술 분석 시스템"""
     
-    def __init__(self, faiss_path=FAISS_DIR, embedding_model="nlpai-lab/KURE-v1"):
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model)
-        self.vectordb = FAISS.load_local(
-            folder_path=faiss_path,
-            embeddings=self.embeddings,
-            allow_dangerous_deserialization=True
-        )
-        self.llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+    def __init__(self, faiss_path=FAISS_DIR, embedding_model="nlpai-lab/KURE-v1", budget: Dict = None):
+        # ✅ 임베딩 / VectorDB는 레지스트리에서 공유 (프로세스당 1회 로드)
+        self.embeddings = get_embeddings(embedding_model)
+        self.vectordb = get_vectorstore(faiss_path, embedding_model)
+        self.retriever = get_retriever(faiss_path, embedding_model)
+        self.llm = get_llm(model="gpt-4o-mini", temperature=0)
         self.web_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
         
         # 전역 변수로 저장 (tool 함수에서 접근)
-        global _vectordb, _web_client, _kipris_tool
+        global _vectordb, _retriever, _web_client, _kipris_tool
         _vectordb = self.vectordb
+        _retriever = self.retriever
         _web_client = self.web_client
         _kipris_tool = KIPRISPatentTool()
+        self.rewrite_log: Dict[str, int] = {}
+        self.budget = {**DEFAULT_BUDGET, **(budget or {})}
+        self.evidence_token_budget = EVIDENCE_TOKEN_BUDGET
+        # 노드별 프롬프트 (로컬 레지스트리, 프로세스당 1회 컴파일)
+        self.prompts = {step: get_prompt(f"tech_summary.{step}") for step in ("agent", "grade", "rewrite", "generate")}
         
         print(f"✅ 진짜 Agent 초기화 완료")
         
@@ -87,6 +134,7 @@ class TechSummaryAgent:
         # 노드 추가
         workflow.add_node("agent", self._agent_node)
         workflow.add_node("tools", tool_node)  # ToolNode 사용
+        workflow.add_node("compact", self._compact_evidence)
         workflow.add_node("grade_documents", self._grade_documents)
         workflow.add_node("rewrite", self._rewrite_query)
         workflow.add_node("generate", self._generate_summary)
@@ -94,18 +142,20 @@ class TechSummaryAgent:
         # 시작
         workflow.add_edge(START, "agent")
         
-        # Agent가 도구 선택 (tools_condition 사용)
+        # Agent가 도구 선택 (tools_condition 사용, 예산 소진 시 요약으로)
         workflow.add_conditional_edges(
             "agent",
-            tools_condition,  # 진짜 Agent의 핵심
+            self._route_agent,
             {
                 "tools": "tools",  # Agent가 도구 호출
+                "generate": "generate",
                 END: END
             }
         )
         
-        # 도구 실행 후 관련성 평가
-        workflow.add_edge("tools", "grade_documents")
+        # 도구 실행 → 증거 저장소로 압축 → 관련성 평가
+        workflow.add_edge("tools", "compact")
+        workflow.add_edge("compact", "grade_documents")
         
         # 관련성 평가 후 분기
         workflow.add_conditional_edges(
@@ -125,6 +175,43 @@ class TechSummaryAgent:
         
         return workflow.compile()
     
+    # -----------------------------
+    # 실행 예산
+    # -----------------------------
+    def _exhausted(self, state: TechAnalysisState) -> str:
+        """소진된 예산 이름 (없으면 ""), 최종 요약용 LLM 호출 1회는 항상 남겨 둠"""
+        if state.budget_exhausted:
+            return state.budget_exhausted
+        if state.llm_calls >= self.budget["max_llm_calls"] - 1:
+            return "llm_calls"
+        if state.prompt_tokens >= self.budget["max_prompt_tokens"]:
+            return "prompt_tokens"
+        if state.started_at and time.time() - state.started_at >= self.budget["max_wall_sec"]:
+            return "wall_sec"
+        return ""
+
+    @staticmethod
+    def _usage(state: TechAnalysisState, node: str, started: float, message) -> Dict:
+        """LLM 호출 1회의 토큰 사용량 / 지연 시간을 누적한 state 업데이트"""
+        usage = getattr(message, "usage_metadata", None) or {}
+        prompt, completion = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        return {
+            "llm_calls": state.llm_calls + 1,
+            "prompt_tokens": state.prompt_tokens + prompt,
+            "completion_tokens": state.completion_tokens + completion,
+            "step_log": state.step_log + [{
+                "node": node,
+                "latency_sec": round(time.perf_counter() - started, 3),
+                "prompt_tokens": prompt,
+                "completion_tokens": completion,
+            }],
+        }
+
+    def _route_agent(self, state: TechAnalysisState) -> Literal["tools", "generate", "__end__"]:
+        if state.budget_exhausted:
+            return "generate"
+        return tools_condition(state)
+
     def _agent_node(self, state: TechAnalysisState) -> TechAnalysisState:
         """진짜 Agent - 도구를 bind하고 자동 선택"""
         print(f"\n🤖 Agent 실행 중...")
@@ -132,52 +219,105 @@ class TechSummaryAgent:
         # MVP: 간단한 무한루프 방지
         if len(state.messages) > 6:
             return {"messages": [HumanMessage(content="정보 수집 완료")]}
+
+        reason = self._exhausted(state)
+        if reason:
+            print(f"⛔ 예산 소진({reason}) → 최종 요약으로 이동")
+            return {"messages": [AIMessage(content="정보 수집 완료")], "budget_exhausted": reason}
         
         tools = [rag_search_tool, web_search_tool, kipris_search_tool]
         model_with_tools = self.llm.bind_tools(tools)
         
-        system_msg = f"""기술 분석 전문가로서 {state.company_name}의 {state.core_tech} 기술을 분석하세요.
-
-2-3회 도구 사용 후 "정보 수집 완료"라고 답하세요."""
+        system_msg = self.prompts["agent"].format(company=state.company_name, tech=state.core_tech)
         
         messages = [HumanMessage(content=system_msg)] + list(state.messages[1:])
+        started = time.perf_counter()
         response = model_with_tools.invoke(messages)
         
         print(f"💭 Agent 응답: {response.content if response.content else '도구 호출'}")
         
-        return {"messages": [response]}
+        return {"messages": [response], **self._usage(state, "agent", started, response)}
     
+    def _compact_evidence(self, state: TechAnalysisState) -> TechAnalysisState:
+        """
+        이번 턴 도구 결과(ToolMessage)를 증거 저장소로 이동
+        - 결과를 조각으로 나누고 이미 저장된 조각은 중복 제거
+        - 메시지 히스토리의 원문은 증거 ID 참조 + 짧은 미리보기로 교체 (같은 message id → add_messages가 치환)
+        """
+        evidence = list(state.evidence)
+        seen = {e["hash"]: e["id"] for e in evidence}
+        replaced, latest = [], []
+
+        # 마지막 Agent 응답 이후의 ToolMessage만 (이전 턴은 이미 압축됨)
+        for msg in reversed(state.messages):
+            if not isinstance(msg, ToolMessage):
+                break
+            ids, new = [], 0
+            for rank, piece in enumerate(split_evidence(str(msg.content))):
+                h = evidence_hash(piece)
+                if h not in seen:
+                    seen[h] = f"E{len(evidence) + 1}"
+                    evidence.append({"id": seen[h], "tool": msg.name, "rank": rank, "text": piece, "hash": h})
+                    new += 1
+                ids.append(seen[h])
+            latest += ids
+
+            if ids:
+                preview = str(msg.content)[:120].replace("\n", " ")
+                content = f"[{msg.name} 결과 → 증거 {', '.join(ids)} (신규 {new} / 중복 {len(ids) - new})] {preview}..."
+            else:
+                content = str(msg.content)[:200]
+            replaced.append(ToolMessage(content=content, tool_call_id=msg.tool_call_id, name=msg.name, id=msg.id))
+
+        print(f"🗂️ 증거 저장소: {len(evidence) - len(state.evidence)}개 추가 (총 {len(evidence)}개)")
+        return {"messages": replaced, "evidence": evidence, "last_evidence_ids": list(dict.fromkeys(latest))}
+
+    def _select_evidence(self, state: TechAnalysisState) -> str:
+        """회사/기술 키워드와의 어휘 겹침 + 검색 결과 내 순위로 정렬한 증거를 토큰 예산만큼 선택"""
+        query_tokens = set(tokenize_ko(f"{state.company_name} {state.core_tech} {state.pros}"))
+
+        def score(e: Dict) -> float:
+            overlap = len(set(tokenize_ko(e["text"])) & query_tokens) / (len(query_tokens) or 1)
+            return overlap + 1.0 / (1 + e["rank"])
+
+        picked, used = [], 0
+        for e in sorted(state.evidence, key=score, reverse=True):
+            tokens = self.llm.get_num_tokens(e["text"])
+            if used + tokens > self.evidence_token_budget:
+                continue
+            picked.append(f"[{e['id']}] {e['text']}")
+            used += tokens
+        return "\n\n".join(picked)
+
     def _grade_documents(self, state: TechAnalysisState) -> TechAnalysisState:
         """LLM이 정보 충분성 평가"""
         print("🔍 정보 충분성 평가 중...")
+
+        reason = self._exhausted(state)
+        if reason:
+            print(f"⛔ 예산 소진({reason}) → 평가 생략")
+            state.budget_exhausted = reason
+            return state
         
-        # 마지막 도구 실행 결과 추출
-        last_message = state.messages[-1]
-        retrieved_docs = last_message.content if hasattr(last_message, 'content') else ""
-        
-        llm_with_tool = self.llm.with_structured_output(RelevanceGrade)
+        # 이번 턴에 수집된 증거 (히스토리의 도구 메시지는 참조로 압축되어 있음)
+        by_id = {e["id"]: e["text"] for e in state.evidence}
+        retrieved_docs = "\n\n".join(by_id[i] for i in state.last_evidence_ids if i in by_id)
+        if not retrieved_docs:
+            last_message = state.messages[-1]
+            retrieved_docs = last_message.content if hasattr(last_message, 'content') else ""
         
-        prompt = PromptTemplate(
-            template="""다음 정보가 "{company}"의 "{tech}" 기술 분석에 충분한지 평가하세요:
-
-검색 결과:
-{docs}
-
-평가 기준:
-1. 기술의 작동 원리가 설명되어 있는가?
-2. 경쟁 기술과의 차별점이 있는가?
-3. 특허나 연구 성과가 언급되는가?
-
-충분하면 'yes', 부족하면 'no'를 반환하세요.""",
-            input_variables=["company", "tech", "docs"]
-        )
+        llm_with_tool = self.llm.with_structured_output(RelevanceGrade, include_raw=True)
         
-        chain = prompt | llm_with_tool
-        result = chain.invoke({
+        chain = self.prompts["grade"].template | llm_with_tool
+        started = time.perf_counter()
+        output = chain.invoke({
             "company": state.company_name,
             "tech": state.core_tech,
             "docs": str(retrieved_docs)[:1000]
         })
+        for key, value in self._usage(state, "grade_documents", started, output["raw"]).items():
+            setattr(state, key, value)
+        result = output["parsed"] or RelevanceGrade(binary_score="no")
         
         print(f"📊 평가 결과: {result.binary_score}")
         
@@ -187,6 +327,8 @@ class TechSummaryAgent:
     
     def _decide_next_step(self, state: TechAnalysisState) -> Literal["rewrite", "generate"]:
         """다음 단계 결정"""
+        if state.budget_exhausted:
+            return "generate"
         if state.confidence_score >= 70:
             print("✅ 충분한 정보 수집됨")
             return "generate"
@@ -198,63 +340,42 @@ class TechSummaryAgent:
         """LLM이 검색 쿼리 개선"""
         print(f"✍️ 검색 쿼리 재작성 중...")
         
-        prompt = f"""다음 기술 분석을 위해 더 나은 검색 쿼리를 작성하세요:
-
-회사: {state.company_name}
-기술: {state.core_tech}
-
-현재까지 수집된 정보가 부족합니다. 
-기술의 핵심 원리, 경쟁 기술과의 차별점, 특허 및 연구 성과를 찾을 수 있는 개선된 검색 쿼리를 제안하세요.
-
-개선된 검색 쿼리:"""
+        prompt = self.prompts["rewrite"].format(company=state.company_name, tech=state.core_tech)
         
+        started = time.perf_counter()
         response = self.llm.invoke([HumanMessage(content=prompt)])
         improved_query = response.content.strip()
         
         print(f"💡 개선된 쿼리: {improved_query}")
         
-        return {"messages": [HumanMessage(content=improved_query)]}
+        return {
+            "messages": [HumanMessage(content=improved_query)],
+            "rewrite_count": state.rewrite_count + 1,
+            **self._usage(state, "rewrite", started, response),
+        }
     
     def _generate_summary(self, state: TechAnalysisState) -> TechAnalysisState:
         """최종 요약 생성"""
         print("📝 최종 요약 생성 중...")
         
-        # 모든 메시지에서 도구 실행 결과 추출
-        all_evidence = []
-        for msg in state.messages:
-            if hasattr(msg, 'content') and msg.content:
-                all_evidence.append(str(msg.content))
-        
-        combined_evidence = "\n\n".join(all_evidence[-5:])  # 최근 5개
-        
-        prompt = PromptTemplate(
-            template="""다음 정보를 바탕으로 투자 관점의 기술 요약을 JSON 형식으로 생성하세요:
-
-회사: {company}
-핵심 기술: {tech}
-강점: {pros}
-
-수집된 정보:
-{evidence}
-
-JSON 형식으로 출력:
-{{
-    "tech_summary": "기술 요약 (300-500자)",
-    "strengths_and_weaknesses": "강점/약점 분석",
-    "differentiation_points": "차별점",
-    "technical_risks": "기술 리스크",
-    "patents_and_papers": ["특허1", "논문1"]
-}}""",
-            input_variables=["company", "tech", "pros", "evidence"]
-        )
+        # 증거 저장소에서 상위 증거를 토큰 예산만큼 선택
+        combined_evidence = self._select_evidence(state)
+        if not combined_evidence:
+            # 도구를 한 번도 쓰지 않은 경우: 메시지 내용으로 대체
+            all_evidence = [str(msg.content) for msg in state.messages if hasattr(msg, 'content') and msg.content]
+            combined_evidence = "\n\n".join(all_evidence[-5:])[:2000]
         
-        chain = prompt | self.llm | StrOutputParser()
-        summary = chain.invoke({
+        chain = self.prompts["generate"].template | self.llm
+        started = time.perf_counter()
+        response = chain.invoke({
             "company": state.company_name,
             "tech": state.core_tech,
             "pros": state.pros,
-            "evidence": combined_evidence[:2000]
+            "evidence": combined_evidence
         })
+        for key, value in self._usage(state, "generate", started, response).items():
+            setattr(state, key, value)
+        summary = response.content
         
         try:
             cleaned = summary.strip().replace('```json', '').replace('```', '')
@@ -284,7 +405,8 @@ JSON 형식으로 출력:
             patents=state.patents,
             investments="",
             pros=state.pros,
-            owner=state.owner
+            owner=state.owner,
+            started_at=time.time()
         )
 
         # graph.invoke → dict 반환
@@ -300,6 +422,20 @@ JSON 형식으로 출력:
         state.technical_risks = final_state.technical_risks
         state.patents_and_papers = final_state.patents_and_papers
         state.confidence_score = final_state.confidence_score
+        # rewrite → agent 반복 횟수 (하이브리드 검색 효과 측정용)
+        self.rewrite_log[state.company_name] = final_state.rewrite_count
+        state.metrics = {
+            **state.metrics,
+            "tech_summary.llm_calls": final_state.llm_calls,
+            "tech_summary.prompt_tokens": final_state.prompt_tokens,
+            "tech_summary.completion_tokens": final_state.completion_tokens,
+            "tech_summary.wall_sec": round(time.time() - final_state.started_at, 2),
+            "tech_summary.budget_exhausted": final_state.budget_exhausted,
+            "tech_summary.rewrites": final_state.rewrite_count,
+            "tech_summary.evidence_items": len(final_state.evidence),
+            "tech_summary.steps": final_state.step_log,
+            **prompt_metrics(*self.prompts.values()),
+        }
 
         return state
 # ============================================
@@ -320,8 +456,7 @@ def rag_search_tool(query: str) -> str:
     print(f"📚 RAG 검색: {query}")
     
     try:
-        retriever = _vectordb.as_retriever(search_kwargs={'k': 5})
-        docs = retriever.invoke(query)
+        docs = _retriever.search(query, k=5)
         
         if docs:
             result = "\n\n".join([doc.page_content for doc in docs])
@@ -349,7 +484,7 @@ def web_search_tool(query: str) -> str:
     print(f"🌐 웹 검색: {query}")
     
     try:
-        response = _web_client.search(query=query, search_depth="advanced", max_results=5)
+        response = cached_tavily_search(_web_client, query, search_depth="advanced", max_results=5)
         results = response.get("results", [])
         
         if results:
@@ -384,6 +519,7 @@ class KIPRISPatentTool:
                 'ServiceKey': self.service_key
             }
             
+            throttle("kipris")
             response = requests.get(self.base_url, params=params, timeout=10)
             if response.status_code != 200:
                 return []
@@ -1,45 +1,120 @@
-from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
+from typing import Annotated, Dict, Optional, TypedDict
+from langgraph.graph import StateGraph, START, END
+from InvestmentState import InvestmentState
 import os
 
-class GraphState(dict):
+# ✅ 병렬 분석 브랜치별로 InvestmentState에 쓰는 필드 (브랜치끼리 겹치지 않음)
+TECH_FIELDS = (
+    "tech_summary", "strengths_and_weaknesses", "differentiation_points",
+    "technical_risks", "patents_and_papers", "confidence_score",
+)
+MARKET_FIELDS = (
+    "industry_trends", "market_size", "regulatory_barriers", "customer_segments",
+)
+COMPETITOR_FIELDS = (
+    "main_competitors", "competitor_profiles", "market_positioning", "product_comparison",
+    "unique_value_props", "threat_analysis", "market_share", "reference_urls",
+)
+
+
+def merge_state(left: Optional[InvestmentState], right: Optional[InvestmentState]) -> InvestmentState:
+    """
+    병렬 브랜치 결과 병합 reducer
+    - right에서 명시적으로 설정된 필드(model_fields_set)만 left에 덮어씀
+    - metrics 는 브랜치별 지표를 합침
+    """
+    if left is None:
+        return right
+    if right is None:
+        return left
+    updates = {k: getattr(right, k) for k in right.model_fields_set}
+    if "metrics" in updates:
+        updates["metrics"] = {**left.metrics, **right.metrics}
+    return left.model_copy(update=updates)
+
+
+class GraphState(TypedDict):
     """전체 워크플로우 상태 (공용 state)"""
-    pass
+    state: Annotated[InvestmentState, merge_state]
+
+
+def _partial(state: InvestmentState, fields) -> InvestmentState:
+    """지정한 필드만 설정된 부분 state (검증 없이 값 그대로 전달)"""
+    values = {f: getattr(state, f) for f in fields}
+    return InvestmentState.model_construct(_fields_set=set(fields), **values)
+
+
+def _explorer_node(explorer):
+    def node(s: GraphState) -> Dict:
+        state = s["state"]
+        # 이미 Explorer 결과가 채워진 state라면 재탐색하지 않음
+        if explorer is None or "core_tech" in state.model_fields_set:
+            return {}
+        return {"state": explorer.analyze_single_company(state.company_name)}
+    return node
 
-def build_total_agent_graph(filename="total_agent_graph.png"):
-    """전체 에이전트 워크플로우 정의 후 컴파일 & PNG 저장"""
+
+def _branch_node(agent, fields):
+    def node(s: GraphState) -> Dict:
+        if agent is None:
+            return {}
+        # Agent는 state를 직접 수정하므로 브랜치마다 사본을 넘기고 담당 필드만 반환
+        result = agent.run(s["state"].model_copy(deep=True))
+        return {"state": _partial(result, fields + ("metrics",))}
+    return node
+
+
+def _sequential_node(agent):
+    def node(s: GraphState) -> Dict:
+        if agent is None:
+            return {}
+        return {"state": agent.run(s["state"].model_copy(deep=True))}
+    return node
+
+
+def build_total_agent_graph(agents: Optional[Dict[str, object]] = None,
+                            explorer=None,
+                            filename: Optional[str] = "total_agent_graph.png",
+                            checkpointer=None):
+    """
+    전체 에이전트 워크플로우 정의 후 컴파일 (& PNG 저장)
+    - TechSummary / MarketEval / Competitor 는 Explorer 이후 병렬 실행, InvestmentAgent 전에 합류
+    - agents를 넘기지 않으면 노드는 state를 그대로 통과 (그래프 시각화 용도)
+    """
+    agents = agents or {}
     workflow = StateGraph(GraphState)
 
     # 노드 정의
-    workflow.add_node("ExplorerAgent", lambda s: s)
-    workflow.add_node("TechSummaryAgent", lambda s: s)
-    workflow.add_node("MarketEvalAgent", lambda s: s)
-    workflow.add_node("CompetitorAgent", lambda s: s)
-    workflow.add_node("InvestmentAgent", lambda s: s)
-    workflow.add_node("ReportAgent", lambda s: s)
-
-    # 순차 연결
+    workflow.add_node("ExplorerAgent", _explorer_node(explorer))
+    workflow.add_node("TechSummaryAgent", _branch_node(agents.get("tech"), TECH_FIELDS))
+    workflow.add_node("MarketEvalAgent", _branch_node(agents.get("market"), MARKET_FIELDS))
+    workflow.add_node("CompetitorAgent", _branch_node(agents.get("competitor"), COMPETITOR_FIELDS))
+    workflow.add_node("InvestmentAgent", _sequential_node(agents.get("investment")))
+    workflow.add_node("ReportAgent", _sequential_node(agents.get("report")))
+
+    # Explorer → 3개 분석 브랜치 병렬 (fan-out)
+    workflow.add_edge(START, "ExplorerAgent")
     workflow.add_edge("ExplorerAgent", "TechSummaryAgent")
-    workflow.add_edge("TechSummaryAgent", "MarketEvalAgent")
-    workflow.add_edge("MarketEvalAgent", "CompetitorAgent")
-    workflow.add_edge("CompetitorAgent", "InvestmentAgent")
+    workflow.add_edge("ExplorerAgent", "MarketEvalAgent")
+    workflow.add_edge("ExplorerAgent", "CompetitorAgent")
+
+    # 3개 브랜치가 모두 끝난 뒤 InvestmentAgent 실행 (fan-in)
+    workflow.add_edge(["TechSummaryAgent", "MarketEvalAgent", "CompetitorAgent"], "InvestmentAgent")
     workflow.add_edge("InvestmentAgent", "ReportAgent")
     workflow.add_edge("ReportAgent", END)
 
-    workflow.set_entry_point("ExplorerAgent")
-
     # ✅ compile
-    memory = MemorySaver()
-    app = workflow.compile(checkpointer=memory)
+    app = workflow.compile(checkpointer=checkpointer)
 
-    # ✅ 저장 경로
-    output_path = os.path.join("reports", filename)
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if filename:
+        # ✅ 저장 경로
+        output_path = os.path.join("reports", filename)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    # ✅ mermaid → PNG 저장
-    png_bytes = app.get_graph().draw_mermaid_png()
-    with open(output_path, "wb") as f:
-        f.write(png_bytes)
+        # ✅ mermaid → PNG 저장
+        png_bytes = app.get_graph().draw_mermaid_png()
+        with open(output_path, "wb") as f:
+            f.write(png_bytes)
 
-    print(f"✅ 에이전트 그래프가 {output_path} 로 저장되었습니다.")
+        print(f"✅ 에이전트 그래프가 {output_path} 로 저장되었습니다.")
     return app
@@ -0,0 +1,88 @@
+"""
+근사 인덱스 벤치마크: Flat vs IVF-Flat / HNSW / IVF-PQ
+- 클러스터형 합성 코퍼스(최대 1M 청크)로 빌드 시간, 메모리, 쿼리 지연, Flat 대비 recall@k 측정
+- 실행: python -m benchmarks.bench_ann [--sizes=10000,100000,1000000] [--dim=128]
+"""
+import argparse
+import time
+import numpy as np
+import faiss
+from util_resources import current_rss_mb
+from util_retrieval import configure_index
+from util_vectorstore import make_index, INDEX_TYPES
+
+K = 10
+N_QUERIES = 1000
+TRAIN_SIZE = 40_000
+ADD_BATCH = 50_000
+SEARCH_PARAMS = {"nprobe": 16, "ef_search": 64}
+
+
+def synthetic_corpus(n: int, dim: int, seed: int = 0):
+    """기업/문서 단위 군집을 흉내 낸 가우시안 혼합 (순수 난수보다 실제 임베딩 분포에 가까움)"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, n // 100), dim)).astype("float32")
+    labels = rng.integers(0, len(centers), size=n)
+    vectors = centers[labels] + rng.normal(scale=0.5, size=(n, dim)).astype("float32")
+    queries = centers[rng.integers(0, len(centers), size=N_QUERIES)]
+    queries = queries + rng.normal(scale=0.5, size=queries.shape).astype("float32")
+    return vectors, queries.astype("float32")
+
+
+def build(index_type: str, vectors: np.ndarray):
+    """VectorDBBuilder와 같은 방식: 처음 TRAIN_SIZE개로 학습 → 고정 크기 배치로 추가"""
+    rss_before, started = current_rss_mb(), time.perf_counter()
+    sample = vectors[:TRAIN_SIZE]
+    index = make_index(index_type, vectors.shape[1], n_train=len(sample))
+    if not index.is_trained:
+        index.train(sample)
+    for i in range(0, len(vectors), ADD_BATCH):
+        index.add(vectors[i:i + ADD_BATCH])
+    configure_index(index, {"params": SEARCH_PARAMS})
+    build_sec = time.perf_counter() - started
+    return index, build_sec, current_rss_mb() - rss_before
+
+
+def query(index: faiss.Index, queries: np.ndarray):
+    # 단건·단일 스레드 쿼리 지연 (rag_search 호출 패턴과 동일)
+    threads = faiss.omp_get_max_threads()
+    faiss.omp_set_num_threads(1)
+    started = time.perf_counter()
+    found = np.vstack([index.search(q[None, :], K)[1] for q in queries])
+    latency = (time.perf_counter() - started) / len(queries) * 1000
+    faiss.omp_set_num_threads(threads)
+    return found, latency
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / K for f, t in zip(found, truth)]))
+
+
+def run(n: int, dim: int):
+    vectors, queries = synthetic_corpus(n, dim)
+    truth = None
+    for index_type in INDEX_TYPES:
+        index, build_sec, rss_mb = build(index_type, vectors)
+        size_mb = faiss.serialize_index(index).size / (1024 * 1024)
+        found, latency = query(index, queries)
+        if truth is None:
+            truth = found  # INDEX_TYPES[0] == "flat" → 정답
+        print(f"{n:>9} {index_type:>9} {build_sec:>9.2f} {rss_mb:>9.1f} {size_mb:>9.1f} "
+              f"{latency:>9.3f} {recall_at_k(found, truth):>9.3f}")
+        del index
+
+
+def main(sizes=(10_000, 100_000, 1_000_000), dim: int = 128):
+    print(f"{'chunks':>9} {'index':>9} {'build s':>9} {'rss MB':>9} {'size MB':>9} "
+          f"{'ms/query':>9} {'recall@' + str(K):>9}")
+    for n in sizes:
+        run(n, dim)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="근사 인덱스 벤치마크")
+    parser.add_argument("--sizes", type=lambda s: tuple(int(x) for x in s.split(",")),
+                        default=(10_000, 100_000, 1_000_000), help="코퍼스 크기 목록 (쉼표 구분)")
+    parser.add_argument("--dim", type=int, default=128)
+    args = parser.parse_args()
+    main(sizes=args.sizes, dim=args.dim)
@@ -0,0 +1,86 @@
+"""
+기업 목록 로드 벤치마크: docstore 전체 스캔 vs 기업 카탈로그(catalog.json)
+- 기업 수는 고정하고 청크 수를 늘려가며 시작 시 기업 목록/파티션 준비 시간 측정
+- 실행: python -m benchmarks.bench_catalog
+"""
+import time
+import tempfile
+import numpy as np
+import faiss
+from langchain_core.embeddings import FakeEmbeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from util_retrieval import chunk_id_prefix, build_catalog, save_catalog, load_catalog, catalog_partitions
+
+DIM = 8
+N_COMPANIES = 100
+
+
+def build_store(n_chunks: int, seed: int = 0):
+    """기업별 PDF 1개씩, 청크 ID는 VectorDBBuilder와 같은 '<sha 접두어>-<파일명 해시>-<순번>' 규칙"""
+    rng = np.random.default_rng(seed)
+    per_company = n_chunks // N_COMPANIES
+    store = FAISS(
+        embedding_function=FakeEmbeddings(size=DIM),
+        index=faiss.IndexFlatL2(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={}
+    )
+    manifest = {"pdfs": {}}
+    for c in range(N_COMPANIES):
+        prefix = chunk_id_prefix(f"{c:016x}", f"c{c}.pdf")
+        ids = [f"{prefix}-{i:05d}" for i in range(per_company)]
+        vectors = rng.normal(size=(per_company, DIM)).astype("float32")
+        store.add_embeddings(
+            [(f"chunk {i}", v.tolist()) for i, v in zip(ids, vectors)],
+            metadatas=[{"company": f"c{c}", "page": i // 10} for i in range(per_company)],
+            ids=ids
+        )
+        manifest["pdfs"][f"c{c}.pdf"] = {
+            "sha256": f"{c:016x}", "company": f"c{c}", "pages": per_company // 10 + 1,
+            "chunk_ids": ids, "page_range": [0, (per_company - 1) // 10],
+        }
+    return store, manifest
+
+
+def scan_companies(store: FAISS):
+    # ExplorerAgent.get_available_companies의 카탈로그 없는 경로와 동일
+    companies = set()
+    for doc_id in store.index_to_docstore_id.values():
+        metadata = store.docstore.search(doc_id).metadata
+        if "company" in metadata:
+            companies.add(metadata["company"])
+    return sorted(companies)
+
+
+def timed(fn, repeat: int = 3):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return result, best * 1000
+
+
+def run(n_chunks: int):
+    store, manifest = build_store(n_chunks)
+    with tempfile.TemporaryDirectory() as tmp:
+        save_catalog(tmp, build_catalog(manifest, store.index_to_docstore_id))
+
+        scanned, scan_ms = timed(lambda: scan_companies(store))
+        catalog, load_ms = timed(lambda: load_catalog(tmp))
+        listed, list_ms = timed(lambda: list(catalog["companies"].keys()))
+        _, part_ms = timed(lambda: catalog_partitions(catalog))
+
+    assert scanned == listed
+    print(f"{n_chunks:>10} {scan_ms:>12.2f} {load_ms + list_ms:>14.2f} {part_ms:>14.2f}")
+
+
+def main(chunk_grid=(1_000, 10_000, 50_000, 100_000, 200_000)):
+    print(f"{'chunks':>10} {'scan ms':>12} {'catalog ms':>14} {'partitions ms':>14}")
+    for n in chunk_grid:
+        run(n)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+동시 실행 처리량 벤치마크 (네트워크 없이 실행)
+- LLM/검색 호출을 time.sleep 지연으로 흉내 내는 stub Agent로 Pipeline.run_companies 측정
+- 실행: python -m benchmarks.bench_concurrency
+"""
+import time
+from InvestmentState import InvestmentState
+from pipeline import Pipeline
+
+LATENCY_SEC = 0.05   # 호출 1회당 주입 지연
+
+
+class StubExplorer:
+    def __init__(self, companies):
+        self.companies = companies
+
+    def get_available_companies(self):
+        return list(self.companies)
+
+    def analyze_single_company(self, company_name: str) -> InvestmentState:
+        time.sleep(LATENCY_SEC)
+        return InvestmentState(company_name=company_name, core_tech="stub")
+
+
+class StubAgent:
+    """run() 한 번에 calls회의 원격 호출을 흉내"""
+    def __init__(self, field: str, calls: int = 1):
+        self.field = field
+        self.calls = calls
+
+    def run(self, state: InvestmentState) -> InvestmentState:
+        for _ in range(self.calls):
+            time.sleep(LATENCY_SEC)
+        setattr(state, self.field, f"{state.company_name}-{self.field}")
+        return state
+
+
+def stub_agents():
+    return {
+        "tech": StubAgent("tech_summary", calls=3),
+        "market": StubAgent("market_size", calls=3),
+        "competitor": StubAgent("main_competitors", calls=2),
+        "investment": StubAgent("decision", calls=1),
+        "report": StubAgent("report_path", calls=1),
+    }
+
+
+def main(n_companies: int = 16, worker_grid=(1, 2, 4, 8, 16)):
+    companies = [f"company_{i:03d}" for i in range(n_companies)]
+    baseline = None
+
+    print(f"{'workers':>8} {'sec':>8} {'companies/s':>12} {'speedup':>8}")
+    for workers in worker_grid:
+        pipeline = Pipeline(explorer=StubExplorer(companies), agents=stub_agents(), max_workers=workers)
+
+        started = time.perf_counter()
+        states = pipeline.run_companies()
+        elapsed = time.perf_counter() - started
+
+        # 결과 순서가 입력 순서와 같은지 확인
+        assert [s.company_name for s in states] == companies
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>8.2f} {n_companies / elapsed:>12.2f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
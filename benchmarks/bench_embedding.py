@@ -0,0 +1,75 @@
+"""
+임베딩 처리량 벤치마크 (CPU)
+- 설정(batch_size / threads / quantize)별 chunks/sec 와 fp32 대비 cosine drift(평균 / 최소) 측정
+- 코퍼스: data/*.pdf 청크 (없으면 합성 한국어 문장)
+- 실행: python -m benchmarks.bench_embedding [--chunks=512] [--model=nlpai-lab/KURE-v1]
+"""
+import argparse
+import os
+import time
+from glob import glob
+import numpy as np
+from util_embeddings import build_embeddings
+
+SETTINGS_GRID = [
+    {"quantize": "none", "batch_size": 16},
+    {"quantize": "none", "batch_size": 32},
+    {"quantize": "none", "batch_size": 64},
+    {"quantize": "none", "batch_size": 32, "threads": 1},
+    {"quantize": "none", "batch_size": 32, "threads": max(1, (os.cpu_count() or 2) // 2)},
+    {"quantize": "int8", "batch_size": 32},
+    {"quantize": "onnx", "batch_size": 32},
+]
+
+
+def load_texts(n_chunks: int):
+    from util_vectorstore import parse_pdf
+    texts = []
+    for pdf in sorted(glob(os.path.join("data", "*.pdf"))):
+        texts += [d.page_content for d in parse_pdf(pdf)[2]]
+        if len(texts) >= n_chunks:
+            break
+    if not texts:
+        words = ["인공지능", "신약", "플랫폼", "특허", "매출", "투자", "QG3030", "임상", "반도체", "기술"]
+        rng = np.random.default_rng(0)
+        texts = [" ".join(rng.choice(words, size=120)) for _ in range(n_chunks)]
+    return (texts * (n_chunks // len(texts) + 1))[:n_chunks]
+
+
+def embed(settings: dict, model_name: str, texts, default_threads: int):
+    # threads는 프로세스 전역이므로 지정하지 않은 설정은 원래 스레드 수로 되돌림
+    embeddings = build_embeddings(model_name, {"threads": default_threads, **settings, "normalize": False})
+    embeddings.embed_documents(texts[:8])  # 워밍업 (ONNX export / 스레드 풀 생성 제외)
+    started = time.perf_counter()
+    vectors = np.asarray(embeddings.embed_documents(texts), dtype="float32")
+    return vectors, len(texts) / (time.perf_counter() - started)
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+
+
+def main(n_chunks: int = 512, model_name: str = "nlpai-lab/KURE-v1"):
+    import torch
+    default_threads = torch.get_num_threads()
+    texts = load_texts(n_chunks)
+    baseline = None
+    print(f"{'settings':<52} {'chunks/s':>10} {'cos mean':>10} {'cos min':>10}")
+    for settings in SETTINGS_GRID:
+        try:
+            vectors, throughput = embed(settings, model_name, texts, default_threads)
+        except Exception as e:  # onnx 백엔드 미설치 등
+            print(f"{str(settings):<52} {'skip':>10}  ({e})")
+            continue
+        if baseline is None:
+            baseline = vectors  # 첫 설정(fp32) 기준
+        drift = cosine(vectors, baseline)
+        print(f"{str(settings):<52} {throughput:>10.1f} {drift.mean():>10.5f} {drift.min():>10.5f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="임베딩 처리량 벤치마크")
+    parser.add_argument("--chunks", type=int, default=512)
+    parser.add_argument("--model", default="nlpai-lab/KURE-v1")
+    args = parser.parse_args()
+    main(n_chunks=args.chunks, model_name=args.model)
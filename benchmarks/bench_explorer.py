@@ -0,0 +1,43 @@
+"""
+ExplorerAgent 모드 비교: extract(필드별 RAG 동시 검색 → 구조화 출력 1회) vs react(ReAct AgentExecutor)
+- 기업별 LLM 호출 수, 도구(RAG/웹) 호출 수, 지연 시간, 채워진 필드 수 측정 (OpenAI / Tavily 키 필요)
+- LLM 캐시가 결과를 가리지 않도록 LLM_CACHE=0 으로 실행 권장
+- 실행: LLM_CACHE=0 python -m benchmarks.bench_explorer [--companies=3]
+"""
+import argparse
+from agents.explorer_agent import ExplorerAgent, FIELD_QUERIES
+from agents.tech_summary_agent import FAISS_DIR
+
+
+def run(explorer: ExplorerAgent, companies):
+    rows = []
+    for company in companies:
+        if explorer.mode == "extract":
+            state = explorer.extract_single_company(company)
+            tools = state.metrics["explorer.rag_queries"] + state.metrics["explorer.web_queries"]
+        else:
+            state = explorer.react_single_company(company)
+            tools = state.metrics["explorer.tool_calls"]
+        filled = sum(bool(getattr(state, field)) for field in FIELD_QUERIES)
+        rows.append((state.metrics["explorer.llm_calls"], tools, state.metrics["explorer.latency_sec"], filled))
+    return rows
+
+
+def main(n_companies: int = 3):
+    explorer = ExplorerAgent(faiss_path=FAISS_DIR)
+    companies = explorer.get_available_companies()[:n_companies]
+
+    print(f"{'mode':>8} {'LLM calls':>10} {'tool calls':>11} {'sec/company':>12} {'fields':>7}")
+    for mode in ("react", "extract"):
+        explorer.mode = mode
+        rows = run(explorer, companies)
+        n = max(len(rows), 1)
+        llm, tools, sec, filled = (sum(col) / n for col in zip(*rows)) if rows else (0, 0, 0, 0)
+        print(f"{mode:>8} {llm:>10.1f} {tools:>11.1f} {sec:>12.2f} {filled:>5.1f}/{len(FIELD_QUERIES)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ExplorerAgent 모드 비교")
+    parser.add_argument("--companies", type=int, default=3)
+    args = parser.parse_args()
+    main(n_companies=args.companies)
@@ -0,0 +1,73 @@
+"""
+하이브리드(BM25 + 벡터) 검색 벤치마크
+- 검색: 스토어에서 희귀 영문/숫자 토큰(제품 코드, 특허 번호 등)을 뽑아 "기업명 + 코드" 쿼리로
+        해당 토큰을 포함한 청크가 top-k에 들어오는 비율(hit@k)을 벡터 전용 vs 하이브리드로 비교
+- --agents: 기업별 TechSummaryAgent를 두 모드로 실행해 rewrite → agent 반복 횟수 비교 (LLM / 검색 API 필요)
+- 실행: python -m benchmarks.bench_hybrid [--agents] [--k=4]
+"""
+import argparse
+from collections import defaultdict
+from agents.tech_summary_agent import FAISS_DIR
+from util_resources import get_vectorstore, get_retriever, get_catalog
+from util_retrieval import tokenize_ko
+
+MAX_QUERIES = 200
+
+
+def code_queries(vectordb, max_df: int = 3):
+    """숫자를 포함한 4글자 이상 영문/숫자 토큰 중 max_df개 이하 청크에만 나오는 것 → (기업, 코드, 정답 청크 id)"""
+    postings = defaultdict(set)
+    for _, doc_id in vectordb.index_to_docstore_id.items():
+        doc = vectordb.docstore.search(doc_id)
+        for token in set(tokenize_ko(doc.page_content)):
+            if len(token) >= 4 and token.isascii() and any(ch.isdigit() for ch in token):
+                postings[(doc.metadata.get("company"), token)].add(doc_id)
+    return [(c, t, ids) for (c, t), ids in sorted(postings.items()) if len(ids) <= max_df][:MAX_QUERIES]
+
+
+def retrieval(k: int):
+    vectordb = get_vectorstore(FAISS_DIR)
+    retriever = get_retriever(FAISS_DIR)
+    if not getattr(vectordb.docstore, "has_sparse", False):
+        print("⚠️ 희소 인덱스 없음 → VectorDBBuilder로 스토어를 다시 저장하세요.")
+        return
+
+    queries = code_queries(vectordb)
+    print(f"{'mode':>8} {'hit@' + str(k):>8} {'queries':>8}")
+    for hybrid in (False, True):
+        retriever.hybrid = hybrid
+        hits = 0
+        for company, code, truth in queries:
+            docs = retriever.search(f"{company} {code}", company, k=k)
+            hits += any(d.id in truth for d in docs)
+        print(f"{'hybrid' if hybrid else 'dense':>8} {hits / max(len(queries), 1):>8.3f} {len(queries):>8}")
+    retriever.hybrid = True
+
+
+def agents():
+    from agents.explorer_agent import ExplorerAgent
+    from agents.tech_summary_agent import TechSummaryAgent
+
+    explorer, tech = ExplorerAgent(faiss_path=FAISS_DIR), TechSummaryAgent(faiss_path=FAISS_DIR)
+    catalog = get_catalog(FAISS_DIR)
+    companies = list(catalog["companies"]) if catalog else explorer.get_available_companies()
+    states = [explorer.analyze_single_company(c) for c in companies]
+
+    print(f"{'mode':>8} {'rewrites/company':>18}")
+    for hybrid in (False, True):
+        tech.retriever.hybrid = hybrid
+        tech.rewrite_log.clear()
+        for state in states:
+            tech.run(state.model_copy())
+        mean = sum(tech.rewrite_log.values()) / max(len(tech.rewrite_log), 1)
+        print(f"{'hybrid' if hybrid else 'dense':>8} {mean:>18.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="하이브리드(BM25 + 벡터) 검색 벤치마크")
+    parser.add_argument("--k", type=int, default=4)
+    parser.add_argument("--agents", action="store_true", help="TechSummaryAgent 반복 횟수도 비교")
+    args = parser.parse_args()
+    retrieval(k=args.k)
+    if args.agents:
+        agents()
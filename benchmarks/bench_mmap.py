@@ -0,0 +1,105 @@
+"""
+멀티 프로세스 워커 메모리 벤치마크: 일반 로드 vs mmap 로드 (FAISS_MMAP)
+- 합성 스토어를 저장한 뒤 워커 N개가 동시에 로드 → 검색하고 워커별 RSS / PSS / 콜드 스타트 시간 측정
+- PSS는 공유 페이지를 프로세스 수로 나눈 값 → mmap 모드에서 워커 수가 늘어도 합계가 거의 일정해야 함
+- 실행: python -m benchmarks.bench_mmap [--chunks=200000] [--workers=4]
+"""
+import argparse
+import os
+import time
+import tempfile
+import multiprocessing as mp
+import numpy as np
+import faiss
+from langchain_core.embeddings import FakeEmbeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from util_docstore import save_local, load_local
+from util_resources import current_rss_mb
+
+DIM = 1024   # KURE-v1 임베딩 차원
+N_QUERIES = 50
+
+
+def pss_mb() -> float:
+    """비례 상주 메모리(PSS, MB), Linux 전용 (없으면 0)"""
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return 0.0
+
+
+def build_store(path: str, n_chunks: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    store = FAISS(
+        embedding_function=FakeEmbeddings(size=DIM),
+        index=faiss.IndexFlatL2(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={}
+    )
+    for start in range(0, n_chunks, 10_000):
+        vectors = rng.normal(size=(min(10_000, n_chunks - start), DIM)).astype("float32")
+        store.add_embeddings(
+            [(f"chunk {start + i}", v.tolist()) for i, v in enumerate(vectors)],
+            metadatas=[{"company": f"c{(start + i) % 100}"} for i in range(len(vectors))]
+        )
+    save_local(store, path)
+
+
+def worker(path: str, mmap: bool, barrier, results):
+    rss_before = current_rss_mb()
+    started = time.perf_counter()
+    store = load_local(path, FakeEmbeddings(size=DIM), lazy=True, mmap=mmap)
+    load_sec = time.perf_counter() - started
+
+    # 실제 검색으로 인덱스 페이지를 건드린 뒤 측정
+    rng = np.random.default_rng(os.getpid())
+    for q in rng.normal(size=(N_QUERIES, DIM)):
+        store.similarity_search_by_vector(q.tolist(), k=4)
+
+    barrier.wait()  # 모든 워커가 로드를 끝낸 상태에서 측정해야 공유 페이지가 PSS에 반영됨
+    results.put((load_sec, current_rss_mb() - rss_before, pss_mb()))
+    barrier.wait()
+
+
+def run(path: str, n_workers: int, mmap: bool):
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(n_workers), ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(path, mmap, barrier, results)) for _ in range(n_workers)]
+    for p in procs:
+        p.start()
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    load = np.mean([r[0] for r in rows]) * 1000
+    rss = np.mean([r[1] for r in rows])
+    pss_total = sum(r[2] for r in rows)
+    name = "mmap" if mmap else "read"
+    print(f"{n_workers:>8} {name:>6} {load:>12.1f} {rss:>14.1f} {pss_total:>14.1f}")
+
+
+def main(n_chunks: int = 200_000, worker_grid=(1, 2, 4)):
+    with tempfile.TemporaryDirectory() as tmp:
+        build_store(tmp, n_chunks)
+        size_mb = os.path.getsize(os.path.join(tmp, "index.faiss")) / (1024 * 1024)
+        print(f"index.faiss: {n_chunks} chunks, {size_mb:.1f}MB")
+        print(f"{'workers':>8} {'mode':>6} {'load ms':>12} {'RSS+ MB/wkr':>14} {'PSS total MB':>14}")
+        for n in worker_grid:
+            for mmap in (False, True):
+                run(tmp, n, mmap)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="멀티 프로세스 워커 메모리 벤치마크")
+    parser.add_argument("--chunks", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, default=None, help="최대 워커 수 (1..N 측정, 기본 1 / 2 / 4)")
+    args = parser.parse_args()
+    main(
+        n_chunks=args.chunks,
+        worker_grid=tuple(range(1, args.workers + 1)) if args.workers else (1, 2, 4),
+    )
@@ -0,0 +1,82 @@
+"""
+기업 필터 검색 벤치마크: LangChain FAISS filter(후처리) vs CompanyPartitionedIndex
+- 합성 코퍼스(기업별 클러스터 벡터)로 기업 수를 늘려가며 recall@k 와 쿼리 지연 측정
+- 실행: python -m benchmarks.bench_partition
+"""
+import time
+import numpy as np
+import faiss
+from langchain_core.embeddings import FakeEmbeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+from util_retrieval import CompanyPartitionedIndex
+
+DIM = 256
+CHUNKS_PER_COMPANY = 40
+K = 4
+N_QUERIES = 200
+
+
+def build_corpus(n_companies: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_companies, DIM)).astype("float32")
+    vectors = np.repeat(centers, CHUNKS_PER_COMPANY, axis=0)
+    vectors += rng.normal(scale=1.0, size=vectors.shape).astype("float32")
+    companies = np.repeat(np.arange(n_companies), CHUNKS_PER_COMPANY)
+
+    store = FAISS(
+        embedding_function=FakeEmbeddings(size=DIM),
+        index=faiss.IndexFlatL2(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={}
+    )
+    store.add_embeddings(
+        [(f"chunk {i}", v.tolist()) for i, v in enumerate(vectors)],
+        metadatas=[{"company": f"c{c}", "chunk_idx": i} for i, c in enumerate(companies)]
+    )
+    return store, vectors, companies, rng
+
+
+def exact_topk(vectors, companies, query, company, k):
+    idx = np.where(companies == company)[0]
+    dist = ((vectors[idx] - query) ** 2).sum(axis=1)
+    return set(idx[np.argsort(dist)[:k]].tolist())
+
+
+def run(n_companies: int):
+    store, vectors, companies, rng = build_corpus(n_companies)
+    # 서브 인덱스는 전 기업 분량을 유지 → 생성 비용이 아닌 검색 지연만 비교
+    partitioned = {
+        mode: CompanyPartitionedIndex(store, mode=mode, max_subindexes=n_companies)
+        for mode in ("subindex", "selector")
+    }
+
+    queries = rng.normal(size=(N_QUERIES, DIM)).astype("float32")
+    targets = rng.integers(0, n_companies, size=N_QUERIES)
+    truth = [exact_topk(vectors, companies, q, t, K) for q, t in zip(queries, targets)]
+
+    def measure(search):
+        hits, started = 0, time.perf_counter()
+        for q, t, gt in zip(queries, targets, truth):
+            docs = search(q.tolist(), f"c{t}")
+            hits += len({d.metadata["chunk_idx"] for d in docs} & gt)
+        return hits / (K * N_QUERIES), (time.perf_counter() - started) / N_QUERIES * 1000
+
+    rows = {"post-filter": measure(
+        lambda v, c: store.similarity_search_by_vector(v, k=K, filter={"company": c}, fetch_k=20)
+    )}
+    for mode, index in partitioned.items():
+        rows[mode] = measure(lambda v, c, index=index: index.search_by_vector(v, c, k=K))
+
+    for name, (recall, latency) in rows.items():
+        print(f"{n_companies:>8} {name:>12} {recall:>10.3f} {latency:>10.3f}")
+
+
+def main(company_grid=(10, 50, 100, 300, 500)):
+    print(f"{'companies':>8} {'method':>12} {'recall@' + str(K):>10} {'ms/query':>10}")
+    for n in company_grid:
+        run(n)
+
+
+if __name__ == "__main__":
+    main()
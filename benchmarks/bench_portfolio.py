@@ -0,0 +1,67 @@
+"""
+포트폴리오 가중치 재계산 벤치마크 (네트워크 없이 실행)
+- 합성 점수 행렬(기업 × 6항목)에 대해 가중치 시나리오 여러 개의 총점 / 민감도 / top-k 지연 측정
+- 기준: InvestmentAgent.calculate_weighted_score (dict 컴프리헨션, 기업·시나리오 1쌍씩) 을 일부 표본으로 측정해 외삽
+- 실행: python -m benchmarks.bench_portfolio [--companies=5000] [--scenarios=5000] [--k=10]
+"""
+import argparse
+import time
+import numpy as np
+from util_portfolio import Portfolio, perturbed_weights, simplex_grid
+
+WEIGHTS = {
+    "owner_score": 0.30,
+    "market_score": 0.25,
+    "product_score": 0.15,
+    "competitor_score": 0.10,
+    "performance_score": 0.10,
+    "deal_score": 0.10,
+}
+SAMPLE = 200   # 기준(루프) 측정용 기업·시나리오 표본 수
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def loop_baseline(scores: np.ndarray, grid: np.ndarray, categories) -> float:
+    """표본 SAMPLE × SAMPLE 쌍을 dict 방식으로 계산 → 전체 크기로 외삽한 ms"""
+    rows = [dict(zip(categories, map(int, r))) for r in scores[:SAMPLE]]
+    weights = [dict(zip(categories, map(float, w))) for w in grid[:SAMPLE]]
+    started = time.perf_counter()
+    for w in weights:
+        for r in rows:
+            sum(r[k] * w[k] for k in w)
+    per_pair = (time.perf_counter() - started) / (len(rows) * len(weights))
+    return per_pair * len(scores) * len(grid) * 1000
+
+
+def main(n_companies: int = 5000, n_scenarios: int = 5000, k: int = 10):
+    categories = list(WEIGHTS)
+    rng = np.random.default_rng(0)
+    portfolio = Portfolio([f"company_{i:05d}" for i in range(n_companies)], categories,
+                          rng.integers(40, 101, size=(n_companies, len(categories))))
+    grid = perturbed_weights([WEIGHTS[c] for c in categories], n_scenarios)
+
+    _, totals_ms = timed(portfolio.totals, grid)
+    sens, sens_ms = timed(portfolio.sensitivity, grid, WEIGHTS)
+    _, topk_ms = timed(portfolio.top_k_indices, grid, k)
+    print(f"{'companies':>9} {'scenarios':>9} {'totals ms':>10} {'sensitivity ms':>15} {'top-k ms':>9} {'loop ms (est)':>14}")
+    print(f"{n_companies:>9} {n_scenarios:>9} {totals_ms:>10.1f} {sens_ms:>15.1f} {topk_ms:>9.1f} "
+          f"{loop_baseline(portfolio.scores, grid, categories):>14.0f}")
+    print(f"판정이 바뀌는 기업: {len(sens['flipped'])} / {n_companies} (상위 3: {sens['flipped'][:3]})")
+
+    full = simplex_grid(len(categories), step=0.05)
+    _, full_ms = timed(portfolio.sensitivity, full, WEIGHTS)
+    print(f"0.05 간격 전체 가중치 격자 {len(full)}개 민감도: {full_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="포트폴리오 가중치 재계산 벤치마크")
+    parser.add_argument("--companies", type=int, default=5000)
+    parser.add_argument("--scenarios", type=int, default=5000)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    main(n_companies=args.companies, n_scenarios=args.scenarios, k=args.k)
@@ -0,0 +1,58 @@
+"""
+InvestmentAgent 배치 채점 벤치마크 (OpenAI 키 필요)
+- 대상: checkpoint/01_company_desc_semantic.json 기업 (--copies배로 복제해 포트폴리오 크기 조절)
+- cold(항목 캐시 비어 있음) → 가중치만 변경 → market 입력만 변경 순서로 LLM 호출 수와 지연 측정
+- LLM 캐시가 결과를 가리지 않도록 LLM_CACHE=0 으로 실행 권장
+- 실행: LLM_CACHE=0 python -m benchmarks.bench_scoring [--copies=4] [--concurrency=4]
+"""
+import argparse
+import json
+import time
+from InvestmentState import InvestmentState
+from agents.investment_agent import InvestmentAgent
+from util_score_cache import SubScoreCache
+
+CHECKPOINT_PATH = "checkpoint/01_company_desc_semantic.json"
+
+
+def load_states(copies: int):
+    with open(CHECKPOINT_PATH, encoding="utf-8") as f:
+        companies = json.load(f)
+    return [
+        InvestmentState(**{**company, "company_name": f"{company['company_name']}#{i}" if i else company["company_name"]})
+        for i in range(copies) for company in companies
+    ]
+
+
+def measure(agent: InvestmentAgent, label: str, states):
+    started = time.perf_counter()
+    table = agent.score_many(states)
+    sec = time.perf_counter() - started
+    calls = sum(row["llm_calls"] for row in table)
+    failed = sum(row["status"] == "failed" for row in table)
+    print(f"{label:<16} {len(states):>9} {calls:>10} {failed:>7} {sec:>8.2f}")
+
+
+def main(copies: int = 4, concurrency: int = 4):
+    agent = InvestmentAgent(max_concurrency=concurrency)
+    agent.score_cache = SubScoreCache(":memory:")
+    states = load_states(copies)
+
+    print(f"{'run':<16} {'companies':>9} {'LLM calls':>10} {'failed':>7} {'sec':>8}")
+    measure(agent, "cold", states)
+
+    agent.weights = {**agent.weights, "owner_score": 0.20, "product_score": 0.25}
+    measure(agent, "weights only", states)
+
+    for state in states:
+        state.market_size = f"{state.market_size} (갱신)"
+    measure(agent, "market changed", states)
+    print(f"항목 캐시: {agent.score_cache.report()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="InvestmentAgent 배치 채점 벤치마크")
+    parser.add_argument("--copies", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    main(copies=args.copies, concurrency=args.concurrency)
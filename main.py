@@ -1,36 +1,44 @@
-from agents.explorer_agent import ExplorerAgent
-from agents.tech_summary_agent import TechSummaryAgent
-from agents.market_eval_agent import MarketEvalAgent
-from agents.competitor_agent import CompetitorAgent
-from agents.investment_agent import InvestmentAgent
-from agents.report_agent import ReportAgent
+from pipeline import Pipeline
 from dotenv import load_dotenv
 from agents.total_agent_graph import build_total_agent_graph
+from util_resources import registry
+from util_search_cache import get_search_cache
+from util_llm_cache import get_llm_cache
+from util_prompts import prompt_registry
+from util_score_cache import get_score_cache
 import os
+import sys
 
 load_dotenv()
 FAISS_DIR = "./faiss_db/unicorns_sementic"
 print("FAISS_DIR:", FAISS_DIR, os.path.exists(os.path.join(FAISS_DIR, "index.faiss")))
 
-def main():
-    explorer = ExplorerAgent(faiss_path=FAISS_DIR)
+def main(benchmark: bool = False):
+    # ✅ 모든 Agent를 한 번만 생성해 재사용
+    pipeline = Pipeline(faiss_path=FAISS_DIR)
 
-    # ✅ DB에 있는 모든 회사 → state 리스트 생성
-    states = explorer.run()
+    # ✅ DB에 있는 모든 회사를 기업 단위로 동시에 처리 (Explorer → ... → Report)
+    if benchmark:
+        states = pipeline.explore()
+        pipeline.benchmark(states)
+    else:
+        updated_states = pipeline.run_companies()
+        # ✅ 채점은 이미 끝났고, 남은 PDF 생성 작업만 대기
+        for job in pipeline.wait_reports():
+            print(f"📄 {job['company_name']}: {job['status']} {job['report_path']} ({job['run_sec']}s)")
+        print(f"✅ 보고서 큐: {pipeline.report_queue.report()}")
 
-    # ✅ 이후 각 state를 다른 Agent들에 넘기면서 업데이트
-    updated_states = []
-    for state in states:
-        state = TechSummaryAgent().run(state)
-        state = MarketEvalAgent().run(state)
-        state = CompetitorAgent().run(state)
-        state = InvestmentAgent().run(state)
-        state = ReportAgent().run(state)
-        updated_states.append(state)
-    
+    # ✅ 임베딩 모델 / FAISS 로드 횟수·시간·메모리 확인
+    registry.print_report()
+    print(f"✅ 검색 캐시: {get_search_cache().report()}")
+    if get_llm_cache() is not None:
+        print(f"✅ LLM 캐시: {get_llm_cache().report()}")
+    if get_score_cache() is not None:
+        print(f"✅ 항목 점수 캐시: {get_score_cache().report()}")
+    print(f"✅ 프롬프트: {prompt_registry.report()}")
 
-    build_total_agent_graph(app=None, filename="total_agent_graph.png")
+    build_total_agent_graph(filename="total_agent_graph.png")
     print("✅ 전체 그래프 저장 완료: total_agent_graph.png")
 
 if __name__ == "__main__":
-    main()
+    main(benchmark="--benchmark" in sys.argv)
@@ -0,0 +1,150 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from InvestmentState import InvestmentState
+from agents.explorer_agent import ExplorerAgent
+from agents.tech_summary_agent import TechSummaryAgent, FAISS_DIR
+from agents.market_eval_agent import MarketEvalAgent
+from agents.competitor_agent import CompetitorAgent
+from agents.investment_agent import InvestmentAgent
+from agents.report_agent import ReportAgent
+from agents.report_queue import ReportQueue
+from agents.total_agent_graph import build_total_agent_graph
+from util_resources import get_embeddings
+from util_docstore import is_legacy, ensure_migrated
+
+
+def build_agents(faiss_path: str = FAISS_DIR) -> Dict[str, object]:
+    """분석 Agent 세트 생성 (그래프, 체인, Executor, 스타일시트, HTTP 클라이언트 포함)"""
+    investment_agent = InvestmentAgent()
+    return {
+        "tech": TechSummaryAgent(faiss_path=faiss_path),
+        "market": MarketEvalAgent(),
+        "competitor": CompetitorAgent(),
+        "investment": investment_agent,
+        # 보고서는 InvestmentAgent와 분리된 작업 큐에서 백그라운드로 생성 (기업·입력 해시당 1회)
+        "report": ReportQueue(ReportAgent(), thresholds=investment_agent.thresholds),
+    }
+
+
+class Pipeline:
+    """
+    모든 Agent를 한 번만 생성해 재사용하는 웜(warm) 파이프라인
+    - run(state): 단일 기업 처리
+    - run_many(states): 여러 기업 동시 처리 (max_workers 제한, 입력 순서대로 결과 반환)
+    - run_companies(companies): Explorer부터 Report까지 기업별 체인을 동시 실행
+    - wait_reports(): 백그라운드 보고서 작업(ReportQueue) 완료 대기
+    - benchmark(states): 기업별 생성 비용 vs 실행 비용 측정
+    """
+
+    def __init__(self,
+                 faiss_path: str = FAISS_DIR,
+                 explorer: Optional[ExplorerAgent] = None,
+                 agents: Optional[Dict[str, object]] = None,
+                 max_workers: Optional[int] = None):
+        self.faiss_path = faiss_path
+        # 동시 처리 기업 수 (공급자별 호출 속도는 util_resources의 rate limiter가 제한)
+        self.max_workers = max_workers or int(os.getenv("PIPELINE_MAX_WORKERS", "4"))
+
+        started = time.perf_counter()
+        # 저장소에 포함된 레거시(index.pkl) 스토어는 Agent가 로드하기 전에 한 번만 변환 (로드 경로는 읽기 전용)
+        # Agent를 주입받으면(테스트 / 벤치마크 stub) 스토어를 읽지 않으므로 생략
+        if (explorer is None or agents is None) and is_legacy(faiss_path):
+            ensure_migrated(faiss_path, get_embeddings())
+        self.explorer = explorer or ExplorerAgent(faiss_path=faiss_path)
+        agents = agents or build_agents(faiss_path)
+        self.tech_agent = agents["tech"]
+        self.market_agent = agents["market"]
+        self.competitor_agent = agents["competitor"]
+        self.investment_agent = agents["investment"]
+        self.report_queue = agents["report"]
+        # Explorer 이후 Tech/Market/Competitor 병렬 → Investment → Report
+        self.graph = build_total_agent_graph(agents=agents, explorer=self.explorer, filename=None)
+        self.build_sec = time.perf_counter() - started
+
+        print(f"✅ Pipeline 초기화 완료 ({self.build_sec:.2f}s)")
+
+    def explore(self) -> List[InvestmentState]:
+        """DB에 있는 모든 회사 → state 리스트"""
+        return self.explorer.run(max_workers=self.max_workers)
+
+    def run(self, state: InvestmentState) -> InvestmentState:
+        return self.graph.invoke({"state": state})["state"]
+
+    def _run_safe(self, state: InvestmentState) -> InvestmentState:
+        """한 기업의 실패가 배치 전체를 멈추지 않도록 예외를 기록하고 state를 그대로 반환"""
+        try:
+            return self.run(state)
+        except Exception as e:
+            print(f"⚠️ {state.company_name} 파이프라인 실패: {e}")
+            return state
+
+    def _run_company(self, company_name: str) -> InvestmentState:
+        # company_name만 있는 state → 그래프의 ExplorerAgent 노드에서 탐색
+        return self._run_safe(InvestmentState(company_name=company_name))
+
+    def _map(self, func, items: List, max_workers: Optional[int]) -> List:
+        workers = max_workers or self.max_workers
+        if workers <= 1 or len(items) <= 1:
+            return [func(item) for item in items]
+        # executor.map은 입력 순서대로 결과를 돌려주므로 출력 순서가 안정적
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items))
+
+    def wait_reports(self, timeout: Optional[float] = None) -> List[Dict]:
+        """백그라운드 보고서 작업이 끝날 때까지 대기 후 작업 상태 반환"""
+        if not hasattr(self.report_queue, "wait"):
+            return []
+        return self.report_queue.wait(timeout)
+
+    def run_many(self, states: List[InvestmentState], max_workers: Optional[int] = None) -> List[InvestmentState]:
+        return self._map(self._run_safe, states, max_workers)
+
+    def run_companies(self, companies: Optional[List[str]] = None, max_workers: Optional[int] = None) -> List[InvestmentState]:
+        """Explorer → TechSummary → MarketEval → Competitor → Investment → Report 체인을 기업 단위로 동시 실행"""
+        if companies is None:
+            companies = self.explorer.get_available_companies()
+        return self._map(self._run_company, companies, max_workers)
+
+    def benchmark(self, states: List[InvestmentState]) -> Dict:
+        """
+        기업마다 Agent를 새로 만들던 기존 방식의 생성 비용과
+        웜 파이프라인의 실행 비용을 기업별로 비교
+        """
+        rows = []
+        for state in states:
+            started = time.perf_counter()
+            build_agents(self.faiss_path)   # 기존 main 루프와 동일한 재생성 (결과는 버림)
+            construct_sec = time.perf_counter() - started
+
+            started = time.perf_counter()
+            self.run(state)
+            execute_sec = time.perf_counter() - started
+
+            rows.append({
+                "company_name": state.company_name,
+                "construct_sec": round(construct_sec, 3),
+                "execute_sec": round(execute_sec, 3),
+            })
+            print(f"⏱️ {state.company_name}: 생성 {construct_sec:.2f}s / 실행 {execute_sec:.2f}s")
+
+        total_construct = sum(r["construct_sec"] for r in rows)
+        total_execute = sum(r["execute_sec"] for r in rows)
+        summary = {
+            "companies": len(rows),
+            "warm_build_sec": round(self.build_sec, 3),
+            "total_construct_sec": round(total_construct, 3),
+            "total_execute_sec": round(total_execute, 3),
+            "construct_share": round(total_construct / (total_construct + total_execute), 3) if rows else 0.0,
+            "rows": rows,
+        }
+
+        print("=====================================")
+        print(f"✅ 기업 수: {summary['companies']}")
+        print(f"✅ 웜 파이프라인 1회 생성: {summary['warm_build_sec']}s")
+        print(f"✅ 기업별 재생성 합계: {summary['total_construct_sec']}s")
+        print(f"✅ 실행 합계: {summary['total_execute_sec']}s")
+        print(f"✅ 재생성 비중: {summary['construct_share'] * 100:.1f}%")
+        print("=====================================")
+        return summary
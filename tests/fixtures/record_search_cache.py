@@ -0,0 +1,67 @@
+"""
+tests/fixtures/search_cache.sqlite 생성 스크립트 (Tavily 응답 형태를 그대로 기록한 소형 캐시)
+- 모든 항목의 created_at / accessed_at = RECORDED_AT → 테스트는 time.time을 고정해 TTL 판정
+- 실행: python tests/fixtures/record_search_cache.py
+"""
+import os
+import sys
+import json
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+
+from util_search_cache import SearchCache, TTL_SECONDS  # noqa: E402
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "search_cache.sqlite")
+RECORDED_AT = 1790000000.0   # 2026-09-21 UTC
+
+# (쿼리, 검색 파라미터, TTL 그룹, 응답)
+RECORDED = [
+    (
+        "클로봇 기업 개요",
+        {"search_depth": "advanced", "max_results": 3},
+        "company",
+        {"query": "클로봇 기업 개요", "results": [
+            {"title": "클로봇 - 로봇 자율주행 솔루션", "url": "https://example.com/clobot",
+             "content": "클로봇은 서비스 로봇용 자율주행 소프트웨어를 개발하는 기업이다.", "score": 0.91},
+        ]},
+    ),
+    (
+        "서비스 로봇 시장 규모",
+        {"search_depth": "basic", "max_results": 5, "topic": "general"},
+        "general",
+        {"query": "서비스 로봇 시장 규모", "results": [
+            {"title": "서비스 로봇 시장 전망", "url": "https://example.com/market",
+             "content": "국내 서비스 로봇 시장은 연평균 20% 이상 성장할 것으로 전망된다.", "score": 0.84},
+        ]},
+    ),
+    (
+        "로봇 스타트업 투자 유치",
+        {"search_depth": "basic", "max_results": 5, "topic": "news", "days": 7},
+        "news",
+        {"query": "로봇 스타트업 투자 유치", "results": [
+            {"title": "로봇 스타트업 시리즈B 유치", "url": "https://example.com/news",
+             "content": "로봇 스타트업이 시리즈B 투자를 유치했다.", "score": 0.77},
+        ]},
+    ),
+]
+
+
+def record(path: str = FIXTURE_PATH):
+    if os.path.exists(path):
+        os.remove(path)
+    cache = SearchCache(path, offline=False)
+    for query, params, ttl_group, value in RECORDED:
+        key = SearchCache.make_key(query, **params)
+        cache._conn.execute(
+            "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?, ?)",
+            (key, query, json.dumps(value, ensure_ascii=False),
+             RECORDED_AT, RECORDED_AT + TTL_SECONDS[ttl_group], RECORDED_AT)
+        )
+    cache._conn.commit()
+    cache._conn.execute("VACUUM")
+    cache._conn.close()
+    print(f"✅ {len(RECORDED)}건 기록: {path}")
+
+
+if __name__ == "__main__":
+    record()
@@ -0,0 +1,56 @@
+"""
+MarketEvalAgent._search_all 타임아웃 테스트 (Tavily 호출을 지연 stub으로 대체, 네트워크 불필요)
+- 실행: python -m pytest -q tests
+"""
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# MarketEvalAgent는 langchain_teddynote / langchain을 import → 의존성이 없는 환경에서는 건너뜀
+market_eval_agent = pytest.importorskip("agents.market_eval_agent")
+
+SEARCH_TIMEOUT = 0.2
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    def fake_search(client, query, ttl_group=None, timeout=None, **params):
+        assert timeout == SEARCH_TIMEOUT   # 요청 자체에도 같은 타임아웃 전달
+        time.sleep(1.0 if "slow" in query else 0.01)
+        return [{"title": query, "url": "https://example.com", "content": query}]
+
+    monkeypatch.setattr(market_eval_agent, "cached_tavily_search", fake_search)
+    # Tavily / 관련성 평가기 생성(API 키 필요)은 건너뛰고 검색 경로만 사용
+    agent = market_eval_agent.MarketEvalAgent.__new__(market_eval_agent.MarketEvalAgent)
+    agent.search_timeout = SEARCH_TIMEOUT
+    agent.tavily_tool = None
+    return agent
+
+
+def test_timed_out_query_returns_empty_with_timeout_status(agent):
+    started = time.perf_counter()
+    results, metrics = agent._search_all({
+        "fast": dict(query="fast query", topic="news"),
+        "slow": dict(query="slow query", topic="news"),
+    })
+
+    # 느린 쿼리를 기다리지 않고 타임아웃 시점에 반환
+    assert time.perf_counter() - started < 0.9
+    assert results["slow"] == []
+    assert metrics["market_eval.status.slow"] == "timeout"
+    assert metrics["market_eval.latency.slow"] == SEARCH_TIMEOUT
+    assert results["fast"] and metrics["market_eval.status.fast"] == "ok"
+
+
+def test_failed_query_records_latency(agent, monkeypatch):
+    def failing_search(client, query, ttl_group=None, timeout=None, **params):
+        raise RuntimeError("tavily down")
+
+    monkeypatch.setattr(market_eval_agent, "cached_tavily_search", failing_search)
+    results, metrics = agent._search_all({"trends": dict(query="q")})
+    assert results["trends"] == []
+    assert metrics["market_eval.status.trends"] == "error"
+    assert "market_eval.latency.trends" in metrics
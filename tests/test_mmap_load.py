@@ -0,0 +1,58 @@
+"""
+mmap 로드 경로 테스트 (합성 Flat 인덱스, 모델 / 네트워크 불필요)
+- mmap 로드가 일반 로드와 같은 검색 결과를 내는지, lazy docstore 없이(mmap + lazy=False)는 거부하는지 확인
+- 실행: python -m pytest -q tests
+"""
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+np = pytest.importorskip("numpy")
+faiss = pytest.importorskip("faiss")
+pytest.importorskip("langchain_community")
+from langchain_core.embeddings import FakeEmbeddings  # noqa: E402
+from langchain_community.docstore.in_memory import InMemoryDocstore  # noqa: E402
+from langchain_community.vectorstores import FAISS  # noqa: E402
+from util_docstore import SQLiteDocstore, save_local, load_local  # noqa: E402
+
+DIM = 16
+N_CHUNKS = 200
+
+
+@pytest.fixture(scope="module")
+def store_path(tmp_path_factory):
+    rng = np.random.default_rng(0)
+    store = FAISS(
+        embedding_function=FakeEmbeddings(size=DIM),
+        index=faiss.IndexFlatL2(DIM),
+        docstore=InMemoryDocstore(),
+        index_to_docstore_id={}
+    )
+    vectors = rng.normal(size=(N_CHUNKS, DIM)).astype("float32")
+    store.add_embeddings(
+        [(f"chunk {i}", v.tolist()) for i, v in enumerate(vectors)],
+        metadatas=[{"company": f"c{i % 5}", "chunk_idx": i} for i in range(N_CHUNKS)]
+    )
+    path = str(tmp_path_factory.mktemp("store"))
+    save_local(store, path)
+    return path
+
+
+def test_mmap_load_matches_regular_load(store_path):
+    embeddings = FakeEmbeddings(size=DIM)
+    regular = load_local(store_path, embeddings, lazy=True, mmap=False)
+    mapped = load_local(store_path, embeddings, lazy=True, mmap=True)
+
+    assert mapped.index.ntotal == N_CHUNKS
+    assert isinstance(mapped.docstore, SQLiteDocstore)
+    for q in np.random.default_rng(1).normal(size=(10, DIM)):
+        expected = [d.metadata["chunk_idx"] for d in regular.similarity_search_by_vector(q.tolist(), k=4)]
+        found = [d.metadata["chunk_idx"] for d in mapped.similarity_search_by_vector(q.tolist(), k=4)]
+        assert found == expected
+
+
+def test_mmap_requires_lazy_docstore(store_path):
+    with pytest.raises(ValueError):
+        load_local(store_path, FakeEmbeddings(size=DIM), lazy=False, mmap=True)
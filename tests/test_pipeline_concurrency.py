@@ -0,0 +1,88 @@
+"""
+Pipeline 동시 실행 테스트 (LLM / 검색을 time.sleep 지연으로 흉내 내는 stub Agent, 네트워크 불필요)
+- 출력 순서 = 입력 순서, 기업별 실패 격리, max_workers > 1이 순차 실행보다 빠른지 확인
+- 실행: python -m pytest -q tests
+"""
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Pipeline은 langgraph / langchain Agent 모듈을 import → 의존성이 없는 환경에서는 건너뜀
+pipeline_module = pytest.importorskip("pipeline")
+from InvestmentState import InvestmentState  # noqa: E402
+
+LATENCY_SEC = 0.02   # 호출 1회당 주입 지연
+
+
+class StubExplorer:
+    def __init__(self, companies):
+        self.companies = companies
+
+    def get_available_companies(self):
+        return list(self.companies)
+
+    def analyze_single_company(self, company_name: str) -> InvestmentState:
+        time.sleep(LATENCY_SEC)
+        return InvestmentState(company_name=company_name, core_tech="stub")
+
+
+class StubAgent:
+    """run() 한 번에 calls회의 원격 호출을 흉내, fail_on에 있는 기업은 예외"""
+
+    def __init__(self, field: str, calls: int = 1, fail_on=()):
+        self.field = field
+        self.calls = calls
+        self.fail_on = set(fail_on)
+
+    def run(self, state: InvestmentState) -> InvestmentState:
+        for _ in range(self.calls):
+            time.sleep(LATENCY_SEC)
+        if state.company_name in self.fail_on:
+            raise RuntimeError(f"stub 실패: {state.company_name}")
+        setattr(state, self.field, f"{state.company_name}-{self.field}")
+        return state
+
+
+def make_pipeline(companies, max_workers: int, fail_on=()):
+    agents = {
+        "tech": StubAgent("tech_summary", calls=2),
+        "market": StubAgent("market_size", calls=2, fail_on=fail_on),
+        "competitor": StubAgent("main_competitors"),
+        "investment": StubAgent("decision"),
+        "report": StubAgent("report_path"),
+    }
+    return pipeline_module.Pipeline(explorer=StubExplorer(companies), agents=agents, max_workers=max_workers)
+
+
+COMPANIES = [f"company_{i:03d}" for i in range(8)]
+
+
+def test_output_order_matches_input():
+    states = make_pipeline(COMPANIES, max_workers=4).run_companies()
+    assert [s.company_name for s in states] == COMPANIES
+    assert all(s.decision == f"{s.company_name}-decision" for s in states)
+
+
+def test_failure_is_isolated_per_company():
+    failing = COMPANIES[3]
+    states = make_pipeline(COMPANIES, max_workers=4, fail_on=[failing]).run_companies()
+
+    assert [s.company_name for s in states] == COMPANIES
+    by_name = {s.company_name: s for s in states}
+    # 실패한 기업은 Investment 단계까지 가지 못하고, 나머지는 끝까지 처리
+    assert by_name[failing].decision != f"{failing}-decision"
+    assert all(s.decision == f"{s.company_name}-decision" for name, s in by_name.items() if name != failing)
+
+
+def test_parallel_faster_than_serial():
+    def wall(max_workers: int) -> float:
+        pipeline = make_pipeline(COMPANIES, max_workers=max_workers)
+        started = time.perf_counter()
+        pipeline.run_companies()
+        return time.perf_counter() - started
+
+    serial, parallel = wall(1), wall(4)
+    assert parallel < serial * 0.6, f"serial {serial:.2f}s, parallel {parallel:.2f}s"
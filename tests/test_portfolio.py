@@ -0,0 +1,62 @@
+"""
+Portfolio 테스트 (NumPy만 필요)
+- 실행: python -m pytest -q tests
+"""
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from util_portfolio import Portfolio, simplex_grid  # noqa: E402
+
+CATEGORIES = ["owner_score", "market_score", "product_score"]
+WEIGHTS = {"owner_score": 0.5, "market_score": 0.3, "product_score": 0.2}
+
+
+def make_portfolio(n: int = 20, seed: int = 0) -> Portfolio:
+    scores = np.random.default_rng(seed).integers(0, 101, size=(n, len(CATEGORIES)))
+    return Portfolio([f"c{i}" for i in range(n)], CATEGORIES, scores)
+
+
+def test_top_k_indices_matches_full_sort():
+    portfolio = make_portfolio()
+    grid = simplex_grid(len(CATEGORIES), step=0.25)
+    top = portfolio.top_k_indices(grid, k=5)
+    assert top.shape == (len(grid), 5)
+
+    totals = portfolio.totals(grid)
+    for scenario, row in enumerate(top):
+        expected = np.sort(totals[:, scenario])[::-1][:5]
+        np.testing.assert_allclose(totals[row, scenario], expected)
+
+
+def test_top_k_indices_single_weights_and_large_k():
+    portfolio = make_portfolio(n=4)
+    top = portfolio.top_k_indices(WEIGHTS, k=10)
+    assert top.shape == (1, 4)
+    assert [portfolio.companies[i] for i in top[0]] == [name for name, _ in portfolio.top_k(WEIGHTS, k=10)]
+
+
+def test_top_k_indices_empty():
+    grid = simplex_grid(len(CATEGORIES), step=0.5)
+
+    empty = Portfolio([], CATEGORIES, np.empty((0, len(CATEGORIES))))
+    result = empty.top_k_indices(grid, k=3)
+    assert result.shape == (len(grid), 0)
+    assert result.dtype == np.int64
+
+    result = make_portfolio().top_k_indices(grid, k=0)
+    assert result.shape == (len(grid), 0)
+    assert result.dtype == np.int64
+
+
+def test_from_rows_skips_failed_rows():
+    rows = [
+        {"company_name": "a", "owner_score": 80, "market_score": 80, "product_score": 80},
+        {"company_name": "b", "owner_score": None, "market_score": None, "product_score": None},
+    ]
+    portfolio = Portfolio.from_rows(rows, CATEGORIES)
+    assert portfolio.companies == ["a"]
+    # 정확히 기준점(80.0)인 총점은 float32 오차와 무관하게 "투자 추천"
+    assert portfolio.decisions(WEIGHTS).tolist() == [True]
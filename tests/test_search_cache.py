@@ -0,0 +1,118 @@
+"""
+SearchCache 오프라인 테스트 (네트워크 / API 키 불필요)
+- tests/fixtures/search_cache.sqlite: record_search_cache.py로 기록한 Tavily 응답 3건
+- 실행: python -m pytest -q tests
+"""
+import os
+import sys
+import shutil
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import util_search_cache  # noqa: E402
+from util_search_cache import SearchCache, SearchCacheMiss, TTL_SECONDS  # noqa: E402
+from tests.fixtures.record_search_cache import FIXTURE_PATH, RECORDED, RECORDED_AT  # noqa: E402
+
+
+def no_network():
+    raise AssertionError("오프라인 테스트에서 네트워크 호출 발생")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """util_search_cache의 time.time을 고정 (기록 시각 1시간 뒤에서 시작)"""
+    now = {"t": RECORDED_AT + 3600}
+    monkeypatch.setattr(util_search_cache.time, "time", lambda: now["t"])
+    return now
+
+
+@pytest.fixture
+def recorded(tmp_path, clock):
+    """기록된 fixture 사본 (조회 시 accessed_at이 갱신되므로 원본은 건드리지 않음)"""
+    path = tmp_path / "search_cache.sqlite"
+    shutil.copy(FIXTURE_PATH, path)
+    return SearchCache(str(path), offline=True)
+
+
+def test_offline_hits_recorded_results(recorded):
+    for query, params, _, value in RECORDED:
+        assert recorded.cached(no_network, query, **params) == value
+    assert recorded.stats["hits"] == len(RECORDED)
+    assert recorded.stats["misses"] == 0
+
+
+def test_key_normalizes_query_and_param_order(recorded):
+    query, params, _, value = RECORDED[0]
+    reordered = dict(reversed(list(params.items())))
+    assert recorded.cached(no_network, f"  {query.upper()}   ", **reordered) == value
+
+
+def test_offline_miss_raises(recorded):
+    with pytest.raises(SearchCacheMiss):
+        recorded.cached(no_network, "기록되지 않은 쿼리", search_depth="basic")
+    query, params, _, _ = RECORDED[0]
+    with pytest.raises(SearchCacheMiss):
+        recorded.cached(no_network, query, **{**params, "max_results": 10})
+
+
+def test_offline_default_from_env(monkeypatch, tmp_path):
+    monkeypatch.setenv("SEARCH_CACHE_OFFLINE", "1")
+    assert SearchCache(str(tmp_path / "a.sqlite")).offline
+    monkeypatch.delenv("SEARCH_CACHE_OFFLINE")
+    assert not SearchCache(str(tmp_path / "b.sqlite")).offline
+
+
+def test_ttl_expiry_per_group(recorded, clock):
+    by_group = {ttl_group: (query, params) for query, params, ttl_group, _ in RECORDED}
+
+    # news(1일)만 만료, general(7일) / company(30일)는 유지
+    clock["t"] = RECORDED_AT + TTL_SECONDS["news"] + 1
+    query, params = by_group["news"]
+    assert recorded.get(SearchCache.make_key(query, **params)) is None
+    assert recorded.stats["expired"] == 1
+    for group in ("general", "company"):
+        query, params = by_group[group]
+        assert recorded.get(SearchCache.make_key(query, **params)) is not None
+
+    # 만료 항목은 삭제되어 오프라인 모드에서 미스
+    query, params = by_group["news"]
+    with pytest.raises(SearchCacheMiss):
+        recorded.cached(no_network, query, **params)
+    assert recorded.report()["entries"] == len(RECORDED) - 1
+
+
+def test_miss_fetches_and_stores(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "c.sqlite"), offline=False)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        return {"results": [{"title": "t"}]}
+
+    assert cache.cached(fetch, "새 쿼리", topic="news") == {"results": [{"title": "t"}]}
+    assert cache.cached(fetch, "새 쿼리", topic="news") == {"results": [{"title": "t"}]}
+    assert len(calls) == 1
+
+    # topic=news → news TTL 적용
+    clock["t"] += TTL_SECONDS["news"] + 1
+    cache.cached(fetch, "새 쿼리", topic="news")
+    assert len(calls) == 2
+
+
+def test_eviction_drops_least_recently_used(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "d.sqlite"), max_entries=2, offline=False)
+    keys = [SearchCache.make_key(q) for q in ("a", "b", "c")]
+
+    cache.set(keys[0], "a", {"v": "a"})
+    clock["t"] += 1
+    cache.set(keys[1], "b", {"v": "b"})
+    clock["t"] += 1
+    assert cache.get(keys[0]) == {"v": "a"}   # a 사용 → b가 가장 오래 사용되지 않은 항목
+    clock["t"] += 1
+    cache.set(keys[2], "c", {"v": "c"})
+
+    assert cache.stats["evicted"] == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == {"v": "a"}
+    assert cache.get(keys[2]) == {"v": "c"}
@@ -0,0 +1,273 @@
+"""
+pickle 없는 FAISS 스토어 포맷
+- index.faiss: FAISS 인덱스 (faiss.write_index 그대로)
+- docstore.sqlite: chunks(pos = FAISS 내부 id, id = docstore id, company, text, metadata JSON)
+                   + chunks_fts (BM25 희소 인덱스, HybridRetriever용)
+- 로드 시 인덱스만 읽고, 청크 텍스트/메타데이터는 검색 결과로 반환되는 id만 SQLite에서 조회
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Union
+import faiss
+from util_retrieval import tokenize_ko
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
+from langchain_community.vectorstores import FAISS
+
+INDEX_NAME = "index.faiss"
+DOCSTORE_NAME = "docstore.sqlite"
+LEGACY_DOCSTORE_NAME = "index.pkl"
+MIGRATE_LOCK_NAME = ".migrate.lock"
+
+
+class SQLiteDocstore(Docstore):
+    """
+    읽기 전용 지연 로딩 docstore (InMemoryDocstore와 같은 search 계약)
+    - 스레드 간 공유: 연결 1개 + 락
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        # chunks_fts 테이블이 없는 스토어(희소 인덱스 추가 전에 저장) → 벡터 검색만
+        self.has_sparse = bool(self._query("SELECT 1 FROM sqlite_master WHERE name = 'chunks_fts'"))
+
+    def _query(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def search(self, search: str) -> Union[str, Document]:
+        rows = self._query("SELECT text, metadata FROM chunks WHERE id = ?", (search,))
+        if not rows:
+            return f"ID {search} not found."
+        text, metadata = rows[0]
+        return Document(id=search, page_content=text, metadata=json.loads(metadata))
+
+    def mget(self, ids: List[str]) -> Dict[str, Document]:
+        """여러 id 한 번에 조회 (검색 결과 k개용)"""
+        if not ids:
+            return {}
+        rows = self._query(
+            f"SELECT id, text, metadata FROM chunks WHERE id IN ({','.join('?' * len(ids))})", tuple(ids)
+        )
+        return {i: Document(id=i, page_content=t, metadata=json.loads(m)) for i, t, m in rows}
+
+    def sparse_search(self, tokens: List[str], company: str = None, limit: int = 20) -> List[int]:
+        """BM25 상위 FAISS 내부 id (토큰 OR 매칭, company 지정 시 해당 기업 청크만)"""
+        if not self.has_sparse or not tokens:
+            return []
+        match = " OR ".join(f'"{t}"' for t in dict.fromkeys(tokens))
+        sql = "SELECT f.rowid, bm25(chunks_fts) AS score FROM chunks_fts f"
+        params: tuple = (match,)
+        if company is not None:
+            sql += " JOIN chunks c ON c.pos = f.rowid WHERE chunks_fts MATCH ? AND c.company = ?"
+            params += (company,)
+        else:
+            sql += " WHERE chunks_fts MATCH ?"
+        return [pos for pos, _ in self._query(sql + " ORDER BY score LIMIT ?", params + (limit,))]
+
+    def add(self, texts: Dict[str, Document]) -> None:
+        raise NotImplementedError("SQLiteDocstore는 읽기 전용입니다. VectorDBBuilder로 갱신하세요.")
+
+    def delete(self, ids: List) -> None:
+        raise NotImplementedError("SQLiteDocstore는 읽기 전용입니다. VectorDBBuilder로 갱신하세요.")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SQLiteIndexMap(Mapping):
+    """FAISS 내부 id → docstore id 지연 매핑 (LangChain FAISS의 index_to_docstore_id 자리)"""
+
+    def __init__(self, docstore: SQLiteDocstore, ntotal: int):
+        self._docstore = docstore
+        self._ntotal = ntotal
+
+    def __getitem__(self, pos: int) -> str:
+        rows = self._docstore._query("SELECT id FROM chunks WHERE pos = ?", (int(pos),))
+        if not rows:
+            raise KeyError(pos)
+        return rows[0][0]
+
+    def __len__(self) -> int:
+        return self._ntotal
+
+    def __iter__(self) -> Iterator[int]:
+        return (pos for pos, _ in self.items())
+
+    def items(self):
+        # 대체 경로(카탈로그 없는 기업 스캔)용 전체 순회
+        return iter(self._docstore._query("SELECT pos, id FROM chunks ORDER BY pos"))
+
+    def values(self):
+        return (doc_id for _, doc_id in self.items())
+
+
+def save_local(vectordb: FAISS, save_path: str):
+    """
+    index.faiss + docstore.sqlite 저장
+    - 둘 다 임시 파일에 쓴 뒤 docstore → index 순으로 교체 (쓰는 도중 중단돼도 기존 쌍이 그대로 남음)
+    """
+    os.makedirs(save_path, exist_ok=True)
+    index_path = os.path.join(save_path, INDEX_NAME)
+    index_tmp_path = index_path + ".tmp"
+    faiss.write_index(vectordb.index, index_tmp_path)
+
+    db_path = os.path.join(save_path, DOCSTORE_NAME)
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute(
+            "CREATE TABLE chunks (pos INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, company TEXT, "
+            "text TEXT NOT NULL, metadata TEXT NOT NULL)"
+        )
+        conn.execute("CREATE INDEX idx_chunks_company ON chunks(company)")
+        # 희소 인덱스: tokenize_ko 토큰을 공백으로 이어 저장 (contentless FTS5, rowid = FAISS 내부 id)
+        conn.execute("CREATE VIRTUAL TABLE chunks_fts USING fts5(tokens, content='', tokenize='unicode61 remove_diacritics 0')")
+        rows, fts_rows = [], []
+        for pos, doc_id in vectordb.index_to_docstore_id.items():
+            doc = vectordb.docstore.search(doc_id)
+            rows.append((int(pos), doc_id, doc.metadata.get("company"), doc.page_content,
+                         json.dumps(doc.metadata, ensure_ascii=False, default=str)))
+            fts_rows.append((int(pos), " ".join(tokenize_ko(doc.page_content))))
+        conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?, ?)", rows)
+        conn.executemany("INSERT INTO chunks_fts(rowid, tokens) VALUES (?, ?)", fts_rows)
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    os.replace(index_tmp_path, index_path)
+
+
+def count_chunks(save_path: str) -> int:
+    """docstore.sqlite의 청크 수 (index.faiss의 ntotal과 같아야 함)"""
+    conn = sqlite3.connect(f"file:{os.path.join(save_path, DOCSTORE_NAME)}?mode=ro", uri=True)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def is_legacy(save_path: str) -> bool:
+    """index.pkl만 있고 docstore.sqlite가 없는 (변환 전) 스토어"""
+    return (not os.path.exists(os.path.join(save_path, DOCSTORE_NAME))
+            and os.path.exists(os.path.join(save_path, LEGACY_DOCSTORE_NAME)))
+
+
+def migrate_legacy(save_path: str, embeddings: Embeddings):
+    """
+    기존 index.pkl 스토어를 한 번만 pickle 로드해 docstore.sqlite로 변환 (이후 로드는 pickle 없음)
+    - 쓰기 작업이므로 load_local이 아닌 명시적 단계에서만 실행 (잠금은 ensure_migrated가 담당)
+    """
+    print(f"⚠️ 레거시 pickle 스토어 → {DOCSTORE_NAME}로 변환: {save_path}")
+    legacy = FAISS.load_local(save_path, embeddings, allow_dangerous_deserialization=True)
+    save_local(legacy, save_path)
+
+
+def ensure_migrated(save_path: str, embeddings: Embeddings, timeout: float = 600.0) -> bool:
+    """
+    시작 단계용: 레거시 스토어면 잠금 파일(.migrate.lock)을 잡고 1회 변환 (Pipeline / CLI / VectorDBBuilder)
+    - 여러 프로세스가 동시에 시작해도 한 프로세스만 변환, 나머지는 잠금 해제 후 변환된 스토어 사용
+    :return: 이 호출에서 변환했으면 True
+    """
+    if not is_legacy(save_path):
+        return False
+    lock_path = os.path.join(save_path, MIGRATE_LOCK_NAME)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"레거시 스토어 변환 잠금 대기 시간 초과 ({lock_path}가 남아 있으면 삭제 후 재시도)")
+            time.sleep(0.5)
+    try:
+        os.write(fd, str(os.getpid()).encode())
+        # 잠금을 기다리는 동안 다른 프로세스가 변환을 끝냈으면 그대로 사용
+        if not is_legacy(save_path):
+            return False
+        migrate_legacy(save_path, embeddings)
+        return True
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+
+
+def mmap_io_flags() -> int:
+    """
+    읽기 전용 mmap 로드 플래그
+    - IO_FLAG_MMAP: IVF 역리스트를 mmap
+    - IO_FLAG_MMAP_IFC (faiss 1.10+): Flat / HNSW 저장 벡터도 복사 없이 mmap
+    """
+    return faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+
+
+def load_local(save_path: str, embeddings: Embeddings, lazy: bool = True, mmap: bool = False) -> FAISS:
+    """
+    pickle 없이 FAISS 스토어 로드
+    :param lazy: True면 청크를 SQLite에서 필요할 때만 조회 (읽기 전용, Agent용)
+                 False면 전체를 InMemoryDocstore로 로드 (추가/삭제 가능, VectorDBBuilder용)
+    :param mmap: index.faiss를 mmap으로 로드 (읽기 전용, 같은 호스트의 워커들이 페이지 캐시 공유)
+    """
+    if mmap and not lazy:
+        raise ValueError("mmap 로드는 읽기 전용이므로 lazy=True와 함께 사용해야 합니다.")
+    db_path = os.path.join(save_path, DOCSTORE_NAME)
+    if is_legacy(save_path):
+        # 여러 워커가 동시에 로드하며 같은 파일을 변환하지 않도록 로드 경로에서는 변환하지 않음
+        raise FileNotFoundError(
+            f"{db_path}가 없는 레거시 pickle 스토어입니다. "
+            f"Pipeline 시작 시 자동 변환되며, 직접 로드하려면 먼저 `python util_docstore.py {save_path}`로 변환하세요."
+        )
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"{db_path}가 없습니다. VectorDBBuilder로 스토어를 생성하세요.")
+
+    index = faiss.read_index(os.path.join(save_path, INDEX_NAME), mmap_io_flags() if mmap else 0)
+    n_chunks = count_chunks(save_path)
+    if n_chunks != index.ntotal:
+        raise ValueError(f"{INDEX_NAME}({index.ntotal}개)와 {DOCSTORE_NAME}({n_chunks}개)의 청크 수가 다릅니다: {save_path}")
+    if lazy:
+        docstore = SQLiteDocstore(db_path)
+        index_to_docstore_id = SQLiteIndexMap(docstore, index.ntotal)
+    else:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            rows = conn.execute("SELECT pos, id, text, metadata FROM chunks ORDER BY pos").fetchall()
+        finally:
+            conn.close()
+        docstore = InMemoryDocstore({
+            doc_id: Document(id=doc_id, page_content=text, metadata=json.loads(metadata))
+            for _, doc_id, text, metadata in rows
+        })
+        index_to_docstore_id = {pos: doc_id for pos, doc_id, _, _ in rows}
+
+    return FAISS(
+        embedding_function=embeddings,
+        index=index,
+        docstore=docstore,
+        index_to_docstore_id=index_to_docstore_id
+    )
+
+
+if __name__ == "__main__":
+    import sys
+    from util_resources import get_embeddings
+
+    # 레거시 스토어 일괄 변환: python util_docstore.py faiss_db/unicorns_sementic [...]
+    for path in sys.argv[1:]:
+        if not is_legacy(path):
+            print(f"ℹ️ 변환할 레거시 스토어 아님: {path}")
+            continue
+        ensure_migrated(path, get_embeddings())
+        load_local(path, get_embeddings(), lazy=True)
+        print(f"✅ 변환 완료: {path}")
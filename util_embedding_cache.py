@@ -0,0 +1,195 @@
+import os
+import re
+import sqlite3
+import time
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.getenv(
+    "QUERY_EMBED_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "query_embedding_cache.sqlite")
+)
+
+
+def normalize_query(query: str) -> str:
+    # 대소문자는 유지 (KURE-v1은 cased 모델이라 소문자화하면 임베딩이 달라짐)
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", str(query))).strip()
+
+
+class QueryEmbeddingCache(Embeddings):
+    """
+    쿼리 임베딩 캐시 (Embeddings 래퍼 → FAISS embedding_function 자리에 그대로 사용)
+    - 키: (모델명 + 임베딩 설정 fingerprint, 정규화된 쿼리) → quantize / normalize가 다른 벡터를 섞어 쓰지 않음
+    - 메모리 LRU(max_entries) + 선택적 SQLite 영속 캐시 (persist=True)
+    - 여러 스레드가 동시에 요청한 미스 쿼리는 batch_wait_ms 동안 모아 한 번의 forward pass로 임베딩,
+      같은 쿼리가 진행 중이면 결과를 기다려 공유
+    - embed_documents(빌드용)는 캐시하지 않고 그대로 위임
+    """
+
+    def __init__(self,
+                 base: Embeddings,
+                 model_name: str,
+                 fingerprint: str = "",
+                 max_entries: int = 4096,
+                 persist: Optional[bool] = None,
+                 path: str = DEFAULT_CACHE_PATH,
+                 batch_wait_ms: float = 2.0):
+        self.base = base
+        self.model_name = model_name
+        self.fingerprint = fingerprint
+        # SQLite model 컬럼 값 (같은 모델이라도 설정이 다르면 별도 항목)
+        self.cache_id = f"{model_name}|{fingerprint}" if fingerprint else model_name
+        self.max_entries = max_entries
+        self.batch_wait = batch_wait_ms / 1000
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "batches": 0, "batched_queries": 0}
+
+        self._lock = threading.Lock()
+        self._lru: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._queue: List[str] = []
+        self._leader_active = False
+
+        self.persist = persist if persist is not None else os.getenv("QUERY_EMBED_CACHE_PERSIST") == "1"
+        self._conn = None
+        if self.persist:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    model TEXT,
+                    query TEXT,
+                    vector BLOB,
+                    PRIMARY KEY (model, query)
+                )
+            """)
+            self._conn.commit()
+
+    # -----------------------------
+    # 캐시 조회 / 저장 (self._lock 안에서 호출)
+    # -----------------------------
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            self.stats["hits"] += 1
+            return self._lru[key]
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT vector FROM query_embeddings WHERE model = ? AND query = ?", (self.cache_id, key)
+            ).fetchone()
+            if row is not None:
+                vector = array("f", row[0]).tolist()
+                self._remember(key, vector)
+                self.stats["disk_hits"] += 1
+                return vector
+        return None
+
+    def _remember(self, key: str, vector: List[float]):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _store(self, pairs: List[Tuple[str, List[float]]]):
+        for key, vector in pairs:
+            self._remember(key, vector)
+        if self._conn is not None:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?, ?)",
+                [(self.cache_id, key, array("f", v).tobytes()) for key, v in pairs]
+            )
+            self._conn.commit()
+
+    # -----------------------------
+    # 미스 쿼리 배치 처리
+    # -----------------------------
+    def _submit(self, keys: List[str]) -> Tuple[List[Future], bool]:
+        """미스 쿼리를 대기열에 넣고 Future 반환 (이미 진행 중이면 그 Future 공유), 리더 여부 반환"""
+        futures = []
+        with self._lock:
+            for key in keys:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = Future()
+                    self._inflight[key] = future
+                    self._queue.append(key)
+                futures.append(future)
+            leader = bool(self._queue) and not self._leader_active
+            if leader:
+                self._leader_active = True
+        return futures, leader
+
+    def _drain(self):
+        """리더 스레드: batch_wait 동안 다른 스레드의 쿼리를 모은 뒤 한 번에 임베딩"""
+        time.sleep(self.batch_wait)
+        with self._lock:
+            batch, self._queue = self._queue, []
+            self._leader_active = False
+        if not batch:
+            return
+        try:
+            # HuggingFaceEmbeddings의 embed_query는 embed_documents([q])[0]과 같으므로 배치로 묶어도 결과 동일
+            vectors = self.base.embed_documents(batch)
+        except Exception as e:
+            with self._lock:
+                futures = [self._inflight.pop(key) for key in batch]
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        with self._lock:
+            try:
+                self._store(list(zip(batch, vectors)))
+            except Exception as e:
+                # 저장(SQLite 등) 실패해도 임베딩은 끝났으므로 대기 중인 스레드에는 결과 전달
+                print(f"⚠️ 쿼리 임베딩 캐시 저장 실패: {e}")
+            self.stats["batches"] += 1
+            self.stats["batched_queries"] += len(batch)
+            futures = [self._inflight.pop(key) for key in batch]
+        for future, vector in zip(futures, vectors):
+            future.set_result(vector)
+
+    # -----------------------------
+    # Embeddings 인터페이스
+    # -----------------------------
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """여러 쿼리를 한 번에 임베딩 (히트는 캐시, 미스는 한 번의 forward pass)"""
+        keys = [normalize_query(t) for t in texts]
+        results: Dict[str, List[float]] = {}
+        with self._lock:
+            for key in dict.fromkeys(keys):
+                vector = self._lookup(key)
+                if vector is not None:
+                    results[key] = vector
+            missing = [key for key in dict.fromkeys(keys) if key not in results]
+            self.stats["misses"] += len(missing)
+
+        if missing:
+            futures, leader = self._submit(missing)
+            if leader:
+                self._drain()
+            for key, future in zip(missing, futures):
+                results[key] = future.result()
+        return [results[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_queries([text])[0]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.base.embed_documents(texts)
+
+    def report(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "model": self.model_name,
+            "settings": self.fingerprint,
+            "entries": len(self._lru),
+            "hit_rate": round((self.stats["hits"] + self.stats["disk_hits"]) / lookups, 3) if lookups else 0.0,
+            "avg_batch": round(self.stats["batched_queries"] / self.stats["batches"], 2) if self.stats["batches"] else 0.0,
+        }
@@ -0,0 +1,62 @@
+import os
+from typing import Dict, Optional
+from langchain_community.embeddings import HuggingFaceEmbeddings
+
+QUANTIZE_MODES = ("none", "int8", "onnx")
+
+# ✅ CPU 임베딩 처리량 설정 (환경변수 기본값, 생성 시 인자로 덮어쓰기 가능)
+DEFAULT_EMBEDDING_SETTINGS = {
+    "batch_size": int(os.getenv("EMBED_BATCH_SIZE", "32")),     # encode 배치 크기
+    "threads": int(os.getenv("EMBED_THREADS", "0")),            # torch intra-op 스레드 수 (0: torch 기본값)
+    "quantize": os.getenv("EMBED_QUANTIZE", "none"),            # none / int8(torch 동적 양자화) / onnx(ONNX Runtime)
+    "normalize": os.getenv("EMBED_NORMALIZE", "0") == "1",      # L2 정규화 (인덱스 빌드와 검색에서 같아야 함)
+}
+
+
+def embedding_settings(settings: Optional[Dict] = None) -> Dict:
+    merged = {**DEFAULT_EMBEDDING_SETTINGS, **(settings or {})}
+    if merged["quantize"] not in QUANTIZE_MODES:
+        raise ValueError(f"지원하지 않는 quantize: {merged['quantize']} (가능: {', '.join(QUANTIZE_MODES)})")
+    return merged
+
+
+def settings_key(settings: Dict) -> tuple:
+    return tuple(sorted(settings.items()))
+
+
+# 임베딩 값 자체를 바꾸는 설정 (batch_size / threads는 처리량만 바뀜)
+VECTOR_SETTINGS = ("quantize", "normalize")
+
+
+def settings_fingerprint(settings: Optional[Dict] = None) -> str:
+    """임베딩 결과에 영향을 주는 설정 요약 (쿼리 임베딩 캐시 키용), 예: quantize=int8,normalize=0"""
+    settings = embedding_settings(settings)
+    return ",".join(f"{name}={int(settings[name]) if isinstance(settings[name], bool) else settings[name]}"
+                    for name in VECTOR_SETTINGS)
+
+
+def build_embeddings(model_name: str, settings: Optional[Dict] = None) -> HuggingFaceEmbeddings:
+    """
+    설정에 맞춘 CPU 임베딩 모델 생성
+    - threads: torch.set_num_threads (프로세스 전역)
+    - int8: Linear 레이어 동적 양자화 (가중치 int8, 활성값은 실행 시 양자화)
+    - onnx: sentence-transformers ONNX 백엔드 (모델에 ONNX 파일이 없으면 로드 시 export)
+    """
+    settings = embedding_settings(settings)
+    import torch
+
+    if settings["threads"] > 0:
+        torch.set_num_threads(settings["threads"])
+
+    model_kwargs = {"device": "cpu"}
+    if settings["quantize"] == "onnx":
+        model_kwargs["backend"] = "onnx"
+
+    embeddings = HuggingFaceEmbeddings(
+        model_name=model_name,
+        model_kwargs=model_kwargs,
+        encode_kwargs={"batch_size": settings["batch_size"], "normalize_embeddings": settings["normalize"]}
+    )
+    if settings["quantize"] == "int8":
+        torch.quantization.quantize_dynamic(embeddings.client, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return embeddings
@@ -0,0 +1,131 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Sequence
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "llm_cache.sqlite"))
+
+
+class LLMCacheMiss(RuntimeError):
+    """replay-only 모드에서 캐시에 없는 LLM 호출을 요청한 경우"""
+
+
+class LLMResponseCache(BaseCache):
+    """
+    temperature=0 LLM 응답 캐시 (content-addressed, SQLite 영속)
+    - 키: sha256(llm_string + prompt)
+      llm_string 에는 모델명/파라미터와 bind_tools 도구 스키마, with_structured_output 스키마가 포함되고
+      prompt 에는 직렬화된 메시지 전체가 포함됨
+    - max_bytes 초과 시 가장 오래 사용되지 않은 응답부터 제거 (LRU)
+    - replay_only=True 이면 캐시 미스 시 LLMCacheMiss 발생 (네트워크 호출 없음)
+    """
+
+    def __init__(self,
+                 path: str = DEFAULT_CACHE_PATH,
+                 max_bytes: int = 512 * 1024 * 1024,
+                 replay_only: Optional[bool] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.replay_only = replay_only if replay_only is not None else os.getenv("LLM_CACHE_REPLAY") == "1"
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                size INTEGER,
+                created_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_accessed ON llm_cache(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode("utf-8")).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> Optional[Sequence[Any]]:
+        key = self.make_key(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+            else:
+                self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+                self.stats["hits"] += 1
+
+        if row is None:
+            if self.replay_only:
+                raise LLMCacheMiss(f"replay-only 모드 LLM 캐시 미스: {key[:12]}")
+            return None
+        return [loads(g) for g in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: Sequence[Any]) -> None:
+        key = self.make_key(prompt, llm_string)
+        value = json.dumps([dumps(g) for g in return_val], ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY accessed_at ASC"
+        ).fetchall():
+            self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.stats["evicted"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def report(self) -> Dict:
+        total = self.stats["hits"] + self.stats["misses"]
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        return {
+            **self.stats,
+            "entries": entries,
+            "size_mb": round(size / (1024 * 1024), 2),
+            "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0,
+        }
+
+
+_default_cache: Optional[LLMResponseCache] = None
+_default_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """LLM_CACHE=0 이면 캐시 비활성화"""
+    global _default_cache
+    if os.getenv("LLM_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMResponseCache()
+        return _default_cache
@@ -0,0 +1,131 @@
+import os
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+# ✅ 판정 기준 (환경변수로 조정)
+DEFAULT_THRESHOLDS = {
+    "invest": float(os.getenv("INVEST_THRESHOLD", "80")),   # 총점 이상이면 "투자 추천"
+    "report": float(os.getenv("REPORT_THRESHOLD", "74")),   # 총점 이상이면 보고서 생성
+}
+
+# 반올림 오차로 기준점(예: 정확히 80.0)에서 판정이 뒤집히지 않도록 하는 허용 오차 (float32 행렬곱과 단건 계산을 일치시킴)
+SCORE_EPS = 1e-3
+
+Weights = Union[Dict[str, float], Sequence[Dict[str, float]], np.ndarray]
+
+
+def meets(total_score: float, threshold: str = "invest", thresholds: Optional[Dict[str, float]] = None) -> bool:
+    """단건 총점 >= 기준 (Portfolio.decisions와 같은 허용 오차)"""
+    return total_score >= (thresholds or DEFAULT_THRESHOLDS)[threshold] - SCORE_EPS
+
+
+def decide(total_score: float, thresholds: Optional[Dict[str, float]] = None) -> str:
+    return "투자 추천" if meets(total_score, "invest", thresholds) else "보류"
+
+
+def simplex_grid(n_categories: int, step: float = 0.05) -> np.ndarray:
+    """합이 1이고 각 값이 step 배수인 모든 가중치 벡터 (m, n_categories), 6항목·0.05 간격이면 53130개"""
+    units = int(round(1 / step))
+    # stars and bars: units개의 step을 n_categories칸에 나누는 모든 경우
+    bars = np.array(list(combinations(range(units + n_categories - 1), n_categories - 1)), dtype=np.int32)
+    edges = np.hstack([np.full((len(bars), 1), -1), bars, np.full((len(bars), 1), units + n_categories - 1)])
+    return (np.diff(edges, axis=1) - 1).astype(np.float32) / units
+
+
+def perturbed_weights(base: Sequence[float], n: int, concentration: float = 200.0, seed: int = 0) -> np.ndarray:
+    """기준 가중치 주변의 무작위 가중치 n개 (Dirichlet, concentration이 클수록 기준에 가까움)"""
+    alpha = np.asarray(base, dtype=np.float64) * concentration
+    return np.random.default_rng(seed).dirichlet(alpha, size=n).astype(np.float32)
+
+
+class Portfolio:
+    """
+    기업 × 평가 항목 점수 행렬 (NumPy, float32)
+    - totals(weights): 가중치 벡터 여러 개에 대한 총점을 행렬곱 한 번으로 계산 → (기업, 시나리오)
+    - sensitivity(grid, base): 기준 가중치 대비 판정이 바뀌는 기업과 시나리오 비율
+    - top_k / top_k_indices: 가중치별 상위 기업
+    """
+
+    def __init__(self,
+                 companies: Sequence[str],
+                 categories: Sequence[str],
+                 scores: np.ndarray,
+                 thresholds: Optional[Dict[str, float]] = None):
+        self.companies = list(companies)
+        self.categories = list(categories)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(len(self.companies), len(self.categories))
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict], categories: Sequence[str], thresholds: Optional[Dict[str, float]] = None):
+        """점수표 행(InvestmentAgent.score_many 결과) → Portfolio (점수가 빠진 행은 제외)"""
+        rows = [r for r in rows if all(r.get(c) is not None for c in categories)]
+        scores = np.array([[r[c] for c in categories] for r in rows], dtype=np.float32)
+        return cls([r["company_name"] for r in rows], categories, scores, thresholds)
+
+    def __len__(self) -> int:
+        return len(self.companies)
+
+    def weight_matrix(self, weights: Weights) -> np.ndarray:
+        """dict / dict 리스트 / (m, 항목 수) 배열 → (m, 항목 수) float32 배열"""
+        if isinstance(weights, dict):
+            weights = [weights]
+        if not isinstance(weights, np.ndarray):
+            weights = [[w[c] for c in self.categories] for w in weights]
+        matrix = np.atleast_2d(np.asarray(weights, dtype=np.float32))
+        if matrix.shape[1] != len(self.categories):
+            raise ValueError(f"가중치 항목 수 불일치: {matrix.shape[1]} != {len(self.categories)} ({self.categories})")
+        return matrix
+
+    def totals(self, weights: Weights) -> np.ndarray:
+        """총점: 가중치가 1개(dict / 1차원)면 (기업,), 여러 개면 (기업, 시나리오)"""
+        single = isinstance(weights, dict) or (isinstance(weights, np.ndarray) and weights.ndim == 1)
+        totals = self.scores @ self.weight_matrix(weights).T
+        return totals[:, 0] if single else totals
+
+    def decisions(self, weights: Weights, threshold: str = "invest") -> np.ndarray:
+        """총점 >= 기준 (True: invest → "투자 추천", report → 보고서 생성)"""
+        return self.totals(weights) >= self.thresholds[threshold] - SCORE_EPS
+
+    def top_k(self, weights: Dict[str, float], k: int = 10) -> List[Tuple[str, float]]:
+        """가중치 1개 기준 상위 k개 (기업명, 총점)"""
+        totals = self.totals(weights)
+        order = np.argsort(-totals, kind="stable")[:k]
+        return [(self.companies[i], float(totals[i])) for i in order]
+
+    def top_k_indices(self, weights: Weights, k: int = 10) -> np.ndarray:
+        """시나리오별 상위 k개 기업 인덱스 (시나리오, k), 총점 내림차순"""
+        totals = (self.scores @ self.weight_matrix(weights).T).T
+        k = min(k, totals.shape[1])
+        if k <= 0:
+            # 기업이 없거나 k <= 0 → argpartition(kth=-1) 대신 빈 결과
+            return np.empty((totals.shape[0], 0), dtype=np.int64)
+        part = np.argpartition(-totals, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(totals, part, axis=1), axis=1, kind="stable")
+        return np.take_along_axis(part, order, axis=1)
+
+    def sensitivity(self,
+                    weight_grid: Weights,
+                    base_weights: Dict[str, float],
+                    threshold: str = "invest",
+                    chunk_size: int = 4096) -> Dict:
+        """
+        가중치 시나리오 전체에서 기준 가중치 대비 판정이 바뀌는(flip) 기업
+        - (기업, 시나리오) 판정 행렬을 chunk_size 시나리오씩 계산해 메모리 상한 유지
+        :return: {scenarios, base_decisions, flip_rate(기업별 비율), flipped[(기업명, 비율) 내림차순]}
+        """
+        base = self.decisions(base_weights, threshold)
+        grid = self.weight_matrix(weight_grid)
+        flips = np.zeros(len(self.companies), dtype=np.int64)
+        for start in range(0, len(grid), chunk_size):
+            decided = (self.scores @ grid[start:start + chunk_size].T) >= self.thresholds[threshold] - SCORE_EPS
+            flips += (decided != base[:, None]).sum(axis=1)
+        flip_rate = flips / max(len(grid), 1)
+        order = np.argsort(-flip_rate, kind="stable")
+        return {
+            "scenarios": len(grid),
+            "base_decisions": base,
+            "flip_rate": flip_rate,
+            "flipped": [(self.companies[i], float(flip_rate[i])) for i in order if flips[i]],
+        }
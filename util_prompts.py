@@ -0,0 +1,95 @@
+import os
+import re
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+from langchain_core.prompts import PromptTemplate
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_PROMPT_DIR = os.getenv("PROMPT_DIR", os.path.join(BASE_DIR, "prompts"))
+
+# 파일명 규칙: <이름>.v<버전>.txt (예: explorer.react.v1.txt)
+PROMPT_FILE_RE = re.compile(r"^(?P<name>.+)\.v(?P<version>\d+)\.txt$")
+
+
+@dataclass(frozen=True)
+class PromptEntry:
+    """버전이 고정된 프롬프트 1개 (템플릿은 로드 시 한 번만 컴파일)"""
+    name: str
+    version: int
+    text: str
+    template: PromptTemplate
+    hash: str
+
+    @property
+    def tag(self) -> str:
+        """state.metrics 기록용 식별자 (예: v1:3f9a0c2b1d4e)"""
+        return f"v{self.version}:{self.hash}"
+
+    def format(self, **kwargs) -> str:
+        return self.template.format(**kwargs)
+
+
+class PromptRegistry:
+    """
+    로컬 버전 관리 프롬프트 레지스트리 (LangChain Hub 네트워크 호출 없음)
+    - prompts/ 디렉터리의 모든 템플릿을 프로세스당 한 번 읽어 PromptTemplate으로 컴파일
+    - 같은 이름의 여러 버전 중 기본은 최신 버전, get(name, version)으로 고정 가능
+    - 해시: sha256(이름 + 버전 + 본문) 앞 12자리 → 프롬프트가 바뀌면 결과 캐시 키도 바뀜
+    """
+
+    def __init__(self, prompt_dir: str = DEFAULT_PROMPT_DIR):
+        self.prompt_dir = prompt_dir
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict[int, PromptEntry]]] = None
+
+    def _load(self) -> Dict[str, Dict[int, PromptEntry]]:
+        entries: Dict[str, Dict[int, PromptEntry]] = {}
+        for filename in sorted(os.listdir(self.prompt_dir)):
+            match = PROMPT_FILE_RE.match(filename)
+            if not match:
+                continue
+            name, version = match["name"], int(match["version"])
+            with open(os.path.join(self.prompt_dir, filename), encoding="utf-8") as f:
+                text = f.read().strip("\n")
+            digest = hashlib.sha256(f"{name}\nv{version}\n{text}".encode("utf-8")).hexdigest()[:12]
+            entries.setdefault(name, {})[version] = PromptEntry(
+                name=name, version=version, text=text, template=PromptTemplate.from_template(text), hash=digest
+            )
+        return entries
+
+    @property
+    def entries(self) -> Dict[str, Dict[int, PromptEntry]]:
+        if self._entries is None:
+            with self._lock:
+                if self._entries is None:
+                    self._entries = self._load()
+        return self._entries
+
+    def get(self, name: str, version: Optional[int] = None) -> PromptEntry:
+        versions = self.entries.get(name)
+        if not versions:
+            raise KeyError(f"등록되지 않은 프롬프트: {name} ({self.prompt_dir})")
+        if version is None:
+            version = max(versions)
+        if version not in versions:
+            raise KeyError(f"프롬프트 버전 없음: {name} v{version} (가능: {sorted(versions)})")
+        return versions[version]
+
+    def report(self) -> Dict[str, str]:
+        """이름 → 최신 버전 태그"""
+        return {name: self.get(name).tag for name in sorted(self.entries)}
+
+
+# ✅ 프로세스 전역 싱글톤
+prompt_registry = PromptRegistry()
+
+
+def get_prompt(name: str, version: Optional[int] = None) -> PromptEntry:
+    return prompt_registry.get(name, version)
+
+
+def prompt_metrics(*prompts: PromptEntry) -> Dict[str, str]:
+    """사용한 프롬프트 → state.metrics 항목 ("prompt.<이름>": "v<버전>:<해시>")"""
+    return {f"prompt.{p.name}": p.tag for p in prompts}
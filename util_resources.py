@@ -0,0 +1,262 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from langchain_openai import ChatOpenAI
+from langchain_community.vectorstores import FAISS
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from util_llm_cache import get_llm_cache
+from util_embedding_cache import QueryEmbeddingCache
+from util_embeddings import embedding_settings, settings_key, settings_fingerprint, build_embeddings
+from util_docstore import load_local
+from util_retrieval import CompanyPartitionedIndex, HybridRetriever, load_catalog, catalog_partitions, load_index_meta, configure_index
+
+DEFAULT_EMBEDDING_MODEL = "nlpai-lab/KURE-v1"
+
+# ✅ 공급자별 초당 요청 수 (환경변수로 조정, 0 이하이면 제한 없음)
+DEFAULT_RATE_LIMITS = {
+    "openai": float(os.getenv("OPENAI_RPS", "5")),
+    "tavily": float(os.getenv("TAVILY_RPS", "2")),
+    "kipris": float(os.getenv("KIPRIS_RPS", "2")),
+}
+
+# ✅ 1이면 index.faiss를 읽기 전용 mmap으로 로드 (여러 워커 프로세스가 페이지 캐시 공유)
+FAISS_MMAP = os.getenv("FAISS_MMAP", "0") == "1"
+
+
+def current_rss_mb() -> float:
+    """현재 프로세스의 상주 메모리(RSS, MB)"""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        # Linux 기준 KB 단위 (최대 RSS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class ResourceRegistry:
+    """
+    프로세스 전역 리소스 레지스트리
+    - 임베딩 모델 / FAISS 스토어를 키별로 한 번만 로드하고 모든 Agent가 공유
+    - 로드 시간 및 RSS 증가량을 기록
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._embeddings: Dict[tuple, HuggingFaceEmbeddings] = {}
+        self._query_embeddings: Dict[tuple, QueryEmbeddingCache] = {}
+        self._vectorstores: Dict[tuple, FAISS] = {}
+        self._company_indexes: Dict[tuple, CompanyPartitionedIndex] = {}
+        self._catalogs: Dict[str, Optional[Dict]] = {}
+        self._retrievers: Dict[tuple, HybridRetriever] = {}
+        self._rate_limiters: Dict[str, InMemoryRateLimiter] = {}
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self.load_log: List[Dict] = []
+
+    def _record(self, kind: str, key: str, started: float, rss_before: float):
+        entry = {
+            "kind": kind,
+            "key": key,
+            "load_sec": round(time.perf_counter() - started, 3),
+            "rss_delta_mb": round(current_rss_mb() - rss_before, 1),
+        }
+        self.load_log.append(entry)
+        print(f"✅ {kind} 로드 완료: {key} ({entry['load_sec']}s, +{entry['rss_delta_mb']}MB)")
+
+    def get_embeddings(self, model_name: str = DEFAULT_EMBEDDING_MODEL,
+                       settings: Optional[Dict] = None) -> HuggingFaceEmbeddings:
+        """임베딩 모델 (모델명 + 처리량 설정별 1회 로드, 설정 기본값은 EMBED_* 환경변수)"""
+        settings = embedding_settings(settings)
+        key = (model_name, settings_key(settings))
+        with self._lock:
+            if key not in self._embeddings:
+                started, rss_before = time.perf_counter(), current_rss_mb()
+                self._embeddings[key] = build_embeddings(model_name, settings)
+                self._record("embeddings", f"{model_name} {settings}", started, rss_before)
+            return self._embeddings[key]
+
+    def get_query_embeddings(self, model_name: str = DEFAULT_EMBEDDING_MODEL,
+                             settings: Optional[Dict] = None) -> QueryEmbeddingCache:
+        """검색 쿼리용 캐시 임베딩 (모델명 + 설정별 1개, 모든 스토어/Agent가 공유)"""
+        settings = embedding_settings(settings)
+        key = (model_name, settings_key(settings))
+        with self._lock:
+            if key not in self._query_embeddings:
+                self._query_embeddings[key] = QueryEmbeddingCache(
+                    self.get_embeddings(model_name, settings), model_name, fingerprint=settings_fingerprint(settings)
+                )
+            return self._query_embeddings[key]
+
+    def get_vectorstore(self, faiss_path: str, embedding_model: str = DEFAULT_EMBEDDING_MODEL) -> FAISS:
+        key = (os.path.abspath(faiss_path), embedding_model)
+        with self._lock:
+            if key not in self._vectorstores:
+                # 검색 시 쿼리 임베딩은 캐시를 거침 (rag_search_tool / rag_search / CompanyPartitionedIndex)
+                embeddings = self.get_query_embeddings(embedding_model)
+                started, rss_before = time.perf_counter(), current_rss_mb()
+                # pickle 없는 포맷: 인덱스만 로드, 청크는 검색 결과만 SQLite에서 조회
+                self._vectorstores[key] = load_local(faiss_path, embeddings, lazy=True, mmap=FAISS_MMAP)
+                # IVF nprobe / HNSW efSearch (index_meta.json, 환경변수로 조정)
+                meta = load_index_meta(faiss_path)
+                configure_index(self._vectorstores[key].index, meta)
+                built_normalize = meta.get("embedding", {}).get("normalize")
+                if built_normalize is not None and built_normalize != embedding_settings()["normalize"]:
+                    print(f"⚠️ 인덱스 빌드 시 normalize={built_normalize}, 현재 EMBED_NORMALIZE 설정과 다름: {faiss_path}")
+                self._record("vectorstore", faiss_path, started, rss_before)
+            return self._vectorstores[key]
+
+    def get_catalog(self, faiss_path: str) -> Optional[Dict]:
+        """VectorDBBuilder가 저장한 기업 카탈로그 (없으면 None, 경로당 1회 로드)"""
+        key = os.path.abspath(faiss_path)
+        with self._lock:
+            if key not in self._catalogs:
+                started, rss_before = time.perf_counter(), current_rss_mb()
+                self._catalogs[key] = load_catalog(faiss_path)
+                if self._catalogs[key] is not None:
+                    self._record("catalog", faiss_path, started, rss_before)
+            return self._catalogs[key]
+
+    def get_company_index(self, faiss_path: str, embedding_model: str = DEFAULT_EMBEDDING_MODEL) -> CompanyPartitionedIndex:
+        """기업별 파티션 검색 인덱스 (스토어당 1회 생성, 카탈로그가 있으면 docstore 스캔 생략)"""
+        key = (os.path.abspath(faiss_path), embedding_model)
+        with self._lock:
+            if key not in self._company_indexes:
+                vectordb = self.get_vectorstore(faiss_path, embedding_model)
+                catalog = self.get_catalog(faiss_path)
+                partitions = None
+                if catalog is not None and catalog.get("total_chunks") == vectordb.index.ntotal:
+                    partitions = catalog_partitions(catalog)
+                started, rss_before = time.perf_counter(), current_rss_mb()
+                # Flat / IVF는 공유 인덱스(mmap 포함)에 selector 적용, 벡터 복사는 그래프 인덱스의 최근 기업만
+                self._company_indexes[key] = CompanyPartitionedIndex(vectordb, mode="auto", partitions=partitions)
+                self._record("company_index", faiss_path, started, rss_before)
+            return self._company_indexes[key]
+
+    def get_retriever(self, faiss_path: str, embedding_model: str = DEFAULT_EMBEDDING_MODEL) -> HybridRetriever:
+        """BM25 + 벡터 하이브리드 검색기 (스토어당 1개, 기업 필터는 파티션 인덱스 사용)"""
+        key = (os.path.abspath(faiss_path), embedding_model)
+        with self._lock:
+            if key not in self._retrievers:
+                self._retrievers[key] = HybridRetriever(
+                    self.get_vectorstore(faiss_path, embedding_model),
+                    self.get_company_index(faiss_path, embedding_model)
+                )
+            return self._retrievers[key]
+
+    def get_rate_limiter(self, provider: str) -> Optional[InMemoryRateLimiter]:
+        """공급자별 공유 rate limiter (모든 스레드/Agent가 같은 버킷 사용)"""
+        rps = DEFAULT_RATE_LIMITS.get(provider, 0)
+        if rps <= 0:
+            return None
+        with self._lock:
+            if provider not in self._rate_limiters:
+                self._rate_limiters[provider] = InMemoryRateLimiter(
+                    requests_per_second=rps,
+                    check_every_n_seconds=0.05,
+                    max_bucket_size=max(1, int(rps))
+                )
+            return self._rate_limiters[provider]
+
+    def get_executor(self, name: str, max_workers: int = 8) -> ThreadPoolExecutor:
+        """용도별 공유 I/O 스레드 풀 (Agent / 기업 간 재사용)"""
+        with self._lock:
+            if name not in self._executors:
+                self._executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+            return self._executors[name]
+
+    def clear(self):
+        with self._lock:
+            self._embeddings.clear()
+            self._query_embeddings.clear()
+            self._vectorstores.clear()
+            self._company_indexes.clear()
+            self._catalogs.clear()
+            self._retrievers.clear()
+            self._rate_limiters.clear()
+            for executor in self._executors.values():
+                executor.shutdown(wait=False)
+            self._executors.clear()
+            self.load_log.clear()
+
+    def report(self) -> Dict:
+        return {
+            "embeddings": [model for model, _ in self._embeddings.keys()],
+            "vectorstores": [path for path, _ in self._vectorstores.keys()],
+            "loads": list(self.load_log),
+            "total_load_sec": round(sum(e["load_sec"] for e in self.load_log), 3),
+            "query_embedding_cache": [c.report() for c in self._query_embeddings.values()],
+            "retrievers": [dict(r.stats, sparse=r.sparse_enabled) for r in self._retrievers.values()],
+            "rss_mb": round(current_rss_mb(), 1),
+        }
+
+    def print_report(self):
+        r = self.report()
+        print("=====================================")
+        print(f"✅ 로드된 임베딩 모델: {len(r['embeddings'])}개 {r['embeddings']}")
+        print(f"✅ 로드된 FAISS 스토어: {len(r['vectorstores'])}개")
+        print(f"✅ 총 로드 시간: {r['total_load_sec']}s")
+        for cache in r["query_embedding_cache"]:
+            print(f"✅ 쿼리 임베딩 캐시: {cache}")
+        for stats in r["retrievers"]:
+            print(f"✅ 하이브리드 검색: {stats}")
+        print(f"✅ 현재 RSS: {r['rss_mb']}MB")
+        print("=====================================")
+
+
+# ✅ 프로세스 전역 싱글톤
+registry = ResourceRegistry()
+
+
+def get_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL, settings: Optional[Dict] = None) -> HuggingFaceEmbeddings:
+    return registry.get_embeddings(model_name, settings)
+
+
+def get_query_embeddings(model_name: str = DEFAULT_EMBEDDING_MODEL, settings: Optional[Dict] = None) -> QueryEmbeddingCache:
+    return registry.get_query_embeddings(model_name, settings)
+
+
+def get_vectorstore(faiss_path: str, embedding_model: str = DEFAULT_EMBEDDING_MODEL) -> FAISS:
+    return registry.get_vectorstore(faiss_path, embedding_model)
+
+
+def get_catalog(faiss_path: str) -> Optional[Dict]:
+    return registry.get_catalog(faiss_path)
+
+
+def get_company_index(faiss_path: str, embedding_model: str = DEFAULT_EMBEDDING_MODEL) -> CompanyPartitionedIndex:
+    return registry.get_company_index(faiss_path, embedding_model)
+
+
+def get_retriever(faiss_path: str, embedding_model: str = DEFAULT_EMBEDDING_MODEL) -> HybridRetriever:
+    return registry.get_retriever(faiss_path, embedding_model)
+
+
+def get_rate_limiter(provider: str) -> Optional[InMemoryRateLimiter]:
+    return registry.get_rate_limiter(provider)
+
+
+def get_executor(name: str, max_workers: int = 8) -> ThreadPoolExecutor:
+    return registry.get_executor(name, max_workers)
+
+
+def throttle(provider: str):
+    """공급자 호출 직전에 호출 (토큰이 생길 때까지 대기)"""
+    limiter = registry.get_rate_limiter(provider)
+    if limiter is not None:
+        limiter.acquire(blocking=True)
+
+
+def get_llm(model: str = "gpt-4o-mini", temperature: float = 0, **kwargs) -> ChatOpenAI:
+    """공유 OpenAI rate limiter와 LLM 응답 캐시가 적용된 ChatOpenAI"""
+    kwargs.setdefault("rate_limiter", get_rate_limiter("openai"))
+    kwargs.setdefault("cache", get_llm_cache())
+    return ChatOpenAI(model=model, temperature=temperature, **kwargs)
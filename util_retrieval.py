@@ -0,0 +1,312 @@
+import os
+import re
+import json
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+import faiss
+from langchain_core.documents import Document
+from langchain_community.vectorstores import FAISS
+
+CATALOG_NAME = "catalog.json"
+INDEX_META_NAME = "index_meta.json"
+# subindex 모드에서 메모리에 유지할 기업별 서브 인덱스 수 (벡터 복사본 상한)
+PARTITION_CACHE_SIZE = int(os.getenv("PARTITION_CACHE_SIZE", "16"))
+
+_TOKEN_RE = re.compile(r"[가-힣]+|[0-9a-z]+")
+
+
+def tokenize_ko(text: str) -> List[str]:
+    """
+    희소 검색용 토크나이저 (형태소 분석기 없이)
+    - 영문/숫자 단어는 그대로 (제품 코드 "QG3030", 특허 번호 보존)
+    - 한글 어절은 어절 전체 + 글자 bigram ("신약개발을" → 신약개발을, 신약, 약개, 개발, 발을) → 조사가 붙어도 매칭
+    """
+    tokens = []
+    for word in _TOKEN_RE.findall(unicodedata.normalize("NFKC", str(text)).lower()):
+        tokens.append(word)
+        if "가" <= word[0] <= "힣" and len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def rrf_fuse(rankings: List[List[int]], k: int, c: int = 60) -> List[int]:
+    """Reciprocal Rank Fusion: 각 순위 리스트에서 1 / (c + rank) 합산"""
+    scores: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, pos in enumerate(ranking):
+            scores[pos] = scores.get(pos, 0.0) + 1.0 / (c + rank + 1)
+    return sorted(scores, key=scores.get, reverse=True)[:k]
+
+
+def query_vector(vectordb: FAISS, embedding: List[float]) -> np.ndarray:
+    vector = np.asarray([embedding], dtype="float32")
+    if getattr(vectordb, "_normalize_L2", False):
+        faiss.normalize_L2(vector)
+    return vector
+
+
+def fetch_documents(vectordb: FAISS, positions: List[int]) -> List[Document]:
+    """FAISS 내부 id 순서대로 Document 조회"""
+    doc_ids = [vectordb.index_to_docstore_id[i] for i in positions]
+    if hasattr(vectordb.docstore, "mget"):
+        # SQLite docstore: 검색된 k개 청크만 한 번에 조회
+        found = vectordb.docstore.mget(doc_ids)
+        return [found[d] for d in doc_ids if d in found]
+    return [vectordb.docstore.search(d) for d in doc_ids]
+
+
+def chunk_id_prefix(sha256: str, name: str) -> str:
+    """
+    청크 ID 접두어: PDF 내용 해시 + manifest 키(파일명) 해시
+    - 내용이 같은 PDF가 다른 파일명(기업)으로 들어와도 docstore ID가 겹치지 않음
+    """
+    return f"{sha256[:16]}-{hashlib.sha256(name.encode('utf-8')).hexdigest()[:8]}"
+
+
+def build_catalog(manifest: Dict, index_to_docstore_id: Dict[int, str]) -> Dict:
+    """
+    manifest + 현재 FAISS id 매핑 → 기업 카탈로그
+    - 기업별 청크 수 / 원본 PDF / 페이지 범위 / 청크 ID 접두어 / FAISS id 구간
+    - PDF 하나의 청크는 연속으로 추가되고 삭제 후에도 상대 순서가 유지되므로 [start, end) 구간으로 저장
+    """
+    first_ids = {entry["chunk_ids"][0]: name for name, entry in manifest["pdfs"].items() if entry["chunk_ids"]}
+    starts = {first_ids[doc_id]: faiss_id for faiss_id, doc_id in index_to_docstore_id.items() if doc_id in first_ids}
+
+    companies: Dict[str, Dict] = {}
+    for name, entry in manifest["pdfs"].items():
+        n_chunks = len(entry["chunk_ids"])
+        company = companies.setdefault(entry["company"], {"chunks": 0, "sources": []})
+        company["chunks"] += n_chunks
+        start = starts.get(name, 0)
+        company["sources"].append({
+            "pdf": name,
+            "chunk_id_prefix": entry["chunk_ids"][0].rsplit("-", 1)[0] if n_chunks else chunk_id_prefix(entry["sha256"], name),
+            "chunks": n_chunks,
+            "page_range": entry.get("page_range", [0, max(entry["pages"] - 1, 0)]),
+            "faiss_range": [start, start + n_chunks],
+        })
+    return {"total_chunks": len(index_to_docstore_id), "companies": dict(sorted(companies.items()))}
+
+
+def _save_json(save_path: str, name: str, data: Dict):
+    os.makedirs(save_path, exist_ok=True)
+    tmp_path = os.path.join(save_path, name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, os.path.join(save_path, name))
+
+
+def _load_json(save_path: str, name: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(save_path, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def save_catalog(save_path: str, catalog: Dict):
+    _save_json(save_path, CATALOG_NAME, catalog)
+
+
+def load_catalog(save_path: str) -> Optional[Dict]:
+    """카탈로그 로드 (없거나 깨졌으면 None → 호출 측에서 docstore 스캔으로 대체)"""
+    return _load_json(save_path, CATALOG_NAME)
+
+
+def save_index_meta(save_path: str, meta: Dict):
+    _save_json(save_path, INDEX_META_NAME, meta)
+
+
+def load_index_meta(save_path: str) -> Dict:
+    """index.faiss 옆의 인덱스 메타데이터 (없으면 Flat으로 간주)"""
+    return _load_json(save_path, INDEX_META_NAME) or {"index_type": "flat", "params": {}}
+
+
+def configure_index(index: faiss.Index, meta: Dict) -> faiss.Index:
+    """
+    검색 시점 파라미터 적용 (nprobe는 index.faiss에 저장되지 않으므로 로드할 때마다 설정)
+    - 환경변수 FAISS_NPROBE / FAISS_EF_SEARCH가 메타데이터 값보다 우선
+    """
+    params = meta.get("params", {})
+    nprobe = int(os.getenv("FAISS_NPROBE", params.get("nprobe") or 0))
+    ef_search = int(os.getenv("FAISS_EF_SEARCH", params.get("ef_search") or 0))
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None and nprobe > 0:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    if isinstance(index, faiss.IndexHNSW) and ef_search > 0:
+        index.hnsw.efSearch = ef_search
+    return index
+
+
+def search_parameters(index: faiss.Index, selector: faiss.IDSelector, exhaustive: bool = False) -> faiss.SearchParameters:
+    """
+    인덱스 종류에 맞는 SearchParameters (IVF/HNSW는 전용 타입이 아니면 예외)
+    :param exhaustive: IVF에서 nprobe=nlist로 모든 리스트 탐색 (selector가 고른 벡터가 탐색하지 않은 리스트에 있어 빠지는 것 방지)
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nlist if exhaustive else ivf.nprobe)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def catalog_chunk_ids(source: Dict) -> List[str]:
+    """카탈로그 source 항목 → docstore 청크 ID 리스트 (VectorDBBuilder._chunk_ids와 같은 규칙)"""
+    return [f"{source['chunk_id_prefix']}-{i:05d}" for i in range(source["chunks"])]
+
+
+def catalog_partitions(catalog: Dict) -> Dict[str, List[int]]:
+    """카탈로그 → {기업명: FAISS 내부 id 리스트} (CompanyPartitionedIndex partitions 인자용)"""
+    return {
+        company: [i for src in info["sources"] for i in range(*src["faiss_range"])]
+        for company, info in catalog["companies"].items()
+    }
+
+
+def selector_is_exact(index: faiss.Index) -> bool:
+    """IDSelector 검색이 파티션 안에서 빠짐없는 top-k인지 (Flat: 전수 비교, IVF: nprobe=nlist로 전체 리스트 탐색)"""
+    return isinstance(index, faiss.IndexFlat) or faiss.try_extract_index_ivf(index) is not None
+
+
+class CompanyPartitionedIndex:
+    """
+    company 메타데이터 값별로 파티션된 FAISS 검색
+    - selector 모드: 부모 인덱스에 IDSelectorBatch 적용 (벡터 복사 없음, mmap 공유 인덱스도 그대로 사용)
+      IVF는 nprobe=nlist로 모든 리스트를 탐색 → 기업 벡터를 빠짐없이 보지만 리스트 수만큼 지연 증가 (recall 우선)
+    - subindex 모드: 기업별 IndexFlat 서브 인덱스 → 해당 기업 벡터만 전수 스캔
+      처음 검색한 기업만 부모 인덱스 벡터를 복원해 만들고 최근 사용 max_subindexes개만 유지 (메모리 상한)
+    - auto 모드: Flat / IVF 계열은 selector, HNSW 등 그래프 인덱스는 subindex
+      (selector 모드를 지정해도 그래프 인덱스는 subindex로 검색: 필터된 그래프 탐색은 작은 기업에서 k개를 못 채울 수 있음)
+    LangChain FAISS의 filter(fetch_k 초과 조회 후 Python 후처리)와 달리 기업 청크가 k개 이상이면 k개를 항상 채움
+    """
+
+    def __init__(self, vectordb: FAISS, company_key: str = "company", mode: str = "auto",
+                 partitions: Optional[Dict[str, List[int]]] = None,
+                 max_subindexes: int = PARTITION_CACHE_SIZE):
+        """
+        :param partitions: {기업명: 부모 인덱스 내부 id 리스트} (없으면 docstore 스캔으로 생성)
+        :param max_subindexes: subindex 모드에서 메모리에 유지할 기업별 서브 인덱스 수
+        """
+        self.vectordb = vectordb
+        self.company_key = company_key
+        if mode == "auto":
+            mode = "selector" if selector_is_exact(vectordb.index) else "subindex"
+        self.mode = mode
+        self.max_subindexes = max(1, max_subindexes)
+        self.partitions: Dict[str, np.ndarray] = {}
+        self._subindexes: "OrderedDict[str, faiss.Index]" = OrderedDict()
+        self._selectors: Dict[str, faiss.IDSelector] = {}
+        self._lock = threading.Lock()
+        self._direct_map = False
+
+        if partitions is None:
+            partitions = self._scan_partitions()
+        for company, ids in partitions.items():
+            self.partitions[company] = np.asarray(sorted(ids), dtype="int64")
+
+    def _scan_partitions(self) -> Dict[str, List[int]]:
+        partitions: Dict[str, List[int]] = {}
+        for faiss_id, doc_id in self.vectordb.index_to_docstore_id.items():
+            company = self.vectordb.docstore.search(doc_id).metadata.get(self.company_key)
+            if company is not None:
+                partitions.setdefault(company, []).append(faiss_id)
+        return partitions
+
+    def _subindex(self, company: str) -> faiss.Index:
+        """기업별 IndexFlat 서브 인덱스 (처음 검색할 때 생성, LRU로 max_subindexes개 유지)"""
+        with self._lock:
+            sub = self._subindexes.get(company)
+            if sub is not None:
+                self._subindexes.move_to_end(company)
+                return sub
+            index = self.vectordb.index
+            ivf = faiss.try_extract_index_ivf(index)
+            if ivf is not None and not self._direct_map:
+                # IVF는 id → (리스트, 위치) 매핑이 있어야 reconstruct 가능 (IVF-PQ는 PQ로 근사된 벡터가 복원됨)
+                ivf.make_direct_map()
+                self._direct_map = True
+
+        ids = self.partitions[company]
+        vectors = np.vstack([index.reconstruct(int(i)) for i in ids]).astype("float32")
+        sub = faiss.IndexFlat(index.d, index.metric_type)
+        sub.add(vectors)
+        with self._lock:
+            self._subindexes[company] = sub
+            self._subindexes.move_to_end(company)
+            while len(self._subindexes) > self.max_subindexes:
+                self._subindexes.popitem(last=False)
+        return sub
+
+    def companies(self) -> List[str]:
+        return sorted(self.partitions.keys())
+
+    def _search_ids(self, vector: np.ndarray, company: str, k: int) -> List[int]:
+        ids = self.partitions.get(company)
+        if ids is None or len(ids) == 0:
+            return []
+        k = min(k, len(ids))
+
+        # 그래프 인덱스(HNSW)는 selector로 빠짐없는 top-k를 보장할 수 없어 파티션 벡터 전수 스캔
+        if self.mode == "subindex" or not selector_is_exact(self.vectordb.index):
+            _, local = self._subindex(company).search(vector, k)
+            return [int(ids[j]) for j in local[0] if j != -1]
+
+        if company not in self._selectors:
+            self._selectors[company] = faiss.IDSelectorBatch(ids)
+        params = search_parameters(self.vectordb.index, self._selectors[company], exhaustive=True)
+        _, found = self.vectordb.index.search(vector, k, params=params)
+        return [int(i) for i in found[0] if i != -1]
+
+    def search_by_vector(self, embedding: List[float], company: str, k: int = 4) -> List[Document]:
+        vector = query_vector(self.vectordb, embedding)
+        return fetch_documents(self.vectordb, self._search_ids(vector, company, k))
+
+    def search(self, query: str, company: str, k: int = 4) -> List[Document]:
+        return self.search_by_vector(self.vectordb._embed_query(query), company, k)
+
+
+class HybridRetriever:
+    """
+    BM25(docstore.sqlite의 FTS5 희소 인덱스, tokenize_ko 토큰) + 벡터 검색을 RRF로 결합
+    - company 지정 시 두 검색 모두 해당 기업 청크만 대상 (CompanyPartitionedIndex)
+    - 희소 인덱스가 없거나(구 포맷 / 메모리 스토어) RAG_HYBRID=0 이면 벡터 검색만 수행
+    """
+
+    def __init__(self, vectordb: FAISS, company_index: Optional[CompanyPartitionedIndex] = None,
+                 fetch_k: int = 20, rrf_c: int = 60, hybrid: Optional[bool] = None):
+        self.vectordb = vectordb
+        self.company_index = company_index
+        self.fetch_k = fetch_k
+        self.rrf_c = rrf_c
+        self.hybrid = hybrid if hybrid is not None else os.getenv("RAG_HYBRID", "1") == "1"
+        self.stats = {"queries": 0, "hybrid_queries": 0, "sparse_only_hits": 0}
+
+    @property
+    def sparse_enabled(self) -> bool:
+        return self.hybrid and getattr(self.vectordb.docstore, "has_sparse", False)
+
+    def _dense_ids(self, query: str, company: Optional[str], n: int) -> List[int]:
+        vector = query_vector(self.vectordb, self.vectordb._embed_query(query))
+        if company is not None and self.company_index is not None:
+            return self.company_index._search_ids(vector, company, n)
+        _, found = self.vectordb.index.search(vector, n)
+        return [int(i) for i in found[0] if i != -1]
+
+    def search(self, query: str, company: Optional[str] = None, k: int = 4) -> List[Document]:
+        self.stats["queries"] += 1
+        if not self.sparse_enabled:
+            return fetch_documents(self.vectordb, self._dense_ids(query, company, k))
+
+        dense = self._dense_ids(query, company, self.fetch_k)
+        sparse = self.vectordb.docstore.sparse_search(tokenize_ko(query), company, self.fetch_k)
+        positions = rrf_fuse([dense, sparse], k, self.rrf_c)
+        self.stats["hybrid_queries"] += 1
+        # 희소 검색 덕분에 top-k에 들어온 청크 수 (정확 일치 코드/번호 등)
+        self.stats["sparse_only_hits"] += len(set(positions) - set(dense[:k]))
+        return fetch_documents(self.vectordb, positions)
@@ -0,0 +1,115 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.getenv("SCORE_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "score_cache.sqlite"))
+
+
+class SubScoreCache:
+    """
+    InvestmentAgent 항목별(sub) 점수 SQLite 캐시
+    - 키: sha256(항목명 + 기업명 + 해당 항목 입력 필드 + 프롬프트 버전/해시 + 모델명)
+      → 입력이 바뀐 항목만 다시 채점, 가중치만 바꾼 재계산은 LLM 호출 0회
+    - max_entries 초과 시 가장 오래 사용되지 않은 항목부터 제거 (LRU)
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 100000):
+        self.path = path
+        self.max_entries = max_entries
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sub_scores (
+                key TEXT PRIMARY KEY,
+                company TEXT,
+                category TEXT,
+                score INTEGER,
+                created_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sub_scores_accessed ON sub_scores(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(category: str, company: str, fields: Dict[str, Any], version: str) -> str:
+        payload = {"category": category, "company": company, "fields": fields, "version": version}
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, int]:
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        found = {}
+        with self._lock:
+            # SQLite 변수 개수 제한(999)을 넘지 않도록 나눠서 조회
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                found.update(self._conn.execute(
+                    f"SELECT key, score FROM sub_scores WHERE key IN ({marks})", chunk
+                ).fetchall())
+                self._conn.execute(
+                    f"UPDATE sub_scores SET accessed_at = ? WHERE key IN ({marks})", [time.time(), *chunk]
+                )
+            self._conn.commit()
+            self.stats["hits"] += len(found)
+            self.stats["misses"] += len(keys) - len(found)
+        return found
+
+    def set_many(self, rows: Iterable[tuple]):
+        """rows: (key, company, category, score)"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO sub_scores VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, company, category, int(score), now, now) for key, company, category, score in rows]
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM sub_scores").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM sub_scores WHERE key IN "
+                "(SELECT key FROM sub_scores ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.stats["evicted"] += overflow
+
+    def report(self) -> Dict:
+        total = self.stats["hits"] + self.stats["misses"]
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM sub_scores").fetchone()[0]
+        return {
+            **self.stats,
+            "entries": entries,
+            "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0,
+        }
+
+
+_default_cache: Optional[SubScoreCache] = None
+_default_lock = threading.Lock()
+
+
+def get_score_cache() -> Optional[SubScoreCache]:
+    """SCORE_CACHE=0 이면 캐시 비활성화"""
+    global _default_cache
+    if os.getenv("SCORE_CACHE", "1") == "0":
+        return None
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SubScoreCache()
+        return _default_cache
@@ -0,0 +1,175 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_PATH = os.getenv("SEARCH_CACHE_PATH", os.path.join(BASE_DIR, ".cache", "search_cache.sqlite"))
+
+# ✅ TTL 그룹별 유효 기간 (초) — 뉴스는 빨리 만료, 기업 프로필은 오래 유지
+TTL_SECONDS = {
+    "news": 24 * 3600,
+    "general": 7 * 24 * 3600,
+    "company": 30 * 24 * 3600,
+}
+
+
+class SearchCacheMiss(RuntimeError):
+    """오프라인 모드에서 캐시에 없는 검색을 요청한 경우"""
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", str(query)).strip().lower()
+
+
+class SearchCache:
+    """
+    웹 검색(Tavily) 결과 SQLite 캐시
+    - 키: 정규화된 쿼리 + 검색 파라미터(depth, max_results, include_domains, topic, days ...)
+    - TTL 그룹별 만료, max_entries 초과 시 가장 오래 사용되지 않은 항목부터 제거
+    - offline=True 이면 캐시 미스 시 네트워크 호출 대신 SearchCacheMiss 발생
+    """
+
+    def __init__(self,
+                 path: str = DEFAULT_CACHE_PATH,
+                 max_entries: int = 20000,
+                 ttl_seconds: Optional[Dict[str, int]] = None,
+                 offline: Optional[bool] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or TTL_SECONDS
+        self.offline = offline if offline is not None else os.getenv("SEARCH_CACHE_OFFLINE") == "1"
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evicted": 0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS search_cache (
+                key TEXT PRIMARY KEY,
+                query TEXT,
+                value TEXT,
+                created_at REAL,
+                expires_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON search_cache(accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, **params) -> str:
+        payload = {"query": normalize_query(query)}
+        for k, v in params.items():
+            if v is None:
+                continue
+            payload[k] = sorted(v) if isinstance(v, (list, tuple, set)) else v
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE search_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats["hits"] += 1
+        return json.loads(value)
+
+    def set(self, key: str, query: str, value: Any, ttl_group: str = "general"):
+        now = time.time()
+        ttl = self.ttl_seconds.get(ttl_group, self.ttl_seconds["general"])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (key, query, json.dumps(value, ensure_ascii=False), now, now + ttl, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM search_cache WHERE key IN "
+                "(SELECT key FROM search_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+            self.stats["evicted"] += overflow
+
+    def cached(self, fetch: Callable[[], Any], query: str, ttl_group: Optional[str] = None, **params) -> Any:
+        """
+        캐시 조회 후 없으면 fetch() 호출 결과를 저장
+        :param fetch: 실제 검색을 수행하는 인자 없는 함수
+        :param ttl_group: 만료 그룹 (기본: params의 topic, 없으면 general)
+        """
+        key = self.make_key(query, **params)
+        hit = self.get(key)
+        if hit is not None:
+            return hit
+        if self.offline:
+            raise SearchCacheMiss(f"오프라인 모드 캐시 미스: {query}")
+        value = fetch()
+        self.set(key, query, value, ttl_group or params.get("topic") or "general")
+        return value
+
+    def report(self) -> Dict:
+        total = self.stats["hits"] + self.stats["misses"]
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM search_cache").fetchone()[0]
+        return {
+            **self.stats,
+            "entries": entries,
+            "hit_rate": round(self.stats["hits"] / total, 3) if total else 0.0,
+        }
+
+
+_default_cache: Optional[SearchCache] = None
+_default_lock = threading.Lock()
+
+
+def get_search_cache() -> SearchCache:
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = SearchCache()
+        return _default_cache
+
+
+def cached_search(fetch: Callable[[], Any], query: str, ttl_group: Optional[str] = None, **params) -> Any:
+    return get_search_cache().cached(fetch, query, ttl_group=ttl_group, **params)
+
+
+def cached_tavily_search(client, query: str, ttl_group: Optional[str] = None,
+                         timeout: Optional[float] = None, **params) -> Any:
+    """
+    Tavily client.search(query=..., **params) 캐시 래퍼 (미스일 때만 rate limit 적용 후 호출)
+    :param timeout: HTTP 요청 타임아웃(초), 캐시 키에는 포함하지 않음
+    """
+    def fetch():
+        # 캐시 모듈은 langchain 없이도 import 가능하도록 (오프라인 테스트) 호출 시점에 로드
+        from util_resources import throttle
+        throttle("tavily")
+        if timeout is not None:
+            return client.search(query=query, timeout=timeout, **params)
+        return client.search(query=query, **params)
+
+    return cached_search(fetch, query, ttl_group=ttl_group, **params)
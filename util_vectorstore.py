@@ -1,62 +1,380 @@
 import os
+import json
+import time
+import hashlib
+import tempfile
 from glob import glob
-from typing import List
+from collections import deque
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_community.vectorstores import FAISS
-from langchain_community.embeddings import HuggingFaceEmbeddings
+from util_resources import get_embeddings
+from util_embeddings import embedding_settings
+from util_docstore import save_local, load_local, ensure_migrated
+from util_retrieval import chunk_id_prefix, build_catalog, save_catalog, save_index_meta, load_index_meta, configure_index
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+MANIFEST_NAME = "manifest.json"
+INDEX_TYPES = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def parse_pdf(pdf: str, chunk_size: int = 800, chunk_overlap: int = 150) -> Tuple[str, int, List[Document], float]:
+    """
+    PDF 1개 → 페이지 → Semantic Chunk (프로세스 풀에서 실행되므로 모듈 최상위 함수)
+    :return: (pdf 경로, 페이지 수, 청크 리스트, 파싱 시간)
+    """
+    started = time.perf_counter()
+
+    # ✨ Semantic Chunking 적용
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        separators=["\n\n", "\n", " ", ""],  # 문단/문장 단위 보존
+        length_function=len,
+        is_separator_regex=False
+    )
+
+    company_name = os.path.basename(pdf).split('.')[0]  # 파일명 기반 회사명 추출
+    pages = PyPDFLoader(pdf).load()
+    splits = splitter.split_documents(pages)
+
+    # 메타데이터 추가
+    for split in splits:
+        split.metadata["company"] = company_name
+
+    return pdf, len(pages), splits, time.perf_counter() - started
+
+
+def make_index(index_type: str, dim: int, n_train: int = None,
+               nlist: int = 1024, hnsw_m: int = 32, ef_construction: int = 200,
+               pq_m: int = 16, pq_nbits: int = 8) -> faiss.Index:
+    """
+    인덱스 종류별 L2 FAISS 인덱스 생성
+    :param index_type: flat / ivf_flat / hnsw / ivf_pq
+    :param n_train: 학습 샘플 수 (IVF 계열은 샘플 수에 맞춰 nlist / PQ 비트 수를 줄임)
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"지원하지 않는 index_type: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+    if index_type == "flat":
+        return faiss.IndexFlatL2(dim)
+    if index_type == "hnsw":
+        index = faiss.index_factory(dim, f"HNSW{hnsw_m},Flat")
+        index.hnsw.efConstruction = ef_construction
+        return index
+
+    if n_train is not None:
+        # FAISS 권장: 리스트당 최소 39개 학습 벡터
+        nlist = max(1, min(nlist, n_train // 39))
+    if index_type == "ivf_flat":
+        return faiss.index_factory(dim, f"IVF{nlist},Flat")
+
+    if dim % pq_m != 0:
+        raise ValueError(f"pq_m({pq_m})은 임베딩 차원({dim})의 약수여야 합니다.")
+    if n_train is not None:
+        # 서브 양자화기마다 2^nbits개 centroid 학습 필요
+        pq_nbits = max(1, min(pq_nbits, int(np.log2(max(n_train, 2)))))
+    return faiss.index_factory(dim, f"IVF{nlist},PQ{pq_m}x{pq_nbits}")
+
+
 class VectorDBBuilder:
-    def __init__(self, model_name: str = "nlpai-lab/KURE-v1"):
+    def __init__(self,
+                 model_name: str = "nlpai-lab/KURE-v1",
+                 chunk_size: int = 800,
+                 chunk_overlap: int = 150,
+                 max_workers: int = None,
+                 batch_size: int = 64,
+                 parse_ahead: int = 4,
+                 checkpoint_every: int = 5,
+                 index_type: str = "flat",
+                 train_size: int = 40_000,
+                 nlist: int = 1024,
+                 nprobe: int = 16,
+                 hnsw_m: int = 32,
+                 ef_construction: int = 200,
+                 ef_search: int = 64,
+                 pq_m: int = 16,
+                 pq_nbits: int = 8,
+                 embed_settings: Dict = None):
         """
         :param model_name: HuggingFace 임베딩 모델명
+        :param max_workers: PDF 파싱 프로세스 수 (None이면 CPU 수)
+        :param batch_size: 한 번에 임베딩/인덱싱할 청크 수 (메모리 상한)
+        :param parse_ahead: 임베딩보다 앞서 파싱해 둘 PDF 수
+        :param checkpoint_every: 몇 개 PDF마다 인덱스/manifest를 저장할지
+        :param index_type: flat / ivf_flat / hnsw / ivf_pq (대규모 코퍼스는 근사 인덱스)
+        :param train_size: IVF 계열 학습에 쓸 샘플 수 (전체 청크 스트림에서 reservoir sampling으로 균등 추출)
+        :param nlist / nprobe: IVF 리스트 수 / 검색 시 탐색할 리스트 수
+        :param hnsw_m / ef_construction / ef_search: HNSW 이웃 수 / 생성·검색 시 후보 수
+        :param pq_m / pq_nbits: PQ 서브 벡터 수 / 코드 비트 수
+        :param embed_settings: 임베딩 처리량 설정 (batch_size / threads / quantize / normalize, 기본값은 EMBED_* 환경변수)
         """
-        self.embedding_model = HuggingFaceEmbeddings(model_name=model_name)
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"지원하지 않는 index_type: {index_type} (가능: {', '.join(INDEX_TYPES)})")
+        self.model_name = model_name
+        self.embed_settings = embedding_settings(embed_settings)
+        self.embedding_model = get_embeddings(model_name, self.embed_settings)
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.parse_ahead = max(1, parse_ahead)
+        self.checkpoint_every = max(1, checkpoint_every)
+        self.index_type = index_type
+        self.train_size = max(1, train_size)
+        self.index_params = {
+            "nlist": nlist, "hnsw_m": hnsw_m, "ef_construction": ef_construction,
+            "pq_m": pq_m, "pq_nbits": pq_nbits,
+        }
+        self.search_params = {"nprobe": nprobe, "ef_search": ef_search}
+        self._trained_on = 0
+        self._reset_pending()
 
-    def build_from_pdfs(self, pdf_files: List[str], save_path: str = None) -> FAISS:
+    # -----------------------------
+    # 파싱 / 임베딩 단계 (스트리밍)
+    # -----------------------------
+    def _iter_parsed(self, pdf_files: List[str]) -> Iterator[Tuple[str, int, List[Document], float]]:
         """
-        PDF 파일들로부터 메타데이터를 포함한 FAISS 벡터DB를 생성
-        :param pdf_files: PDF 파일 경로 리스트
-        :param save_path: 저장할 경로 (예: 'faiss_db/unicorns')
-        :return: FAISS 객체
+        PDF 파싱을 프로세스 풀에 분산하되, 앞서 파싱할 PDF 수를 parse_ahead개로 제한
+        - 소비자(임베딩)가 현재 PDF를 처리하는 동안 워커는 다음 PDF를 파싱 → 파싱/임베딩 overlap
+        - 입력 순서대로 결과를 내보냄
         """
-        docs = []
-        total_pages = 0
-        total_chunks = 0
-
-        # ✨ Semantic Chunking 적용
-        splitter = RecursiveCharacterTextSplitter(
-            chunk_size=800,
-            chunk_overlap=150,
-            separators=["\n\n", "\n", " ", ""],  # 문단/문장 단위 보존
-            length_function=len,
-            is_separator_regex=False
+        if len(pdf_files) <= 1 or self.max_workers == 1:
+            for pdf in pdf_files:
+                yield parse_pdf(pdf, self.chunk_size, self.chunk_overlap)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            remaining = iter(pdf_files)
+            pending = deque(
+                executor.submit(parse_pdf, pdf, self.chunk_size, self.chunk_overlap)
+                for pdf in islice(remaining, self.parse_ahead)
+            )
+            while pending:
+                result = pending.popleft().result()
+                nxt = next(remaining, None)
+                if nxt is not None:
+                    pending.append(executor.submit(parse_pdf, nxt, self.chunk_size, self.chunk_overlap))
+                yield result
+
+    def _add_in_batches(self, vectordb: FAISS, splits: List[Document], chunk_ids: List[str]) -> float:
+        """청크를 batch_size 단위로 임베딩 → index.add (메모리는 배치 크기로 제한)"""
+        started = time.perf_counter()
+        for i in range(0, len(splits), self.batch_size):
+            batch = splits[i:i + self.batch_size]
+            texts = [d.page_content for d in batch]
+            vectors = self.embedding_model.embed_documents(texts)
+            self._add(vectordb, texts, vectors, [d.metadata for d in batch], chunk_ids[i:i + self.batch_size])
+        return time.perf_counter() - started
+
+    def _reset_pending(self):
+        # 학습 전 IVF 인덱스에 넣을 배치: 벡터는 임시 파일, (texts, metadatas, ids)만 메모리
+        self._pending: List[Tuple] = []
+        self._spill = None
+        # 학습 샘플 (reservoir, 최대 train_size개) / 지금까지 본 청크 수
+        self._reservoir = None
+        self._seen = 0
+        self._rng = np.random.default_rng(0)
+
+    def _sample(self, batch: np.ndarray):
+        """reservoir sampling (Algorithm R): 스트림 전체에서 균등하게 train_size개 유지 → 앞쪽 PDF(기업)로 centroid가 쏠리지 않음"""
+        if self._reservoir is None:
+            self._reservoir = np.empty((self.train_size, batch.shape[1]), dtype="float32")
+        for vector in batch:
+            if self._seen < self.train_size:
+                self._reservoir[self._seen] = vector
+            else:
+                j = self._rng.integers(0, self._seen + 1)
+                if j < self.train_size:
+                    self._reservoir[j] = vector
+            self._seen += 1
+
+    def _add(self, vectordb: FAISS, texts: List[str], vectors: List[List[float]],
+             metadatas: List[Dict], ids: List[str]):
+        """학습된 인덱스면 바로 추가, 아니면 스트림이 끝날 때까지 임시 파일에 쌓고 학습 샘플만 추출"""
+        if vectordb.index.is_trained and not self._pending:
+            vectordb.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas, ids=ids)
+            return
+        batch = np.asarray(vectors, dtype="float32")
+        if self._spill is None:
+            self._spill = tempfile.TemporaryFile()
+        self._spill.write(batch.tobytes())
+        self._pending.append((texts, metadatas, ids))
+        self._sample(batch)
+
+    def _train_and_flush(self, vectordb: FAISS):
+        """reservoir 샘플로 인덱스 생성·학습 (nlist/PQ 비트 수는 샘플 수에 맞춤) → 임시 파일의 보류 배치 추가"""
+        if not self._pending:
+            return
+        if not vectordb.index.is_trained:
+            sample = self._reservoir[:min(self._seen, self.train_size)]
+            started = time.perf_counter()
+            index = make_index(self.index_type, sample.shape[1], n_train=len(sample), **self.index_params)
+            index.train(sample)
+            vectordb.index = configure_index(index, {"params": self.search_params})
+            print(f"🧠 {self.index_type} 인덱스 학습 완료: {len(sample)}개 샘플 ({time.perf_counter() - started:.2f}s)")
+            self._trained_on = len(sample)
+
+        dim = vectordb.index.d
+        self._spill.seek(0)
+        for texts, metadatas, ids in self._pending:
+            vectors = np.frombuffer(self._spill.read(len(texts) * dim * 4), dtype="float32").reshape(len(texts), dim)
+            vectordb.add_embeddings(list(zip(texts, vectors.tolist())), metadatas=metadatas, ids=ids)
+        self._spill.close()
+        self._reset_pending()
+
+    def _empty_store(self) -> FAISS:
+        dim = len(self.embedding_model.embed_query("dimension probe"))
+        self._trained_on = 0
+        return FAISS(
+            embedding_function=self.embedding_model,
+            index=make_index(self.index_type, dim, **self.index_params),
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={}
         )
 
-        for pdf in pdf_files:
-            company_name = os.path.basename(pdf).split('.')[0]  # 파일명 기반 회사명 추출
-            loader = PyPDFLoader(pdf)
-            pages = loader.load()
-            total_pages += len(pages)
+    def _index_meta(self, vectordb: FAISS) -> Dict:
+        """index.faiss 옆에 저장할 인덱스 종류 / 실제 적용된 파라미터"""
+        index = vectordb.index
+        params = dict(self.search_params)
+        ivf = faiss.try_extract_index_ivf(index)
+        if ivf is not None:
+            params["nlist"] = ivf.nlist
+            if isinstance(ivf, faiss.IndexIVFPQ):
+                params.update(pq_m=ivf.pq.M, pq_nbits=ivf.pq.nbits)
+        if isinstance(index, faiss.IndexHNSW):
+            params.update(hnsw_m=self.index_params["hnsw_m"], ef_construction=index.hnsw.efConstruction)
+        return {
+            "index_type": self.index_type,
+            "dim": index.d,
+            "ntotal": index.ntotal,
+            "is_trained": bool(index.is_trained),
+            "trained_on": self._trained_on,
+            "params": params,
+            # 검색 측 임베딩 설정(정규화 등)이 빌드 때와 같은지 확인용
+            "embedding": {"model": self.model_name, **self.embed_settings},
+        }
+
+    @staticmethod
+    def _chunk_ids(sha256: str, name: str, n: int) -> List[str]:
+        # 내용 해시 + 파일명 기반 청크 ID → 같은 PDF는 항상 같은 ID, 내용이 같은 다른 파일과는 겹치지 않음
+        prefix = chunk_id_prefix(sha256, name)
+        return [f"{prefix}-{i:05d}" for i in range(n)]
 
-            # Semantic Chunking 실행
-            splits = splitter.split_documents(pages)
+    # -----------------------------
+    # manifest
+    # -----------------------------
+    @staticmethod
+    def load_manifest(save_path: str) -> Dict:
+        path = os.path.join(save_path, MANIFEST_NAME)
+        if not os.path.exists(path):
+            return {"pdfs": {}}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @staticmethod
+    def save_manifest(save_path: str, manifest: Dict):
+        os.makedirs(save_path, exist_ok=True)
+        tmp_path = os.path.join(save_path, MANIFEST_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(save_path, MANIFEST_NAME))
+
+    def _manifest_entry(self, pdf: str, sha256: str, pages: int, chunk_ids: List[str],
+                        parse_sec: float, embed_sec: float, page_range: List[int]) -> Dict:
+        return {
+            "path": pdf,
+            "sha256": sha256,
+            "company": os.path.basename(pdf).split('.')[0],
+            "pages": pages,
+            "chunk_ids": chunk_ids,
+            "page_range": page_range,
+            "parse_sec": round(parse_sec, 3),
+            "embed_sec": round(embed_sec, 3),
+        }
+
+    def _checkpoint(self, vectordb: FAISS, save_path: str, manifest: Dict):
+        """PDF 경계에서만 저장 → 디스크의 인덱스/manifest/카탈로그는 항상 완료된 PDF만 포함"""
+        if save_path:
+            os.makedirs(save_path, exist_ok=True)
+            # 학습 대기 중인 청크가 있으면 지금까지의 샘플로 학습 후 저장
+            self._train_and_flush(vectordb)
+            save_local(vectordb, save_path)
+            save_index_meta(save_path, self._index_meta(vectordb))
+            # 이어서 빌드할 때 인덱스와 manifest가 같은 체크포인트인지 확인용
+            manifest["chunks"] = vectordb.index.ntotal
+            self.save_manifest(save_path, manifest)
+            # 기업 카탈로그: Agent가 docstore 전체 스캔 없이 기업 목록/파티션을 로드
+            save_catalog(save_path, build_catalog(manifest, vectordb.index_to_docstore_id))
+
+    def _ingest(self, vectordb: FAISS, pdf_files: List[str], hashes: Dict[str, str],
+                manifest: Dict, save_path: str = None) -> Tuple[int, int]:
+        """
+        PDFs → pages → chunks → 고정 크기 임베딩 배치 → index.add 스트리밍
+        - checkpoint_every개 PDF마다 인덱스/manifest 저장 (중단 시 update_from_pdfs로 이어서 빌드)
+        :return: (페이지 수, 청크 수)
+        """
+        total_pages, total_chunks, since_checkpoint = 0, 0, 0
+        self._reset_pending()
+        for pdf, n_pages, splits, parse_sec in self._iter_parsed(pdf_files):
+            name = os.path.basename(pdf)
+            chunk_ids = self._chunk_ids(hashes[name], name, len(splits))
+            embed_sec = self._add_in_batches(vectordb, splits, chunk_ids)
+            pages = [d.metadata.get("page", 0) for d in splits] or [0]
+
+            manifest["pdfs"][name] = self._manifest_entry(
+                pdf, hashes[name], n_pages, chunk_ids, parse_sec, embed_sec, [min(pages), max(pages)]
+            )
+            total_pages += n_pages
             total_chunks += len(splits)
+            company_name = name.split('.')[0]
+            print(f"📄 {name} ({company_name}) → {n_pages} pages → {len(splits)} chunks")
 
-            # 메타데이터 추가
-            for split in splits:
-                split.metadata["company"] = company_name
+            since_checkpoint += 1
+            # 학습 전(IVF 샘플 수집 중)에는 저장하지 않음 → 작은 샘플로 조기 학습 방지
+            if since_checkpoint >= self.checkpoint_every and vectordb.index.is_trained:
+                self._checkpoint(vectordb, save_path, manifest)
+                since_checkpoint = 0
 
-            print(f"📄 {os.path.basename(pdf)} ({company_name}) → {len(pages)} pages → {len(splits)} chunks")
+        if since_checkpoint:
+            self._checkpoint(vectordb, save_path, manifest)
+        self._train_and_flush(vectordb)
+        return total_pages, total_chunks
 
-            docs.extend(splits)
+    # -----------------------------
+    # 전체 빌드
+    # -----------------------------
+    def build_from_pdfs(self, pdf_files: List[str], save_path: str = None) -> FAISS:
+        """
+        PDF 파일들로부터 메타데이터를 포함한 FAISS 벡터DB를 생성
+        :param pdf_files: PDF 파일 경로 리스트
+        :param save_path: 저장할 경로 (예: 'faiss_db/unicorns')
+        :return: FAISS 객체
+        """
+        started = time.perf_counter()
+        manifest = {"pdfs": {}}
+        hashes = {os.path.basename(pdf): file_sha256(pdf) for pdf in pdf_files}
 
-        # ✨ Flat Index (FAISS 기본: IndexFlatL2 / IP)
-        vectordb = FAISS.from_documents(docs, self.embedding_model)
+        # ✨ index_type별 인덱스 (flat: IndexFlatL2, IVF 계열은 전체 스트림에서 뽑은 train_size개 샘플로 학습 후 추가)
+        vectordb = self._empty_store()
+        total_pages, total_chunks = self._ingest(vectordb, pdf_files, hashes, manifest, save_path)
 
+        manifest["full_build_sec"] = round(time.perf_counter() - started, 3)
         if save_path:
-            os.makedirs(save_path, exist_ok=True)
-            vectordb.save_local(save_path)
+            self.save_manifest(save_path, manifest)
 
         print("=====================================")
         print(f"✅ 총 PDF 개수: {len(pdf_files)}")
@@ -64,6 +382,77 @@ class VectorDBBuilder:
         print(f"✅ 총 청크 수: {total_chunks}")
         print(f"✅ 메타데이터 추가 완료: 'company'")
         print(f"✅ 벡터DB 저장 경로: {save_path}")
+        print(f"✅ 빌드 시간: {manifest['full_build_sec']}s")
+        print("=====================================")
+
+        return vectordb
+
+    # -----------------------------
+    # 증분 빌드 / 이어서 빌드
+    # -----------------------------
+    def update_from_pdfs(self, pdf_files: List[str], save_path: str) -> FAISS:
+        """
+        manifest와 비교해 새로 추가/변경된 PDF만 파싱·임베딩하고, 삭제/변경된 PDF의 벡터는 제거
+        - 중단된 빌드도 manifest에 기록된 PDF 이후부터 이어서 진행
+        - 기존 스토어나 manifest가 없으면 전체 빌드
+        """
+        manifest = self.load_manifest(save_path)
+        if not manifest["pdfs"] or not os.path.exists(os.path.join(save_path, "index.faiss")):
+            print("ℹ️ manifest 없음 → 전체 빌드")
+            return self.build_from_pdfs(pdf_files, save_path)
+
+        stored_type = load_index_meta(save_path).get("index_type", "flat")
+        if stored_type != self.index_type:
+            print(f"ℹ️ 인덱스 종류 변경 ({stored_type} → {self.index_type}) → 전체 빌드")
+            return self.build_from_pdfs(pdf_files, save_path)
+
+        started = time.perf_counter()
+        try:
+            vectordb = self.load_vectorstore(save_path)
+        except ValueError as e:
+            print(f"⚠️ 저장된 스토어 불일치 ({e}) → 전체 빌드")
+            return self.build_from_pdfs(pdf_files, save_path)
+        # manifest에 기록된 청크 수와 인덱스가 다르면 체크포인트가 섞인 것 → 이어서 빌드하지 않음
+        expected = sum(len(e["chunk_ids"]) for e in manifest["pdfs"].values())
+        if vectordb.index.ntotal != manifest.get("chunks", expected) or vectordb.index.ntotal != expected:
+            print(f"⚠️ 체크포인트 불일치 (인덱스 {vectordb.index.ntotal}개, manifest {expected}개) → 전체 빌드")
+            return self.build_from_pdfs(pdf_files, save_path)
+        self._trained_on = load_index_meta(save_path).get("trained_on", 0)
+
+        current = {os.path.basename(pdf): pdf for pdf in pdf_files}
+        hashes = {name: file_sha256(pdf) for name, pdf in current.items()}
+
+        removed = [name for name in manifest["pdfs"] if name not in current]
+        changed = [name for name in current
+                   if name in manifest["pdfs"] and manifest["pdfs"][name]["sha256"] != hashes[name]]
+        added = [name for name in current if name not in manifest["pdfs"]]
+        unchanged = len(current) - len(changed) - len(added)
+
+        # 1. 삭제/변경된 PDF의 기존 청크 제거
+        stale_ids = [cid for name in removed + changed for cid in manifest["pdfs"][name]["chunk_ids"]]
+        if stale_ids and self.index_type != "flat":
+            # Flat만 remove_ids 후 위치가 0..n-1로 당겨져 LangChain의 index_to_docstore_id 재번호와 일치
+            # (HNSW는 삭제 미지원, IVF는 내부 id를 압축하지 않아 이후 검색이 엉뚱한 청크를 반환)
+            print(f"ℹ️ {self.index_type} 인덱스는 벡터 삭제 후 위치가 어긋남 → 전체 빌드")
+            return self.build_from_pdfs(pdf_files, save_path)
+        if stale_ids:
+            vectordb.delete(stale_ids)
+        for name in removed + changed:
+            del manifest["pdfs"][name]
+
+        # 2. 새로 추가/변경된 PDF만 스트리밍 임베딩 → 추가
+        _, new_chunks = self._ingest(vectordb, [current[n] for n in changed + added], hashes, manifest, save_path)
+
+        elapsed = time.perf_counter() - started
+        # 전체 재빌드 예상 시간: manifest에 기록된 PDF별 파싱+임베딩 시간 합
+        full_estimate = sum(e["parse_sec"] + e["embed_sec"] for e in manifest["pdfs"].values())
+        self._checkpoint(vectordb, save_path, manifest)
+
+        print("=====================================")
+        print(f"✅ 추가 {len(added)} / 변경 {len(changed)} / 삭제 {len(removed)} / 유지 {unchanged}")
+        print(f"✅ 제거 청크 수: {len(stale_ids)}, 추가 청크 수: {new_chunks}")
+        print(f"✅ 증분 빌드 시간: {elapsed:.2f}s (전체 재빌드 예상 {full_estimate:.2f}s, "
+              f"{full_estimate / elapsed if elapsed > 0 else 0:.1f}x)")
         print("=====================================")
 
         return vectordb
@@ -72,14 +461,17 @@ class VectorDBBuilder:
         """
         저장된 FAISS 벡터DB 로드
         """
-        return FAISS.load_local(
-            save_path,
-            self.embedding_model,
-            allow_dangerous_deserialization=True
-        )
+        # 빌더는 스토어를 쓰는 쪽이므로 레거시 pickle 스토어면 여기서 1회 변환
+        ensure_migrated(save_path, self.embedding_model)
+        # 증분 빌드에서 추가/삭제하므로 전체를 메모리 docstore로 로드 (pickle 없음)
+        vectordb = load_local(save_path, self.embedding_model, lazy=False)
+        configure_index(vectordb.index, load_index_meta(save_path))
+        return vectordb
 
 
 if __name__ == "__main__":
+    import sys
+
     # 📂 data 폴더 밑 모든 PDF 자동 탐지
     data_dir = "data"
     pdf_files = glob(os.path.join(data_dir, "*.pdf"))
@@ -91,6 +483,11 @@ if __name__ == "__main__":
     # 📂 저장 경로
     save_path = "faiss_db/unicorns_sementic"
 
-    # 🚀 VectorDB 생성
-    builder = VectorDBBuilder(model_name="nlpai-lab/KURE-v1")
-    vectordb = builder.build_from_pdfs(pdf_files, save_path)
+    # 🚀 VectorDB 생성 (--full: 전체 재빌드, 기본: 변경된 PDF만 증분 반영)
+    # --index=<flat|ivf_flat|hnsw|ivf_pq>: 인덱스 종류 (기본 flat)
+    index_type = next((a.split("=", 1)[1] for a in sys.argv if a.startswith("--index=")), "flat")
+    builder = VectorDBBuilder(model_name="nlpai-lab/KURE-v1", index_type=index_type)
+    if "--full" in sys.argv:
+        vectordb = builder.build_from_pdfs(pdf_files, save_path)
+    else:
+        vectordb = builder.update_from_pdfs(pdf_files, save_path)